@@ -13,6 +13,7 @@ from typing import Dict, List, Any
 
 from .logger import log_interaction, log_error
 from .commands import setup_commands
+from .phrase_scanner import build_scanner
 
 # Load environment variables
 load_dotenv()
@@ -24,6 +25,10 @@ if not DISCORD_TOKEN:
 
 # Get RAG API URL from environment
 RAG_API_URL = os.environ.get("RAG_API_URL", "https://geoffpidcock--gday-rag-api-serve.modal.run")
+# How long to wait for the RAG database to finish initializing at startup
+INIT_TIMEOUT = float(os.environ.get("INIT_TIMEOUT", "300"))
+# Words that get the bot's attention; they address the bot rather than ask about a term
+TRIGGER_WORDS = ("gday", "g'day")
 
 # Create bot instance with message content intents
 intents = discord.Intents.default()
@@ -35,6 +40,49 @@ intents.message_content = True  # Enable reading message content
 
 bot = commands.Bot(command_prefix="!", intents=intents)
 
+# Scanner over the RAG API's phrase catalog, built when the bot connects
+phrase_scanner = None
+
+async def load_phrase_scanner(session):
+    """
+    Fetch the phrase catalog from the RAG API and build the message scanner
+    
+    Args:
+        session: aiohttp client session
+    """
+    global phrase_scanner
+    
+    try:
+        async with session.get(f"{RAG_API_URL}/catalog") as response:
+            if response.status == 200:
+                result = await response.json()
+                phrase_scanner = build_scanner(result.get("phrases", []))
+                print(f"Phrase scanner loaded with {result.get('count', 0)} phrases")
+            else:
+                print(f"Failed to load phrase catalog: {response.status}")
+    except Exception as e:
+        print(f"Error loading phrase catalog: {str(e)}")
+
+async def wait_for_init(session, job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Poll a RAG database initialization job until it finishes
+    
+    Args:
+        session: aiohttp client session
+        job: Job returned by POST /init
+    
+    Returns:
+        The finished job, or the last status seen if it is still running at the timeout
+    """
+    deadline = asyncio.get_running_loop().time() + INIT_TIMEOUT
+    while job.get("status") == "running" and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(2)
+        async with session.get(f"{RAG_API_URL}{job['status_url']}") as response:
+            if response.status != 200:
+                break
+            job = await response.json()
+    return job
+
 # Event: Bot is ready
 @bot.event
 async def on_ready():
@@ -59,11 +107,20 @@ async def on_ready():
     try:
         async with aiohttp.ClientSession() as session:
             async with session.post(f"{RAG_API_URL}/init") as response:
-                if response.status == 201:
-                    result = await response.json()
-                    print(f"RAG database initialized: {result.get('message')}")
+                job = await response.json() if response.status == 202 else None
+            
+            # The sync runs in the background; queries are served meanwhile
+            if job is None:
+                print(f"Failed to initialize RAG database: {response.status}")
+            else:
+                job = await wait_for_init(session, job)
+                if job.get("status") == "succeeded":
+                    print(f"RAG database initialized: {job.get('message')}")
                 else:
-                    print(f"Failed to initialize RAG database: {response.status}")
+                    print(f"RAG database initialization {job.get('status')}: {job.get('message')}")
+            
+            # Load the catalog after init so the scanner sees the latest phrases
+            await load_phrase_scanner(session)
     except Exception as e:
         print(f"Error initializing RAG database: {str(e)}")
 
@@ -82,7 +139,7 @@ async def on_message(message):
     
     # Check if the bot is mentioned or if "gday" is in the message
     bot_mentioned = bot.user.mentioned_in(message)
-    gday_in_message = "gday" in message.content.lower() or "g'day" in message.content.lower()
+    gday_in_message = any(word in message.content.lower() for word in TRIGGER_WORDS)
     
     if bot_mentioned or gday_in_message:
         # Extract the actual message without the mention
@@ -96,83 +153,99 @@ async def on_message(message):
         if not content or content == "":
             content = "Say hello"
         
-        # Query the RAG API
         try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "query": content,
-                    "max_results": 3,
-                    "threshold": 0.5
-                }
-                
-                async with session.post(
-                    f"{RAG_API_URL}/query", 
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        matches = result.get("matches", [])
-                        
-                        # Format and send response
-                        if matches:
-                            # Get the best match
-                            best_match = matches[0]
-                            
-                            # Format the response message
-                            response_text = (
-                                f"**{best_match['phrase']}** - {best_match['meaning']}\n"
-                                f"Example: *{best_match['usage_example']}*"
-                            )
-                            
-                            # If there are more matches, add them
-                            if len(matches) > 1:
-                                response_text += "\n\nOther phrases you might be interested in:"
-                                for match in matches[1:]:
-                                    response_text += f"\n• **{match['phrase']}** - {match['meaning']}"
-                            
-                            await message.reply(response_text)
-                            
-                            # Log the successful interaction
-                            log_interaction(
-                                query=content,
-                                response=response_text,
+            # Answer directly when the message only asks about known slang terms;
+            # the trigger word itself is a catalog phrase, so it doesn't count
+            matches = []
+            if phrase_scanner is not None:
+                matches = [
+                    {
+                        "phrase": item["phrase"],
+                        "meaning": item["meaning"],
+                        "usage_example": item["usage_example"],
+                        "score": 1.0
+                    }
+                    for item in phrase_scanner.match_question(content, ignore=TRIGGER_WORDS)
+                ]
+            
+            # Otherwise query the RAG API
+            if not matches:
+                async with aiohttp.ClientSession() as session:
+                    payload = {
+                        "query": content,
+                        "max_results": 3,
+                        "threshold": 0.5
+                    }
+                    
+                    async with session.post(
+                        f"{RAG_API_URL}/query", 
+                        json=payload
+                    ) as response:
+                        if response.status != 200:
+                            # API error
+                            await message.reply("Sorry mate, I'm having a bit of a technical hiccup.")
+                            log_error(
+                                error_type="API Error",
+                                details=f"Status code: {response.status}",
                                 user_id=str(message.author.id),
-                                username=message.author.name,
-                                guild_id=str(message.guild.id) if message.guild else "DM",
-                                channel_id=str(message.channel.id),
-                                message_id=str(message.id),
-                                matches=matches
+                                message_id=str(message.id)
                             )
-                        else:
-                            # No matches found
-                            fallback_responses = [
-                                "Crikey! I don't quite understand that one, mate.",
-                                "Strewth! That's not in my Aussie vocabulary.",
-                                "Fair dinkum, I'm not sure what you're asking."
-                            ]
-                            
-                            await message.reply(random.choice(fallback_responses))
-                            
-                            # Log the interaction with no matches
-                            log_interaction(
-                                query=content,
-                                response="No matches found",
-                                user_id=str(message.author.id),
-                                username=message.author.name,
-                                guild_id=str(message.guild.id) if message.guild else "DM",
-                                channel_id=str(message.channel.id),
-                                message_id=str(message.id),
-                                matches=[]
-                            )
-                    else:
-                        # API error
-                        await message.reply("Sorry mate, I'm having a bit of a technical hiccup.")
-                        log_error(
-                            error_type="API Error",
-                            details=f"Status code: {response.status}",
-                            user_id=str(message.author.id),
-                            message_id=str(message.id)
-                        )
+                            return
+                        
+                        result = await response.json()
+                        matches = result.get("matches", [])
+            
+            # Format and send response
+            if matches:
+                # Get the best match
+                best_match = matches[0]
+                
+                # Format the response message
+                response_text = (
+                    f"**{best_match['phrase']}** - {best_match['meaning']}\n"
+                    f"Example: *{best_match['usage_example']}*"
+                )
+                
+                # If there are more matches, add them
+                if len(matches) > 1:
+                    response_text += "\n\nOther phrases you might be interested in:"
+                    for match in matches[1:]:
+                        response_text += f"\n• **{match['phrase']}** - {match['meaning']}"
+                
+                await message.reply(response_text)
+                
+                # Log the successful interaction
+                log_interaction(
+                    query=content,
+                    response=response_text,
+                    user_id=str(message.author.id),
+                    username=message.author.name,
+                    guild_id=str(message.guild.id) if message.guild else "DM",
+                    channel_id=str(message.channel.id),
+                    message_id=str(message.id),
+                    matches=matches
+                )
+            else:
+                # No matches found
+                fallback_responses = [
+                    "Crikey! I don't quite understand that one, mate.",
+                    "Strewth! That's not in my Aussie vocabulary.",
+                    "Fair dinkum, I'm not sure what you're asking."
+                ]
+                
+                await message.reply(random.choice(fallback_responses))
+                
+                # Log the interaction with no matches
+                log_interaction(
+                    query=content,
+                    response="No matches found",
+                    user_id=str(message.author.id),
+                    username=message.author.name,
+                    guild_id=str(message.guild.id) if message.guild else "DM",
+                    channel_id=str(message.channel.id),
+                    message_id=str(message.id),
+                    matches=[]
+                )
         except Exception as e:
             # Log the error
             await message.reply("Crikey! Something went wrong, mate.")
@@ -29,24 +29,17 @@ async def setup_commands(bot):
         if not query:
             try:
                 async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"{RAG_API_URL}/query",
-                        json={"query": "random", "max_results": 1}
-                    ) as response:
+                    async with session.get(f"{RAG_API_URL}/random") as response:
                         if response.status == 200:
-                            result = await response.json()
-                            matches = result.get("matches", [])
-                            
-                            if matches:
-                                match = matches[0]
-                                response_text = (
-                                    f"**{match['phrase']}** - {match['meaning']}\n"
-                                    f"Example: *{match['usage_example']}*"
-                                )
-                                await interaction.response.send_message(response_text)
-                            else:
-                                fallbacks = ["G'day mate!", "How ya going?", "Fair dinkum!"]
-                                await interaction.response.send_message(random.choice(fallbacks))
+                            match = await response.json()
+                            response_text = (
+                                f"**{match['phrase']}** - {match['meaning']}\n"
+                                f"Example: *{match['usage_example']}*"
+                            )
+                            await interaction.response.send_message(response_text)
+                        elif response.status == 503:
+                            fallbacks = ["G'day mate!", "How ya going?", "Fair dinkum!"]
+                            await interaction.response.send_message(random.choice(fallbacks))
                         else:
                             await interaction.response.send_message("Crikey! Something went wrong.")
             except Exception as e:
@@ -22,7 +22,7 @@ image = modal.Image.debian_slim().pip_install(
 )
 
 # Add only the specific files we need from discord_bot
-for py_file in ["__init__.py", "bot.py", "commands.py", "logger.py"]:
+for py_file in ["__init__.py", "bot.py", "commands.py", "logger.py", "phrase_scanner.py"]:
     file_path = os.path.join(DISCORD_BOT_DIR, py_file)
     if os.path.exists(file_path):
         image = image.add_local_file(file_path, f"/app/discord_bot/{py_file}")
@@ -0,0 +1,213 @@
+"""
+Multi-phrase scanner for finding known slang terms in Discord messages
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+
+# Apostrophes (straight and curly) are dropped so "g'day" matches "gday"
+_APOSTROPHES = re.compile(r"['‘’`]")
+# Any other punctuation separates words
+_PUNCTUATION = re.compile(r"[^\w\s]")
+# Words that frame a question about a term without asking anything else
+QUESTION_WORDS = frozenset("""
+    a an the is are it its this that what whats does do mean means meaning meant
+    of by define definition explain word term phrase say saying said tell me about
+    please hey hi hello you
+""".split())
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text the same way the RAG API normalizes phrases
+    
+    Args:
+        text: Message or phrase text
+    
+    Returns:
+        Lowercased text without apostrophes, punctuation or extra whitespace
+    """
+    text = _APOSTROPHES.sub("", text.lower())
+    text = _PUNCTUATION.sub(" ", text)
+    return " ".join(text.split())
+
+def _number_variants(normalized: str) -> List[str]:
+    """Singular and plural spellings of a normalized phrase"""
+    if normalized.endswith("es"):
+        return [normalized[:-2], normalized[:-1]]
+    if normalized.endswith("s"):
+        return [normalized[:-1]]
+    return [normalized + "s", normalized + "es"]
+
+class PhraseScanner:
+    """
+    Aho-Corasick automaton over every phrase and alias in the catalog
+    
+    The automaton is built once; scanning a message is linear in its length
+    no matter how many phrases are known. Patterns are padded with spaces
+    and matched against the space-padded normalized message, so only whole
+    words match ("mate" is not found inside "automated").
+    """
+    
+    def __init__(self, catalog: List[Dict[str, Any]]):
+        # Node 0 is the root; each node has transitions, a failure link and outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.catalog = catalog
+        
+        # Exact spellings go in first so they win over derived variants
+        names = [
+            (normalize_text(name), position)
+            for position, item in enumerate(catalog)
+            for name in [item["phrase"], *item.get("aliases", [])]
+        ]
+        names = [(normalized, position) for normalized, position in names if normalized]
+        for normalized, position in names:
+            self._add_pattern(f" {normalized} ", position)
+        for normalized, position in names:
+            for variant in _number_variants(normalized):
+                self._add_pattern(f" {variant} ", position)
+        
+        self._build_failure_links()
+    
+    def _add_pattern(self, pattern: str, position: int):
+        """Insert a pattern into the trie"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        
+        # Keep the first entry registered for a pattern
+        if not self._output[node]:
+            self._output[node].append((len(pattern), position))
+    
+    def _build_failure_links(self):
+        """Breadth-first pass linking each node to its longest proper suffix"""
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+    
+    def _resolve(self, padded: str) -> List[Tuple[int, int, int]]:
+        """
+        Find the leftmost-longest hits in a space-padded normalized text
+        
+        Args:
+            padded: Normalized text with a space at each end
+        
+        Returns:
+            (start, length, catalog position) for each hit, in order
+        """
+        hits = []
+        node = 0
+        
+        for index, char in enumerate(padded):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            
+            for length, position in self._output[node]:
+                # Pattern spans padded[start:index + 1], including both spaces
+                hits.append((index + 1 - length, length, position))
+        
+        # Leftmost-longest, allowing the shared space between adjacent words
+        hits.sort(key=lambda hit: (hit[0], -hit[1]))
+        resolved = []
+        last_end = 0
+        for start, length, position in hits:
+            if start + 1 < last_end:
+                continue
+            last_end = start + length
+            resolved.append((start, length, position))
+        
+        return resolved
+    
+    def _unique(self, positions: List[int]) -> List[Dict[str, Any]]:
+        """Catalog entries at the given positions, first occurrence only"""
+        matches = []
+        seen = set()
+        for position in positions:
+            if position not in seen:
+                seen.add(position)
+                matches.append(self.catalog[position])
+        return matches
+        
+    def scan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Find every known term in a message
+        
+        Overlapping hits are resolved leftmost-longest, so "fair dinkum"
+        wins over a shorter phrase inside it.
+        
+        Args:
+            text: Message text
+        
+        Returns:
+            Matching catalog entries in the order they appear, without repeats
+        """
+        return self._unique([position for _, _, position in self._resolve(f" {normalize_text(text)} ")])
+    
+    def match_question(self, text: str, ignore: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Find the terms a message asks about, if they are all it asks about
+        
+        A message like "what's an esky?" is answered by its terms alone, but
+        "what's a word for a lazy person?" asks for something the terms don't
+        cover. Words outside the matched terms, other than question framing
+        (QUESTION_WORDS), mean the message needs a real search.
+        
+        Args:
+            text: Message text
+            ignore: Words that address the bot rather than ask about a term,
+                such as its trigger word; terms containing them are skipped
+        
+        Returns:
+            Matching catalog entries, or an empty list if the message asks
+            about more than the terms it names
+        """
+        padded = f" {normalize_text(text)} "
+        ignored = {normalize_text(word) for word in ignore}
+        hits = self._resolve(padded)
+        
+        positions = []
+        leftover = []
+        cursor = 0
+        for start, length, position in hits:
+            leftover.extend(padded[cursor:start + 1].split())
+            cursor = start + length - 1
+            if ignored.isdisjoint(padded[start:start + length].split()):
+                positions.append(position)
+        leftover.extend(padded[cursor:].split())
+        
+        if any(word not in QUESTION_WORDS and word not in ignored for word in leftover):
+            return []
+        return self._unique(positions)
+
+def build_scanner(catalog: Optional[List[Dict[str, Any]]]) -> Optional[PhraseScanner]:
+    """
+    Build a scanner for a catalog, or None if the catalog is empty
+    
+    Args:
+        catalog: List of catalog entries from the RAG API
+    
+    Returns:
+        PhraseScanner instance, or None
+    """
+    if not catalog:
+        return None
+    return PhraseScanner(catalog)
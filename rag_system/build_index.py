@@ -0,0 +1,114 @@
+"""
+Offline build of the prebuilt index artifact for the G'Day Bot RAG system
+
+Usage:
+    python -m rag_system.build_index --output ./index_artifact
+
+The artifact directory holds everything a container needs to answer
+queries without embedding the dataset itself:
+
+- ``mmap_index/``: quantized vectors and records (see MmapVectorStore)
+- ``australianisms.json``: the catalog the vectors were built from
+- ``manifest.json``: version, fingerprint, model, embedding space, dtype,
+  dimensions and count
+"""
+import os
+import json
+import shutil
+import argparse
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, Optional
+from .embedding import EMBEDDING_MODEL, embedding_space
+from .storage import MmapVectorStore, MMAP_DTYPE, AustralianismsFile, replace_index_directory, sync_vector_store
+
+# Bumped whenever the artifact layout changes
+ARTIFACT_FORMAT = 1
+
+def build_index_artifact(
+    output_dir: str,
+    data_path: str = None,
+    dtype: str = MMAP_DTYPE,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Embed the dataset and write a self-contained index artifact
+    
+    The dataset is streamed from disk and embedded in chunks, so building
+    doesn't need memory for the whole dataset. Embeddings go through the
+    disk cache, so rebuilding after a small dataset edit only embeds the
+    changed records.
+    
+    Args:
+        output_dir: Directory to write the artifact to; an existing artifact
+            is replaced only once the new one is complete
+        data_path: Path to the australianisms JSON or JSON Lines file
+        dtype: Element type of the stored vectors, "int8" or "float16"
+        progress: Called as chunks of records are embedded and written
+    
+    Returns:
+        The artifact manifest
+    """
+    if data_path is None:
+        data_path = os.environ.get("AUSTRALIANISMS_PATH", "./data/australianisms.json")
+    
+    # Build next to the target, then swap, so a failed build leaves the old artifact
+    staging = os.path.abspath(output_dir) + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    
+    store = MmapVectorStore(os.path.join(staging, "mmap_index"), dtype)
+    report = sync_vector_store(store, AustralianismsFile(data_path), progress)
+    shutil.copyfile(data_path, os.path.join(staging, "australianisms.json"))
+    
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": report["fingerprint"][:12],
+        "fingerprint": report["fingerprint"],
+        "embedding_model": EMBEDDING_MODEL,
+        "embedding_space": embedding_space(),
+        "dtype": store.dtype,
+        "dimensions": store.meta["dimensions"],
+        "count": report["count"],
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    
+    # The old artifact is renamed aside before the new one moves in, never deleted first
+    replace_index_directory(staging, os.path.abspath(output_dir))
+    return manifest
+
+def load_manifest(artifact_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Read an artifact's manifest
+    
+    Args:
+        artifact_dir: Directory produced by build_index_artifact
+    
+    Returns:
+        The manifest, or None if the directory holds no artifact
+    """
+    try:
+        with open(os.path.join(artifact_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the prebuilt vector index artifact")
+    parser.add_argument("--output", default="./index_artifact", help="Artifact directory")
+    parser.add_argument("--data", default=None, help="Path to australianisms.json")
+    parser.add_argument("--dtype", default=MMAP_DTYPE, choices=["int8", "float16"])
+    args = parser.parse_args()
+    
+    def progress(counts: Dict[str, int]):
+        print(f"Embedded {counts['embedded']}/{counts['to_embed']} changed records ({counts['total']} total)")
+    
+    manifest = build_index_artifact(args.output, args.data, args.dtype, progress)
+    print(
+        f"Built index {manifest['version']} with {manifest['count']} entries "
+        f"({manifest['dtype']}, {manifest['dimensions']} dimensions) in {args.output}"
+    )
+
+if __name__ == "__main__":
+    main()
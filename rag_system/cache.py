@@ -0,0 +1,359 @@
+"""
+Embedding caches for the G'Day Bot RAG system
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Awaitable, Callable, Hashable
+
+# Constants
+CHROMA_DB_PATH = os.environ.get("CHROMA_DB_PATH", "./chroma_db")
+EMBEDDING_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(CHROMA_DB_PATH, "embedding_cache.sqlite3")
+)
+# Upper bound on stored vector bytes before least recently used rows are evicted
+EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get("EMBEDDING_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# In-memory query embedding cache settings
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", "3600"))
+# In-memory query result cache settings
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "4096"))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+def text_hash(text: str) -> str:
+    """
+    Content hash used to key cached embeddings
+    
+    Args:
+        text: The embedded text
+        
+    Returns:
+        Hex SHA-256 digest of the text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Disk-backed embedding cache keyed by (model name, text hash)
+    
+    Vectors are stored as packed float32 blobs in SQLite. When the total
+    stored size exceeds ``max_bytes`` the least recently used rows are
+    evicted.
+    """
+    
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+        # Create the directory if it doesn't exist
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+    
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings for several texts
+        
+        Args:
+            model: Embedding space (model name, plus any reduced dimensions)
+            texts: Texts to look up
+            
+        Returns:
+            List aligned with ``texts`` holding a vector or None on a miss
+        """
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        
+        with self._lock:
+            # Query in chunks to stay under SQLite's bound parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for row_hash, blob in rows:
+                    found[row_hash] = array("f", blob).tolist()
+            
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, row_hash) for row_hash in found]
+                )
+                self._conn.commit()
+            
+            results = [found.get(row_hash) for row_hash in hashes]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        
+        return results
+    
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """
+        Store embeddings for several texts, evicting old rows if over budget
+        
+        Args:
+            model: Embedding space (model name, plus any reduced dimensions)
+            texts: Texts that were embedded
+            vectors: Embedding vectors aligned with ``texts``
+        """
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = array("f", vector).tobytes()
+            rows.append((model, text_hash(text), blob, len(blob), now))
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def _evict(self):
+        """Delete least recently used rows until the cache fits in max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT model, text_hash, size FROM embeddings ORDER BY last_used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            
+            for model, row_hash, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE model = ? AND text_hash = ?",
+                    (model, row_hash)
+                )
+                total -= size
+                self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counters and storage size
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings"
+            ).fetchone()
+        
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+    
+    def close(self):
+        """Close the underlying SQLite connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache whose entries expire after a TTL
+    
+    Once ``capacity`` entries are stored, or the sizes given to ``put`` add
+    up to more than ``max_bytes``, least recently used entries are evicted
+    to make room. Expired entries are dropped when they are read.
+    """
+    
+    def __init__(self, capacity: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL, max_bytes: Optional[int] = None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a value, refreshing its recency
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            The cached value, or None on a miss or if the entry has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, expires_at, size = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any, size: int = 0):
+        """
+        Store a value, evicting least recently used entries if full
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            size: Bytes charged against ``max_bytes`` for this entry
+        """
+        if self.capacity <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            
+            while len(self._entries) > self.capacity or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counters and occupancy
+        """
+        with self._lock:
+            size = len(self._entries)
+            nbytes = self._bytes
+        
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": size,
+            "capacity": self.capacity,
+            "bytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+        }
+
+class SingleFlight:
+    """
+    Coalesces concurrent async computations that share a key
+    
+    The first caller for a key starts the computation; callers arriving
+    while it is in flight await the same task instead of starting their
+    own, and all of them receive the same result object (or exception).
+    The task is shielded, so one caller giving up doesn't cancel it for
+    the rest. Nothing is remembered once the task finishes.
+    """
+    
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._inflight = {}
+    
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``compute`` unless an identical computation is already running
+        
+        Args:
+            key: Identity of the computation
+            compute: Zero-argument coroutine function producing the result
+            
+        Returns:
+            The result of the shared computation
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.shared += 1
+        
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics
+        
+        Returns:
+            Dictionary with computations started, calls saved and calls in flight
+        """
+        total = self.calls + self.shared
+        return {
+            "computations": self.calls,
+            "saved_calls": self.shared,
+            "saved_rate": self.shared / total if total else 0.0,
+            "in_flight": len(self._inflight),
+        }
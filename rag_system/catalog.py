@@ -0,0 +1,678 @@
+"""
+In-memory phrase catalog for the G'Day Bot RAG system
+"""
+import os
+import re
+import json
+import math
+import heapq
+import random
+import threading
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, List, Any, Optional, Tuple
+from .storage import load_australianisms_data, bump_index_generation, record_ids
+
+# Apostrophes (straight and curly) are dropped so "g'day" matches "gday"
+_APOSTROPHES = re.compile(r"['‘’`]")
+# Any other punctuation separates words
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+# Minimum similarity (1 - edits / length) for a typo-tolerant match
+FUZZY_MIN_SCORE = float(os.environ.get("FUZZY_MIN_SCORE", "0.8"))
+# Stricter similarity for answering a typo before any search; a single edit
+# on a six-letter word ("jumped" -> "jumper") stays below it
+FUZZY_FAST_PATH_SCORE = float(os.environ.get("FUZZY_FAST_PATH_SCORE", "0.85"))
+# Shortest query corrected at all; one edit turns short words into other words ("dunno" -> "dunny")
+FUZZY_MIN_LENGTH = int(os.environ.get("FUZZY_MIN_LENGTH", "6"))
+# Shortest query allowed two edits
+FUZZY_TWO_EDIT_LENGTH = int(os.environ.get("FUZZY_TWO_EDIT_LENGTH", "8"))
+# Trigrams shared by more keys than this are skipped while gathering candidates
+FUZZY_MAX_POSTINGS = int(os.environ.get("FUZZY_MAX_POSTINGS", "1000"))
+
+# BM25 parameters
+BM25_K1 = float(os.environ.get("BM25_K1", "1.5"))
+BM25_B = float(os.environ.get("BM25_B", "0.75"))
+# Common question words that would otherwise match every usage example
+_STOPWORDS = {
+    "a", "an", "and", "are", "at", "do", "does", "for", "how", "i", "in", "is",
+    "it", "its", "me", "mean", "means", "meaning", "my", "of", "on", "or", "say",
+    "the", "this", "that", "to", "what", "whats", "word", "you", "your",
+}
+
+def normalize_phrase(text: str) -> str:
+    """
+    Normalize phrase text for exact lookups
+    
+    Args:
+        text: Phrase or query text
+    
+    Returns:
+        Lowercased text without apostrophes, punctuation or extra whitespace
+    """
+    text = _APOSTROPHES.sub("", text.lower())
+    text = _PUNCTUATION.sub(" ", text)
+    return " ".join(text.split())
+
+def _number_variants(normalized: str) -> List[str]:
+    """Singular and plural spellings of a normalized phrase"""
+    if normalized.endswith("es"):
+        return [normalized[:-2], normalized[:-1]]
+    if normalized.endswith("s"):
+        return [normalized[:-1]]
+    return [normalized + "s", normalized + "es"]
+
+class PhraseIndex:
+    """
+    Hash index from normalized phrases and aliases to catalog entries
+    
+    Each entry is reachable under its phrase, its aliases, and singular or
+    plural variants of those, so a lookup is a single dictionary probe.
+    Exact spellings take precedence over derived variants.
+    """
+    
+    def __init__(self, australianisms: List[Dict[str, Any]]):
+        self.lookups = 0
+        self.hits = 0
+        
+        exact = {}
+        variants = {}
+        for item in australianisms:
+            for name in [item["phrase"], *item.get("aliases", [])]:
+                normalized = normalize_phrase(name)
+                if not normalized:
+                    continue
+                exact.setdefault(normalized, item)
+                for variant in _number_variants(normalized):
+                    variants.setdefault(variant, item)
+        
+        self._entries = {**variants, **exact}
+    
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the catalog entry whose phrase or alias matches the query
+        
+        Args:
+            query: The search query
+        
+        Returns:
+            The matching australianism, or None
+        """
+        item = self._entries.get(normalize_phrase(query))
+        self.lookups += 1
+        if item is not None:
+            self.hits += 1
+        return item
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get fast-path statistics
+        
+        Returns:
+            Dictionary with lookup and hit counters
+        """
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "keys": len(self._entries),
+        }
+
+def _trigrams(text: str) -> List[str]:
+    """Distinct character trigrams of text, padded like pg_trgm"""
+    padded = f"  {text} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Levenshtein distance that gives up once it exceeds a bound
+    
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Largest distance worth computing exactly
+    
+    Returns:
+        The edit distance, or ``max_distance + 1`` if it is larger
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    
+    return previous[-1]
+
+class TrigramIndex:
+    """
+    Character-trigram inverted index for typo-tolerant phrase lookups
+    
+    Keys are normalized phrases and aliases, plus the longer words of
+    multi-word phrases when they belong to a single entry (so "dinkem"
+    finds "Fair dinkum"). A lookup counts shared trigrams over the
+    query's rarer posting lists, then confirms the best candidates with a
+    bounded edit distance. Short queries and keys are never corrected, and
+    two edits are only allowed on long queries, since a single edit turns
+    many short English words into slang terms. Lookups made before any
+    search (the fast path) need the stricter FUZZY_FAST_PATH_SCORE; those
+    made after a search found nothing (the fallback) need FUZZY_MIN_SCORE.
+    """
+    
+    def __init__(
+        self,
+        australianisms: List[Dict[str, Any]],
+        min_score: float = FUZZY_MIN_SCORE,
+        fast_path_score: float = FUZZY_FAST_PATH_SCORE
+    ):
+        self.min_score = min_score
+        self.fast_path_score = fast_path_score
+        self.lookups = 0
+        self.hits = 0
+        self.fallback_lookups = 0
+        self.fallback_hits = 0
+        self._keys = []
+        self._items = []
+        self._postings = defaultdict(list)
+        
+        entries = {}
+        words = defaultdict(set)
+        for position, item in enumerate(australianisms):
+            for name in [item["phrase"], *item.get("aliases", [])]:
+                normalized = normalize_phrase(name)
+                if not normalized:
+                    continue
+                entries.setdefault(normalized, position)
+                if " " in normalized:
+                    for word in normalized.split():
+                        words[word].add(position)
+        
+        # Words that identify exactly one entry become keys of their own
+        for word, positions in words.items():
+            if len(word) >= 5 and len(positions) == 1:
+                entries.setdefault(word, next(iter(positions)))
+        
+        for key, position in entries.items():
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._items.append(australianisms[position])
+            for trigram in _trigrams(key):
+                self._postings[trigram].append(key_id)
+        
+        self._max_key_length = max((len(key) for key in self._keys), default=0)
+    
+    def lookup(self, query: str, fallback: bool = False) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find the catalog entry closest to a possibly misspelled query
+        
+        Args:
+            query: The search query
+            fallback: The lookup follows a search that found nothing, so the
+                looser FUZZY_MIN_SCORE applies
+        
+        Returns:
+            Tuple of (matching australianism, similarity score), or None
+        """
+        if fallback:
+            self.fallback_lookups += 1
+        else:
+            self.lookups += 1
+        normalized = normalize_phrase(query)
+        
+        # Short queries are too ambiguous, long ones are sentences
+        if len(normalized) < FUZZY_MIN_LENGTH or len(normalized) > self._max_key_length + 2:
+            return None
+        
+        max_edits = 2 if len(normalized) >= FUZZY_TWO_EDIT_LENGTH else 1
+        
+        # Any key within max_edits shares all but 3 * max_edits of the query's
+        # trigrams, so it must appear in at least one of the 3 * max_edits + 1
+        # rarest posting lists; probing only those keeps lookups cheap even
+        # when common trigrams (like the leading "  g") have huge postings
+        postings = sorted(
+            (self._postings.get(trigram, []) for trigram in _trigrams(normalized)),
+            key=len
+        )
+        probed = [posting for posting in postings[:3 * max_edits + 1] if len(posting) <= FUZZY_MAX_POSTINGS]
+        counts = Counter(chain.from_iterable(probed or postings[:1]))
+        
+        best = None
+        best_score = 0.0
+        for key_id, _ in counts.most_common(10):
+            key = self._keys[key_id]
+            # Short keys are one edit from too many ordinary words ("cute" -> "ute", "late" -> "mate")
+            if len(key) < FUZZY_MIN_LENGTH - 1:
+                continue
+            distance = bounded_edit_distance(normalized, key, max_edits)
+            if distance > max_edits:
+                continue
+            
+            score = 1.0 - distance / max(len(normalized), len(key))
+            if score > best_score:
+                best, best_score = self._items[key_id], score
+        
+        if best is None or best_score < (self.min_score if fallback else self.fast_path_score):
+            return None
+        
+        if fallback:
+            self.fallback_hits += 1
+        else:
+            self.hits += 1
+        return best, best_score
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get fuzzy-match statistics
+        
+        Returns:
+            Dictionary with lookup and hit counters for the fast path and the fallback
+        """
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "fallback_lookups": self.fallback_lookups,
+            "fallback_hits": self.fallback_hits,
+            "keys": len(self._keys),
+        }
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lexical search terms
+    
+    Args:
+        text: Query or document text
+    
+    Returns:
+        Normalized terms without stopwords, with a trailing plural "s" removed
+    """
+    terms = []
+    for word in normalize_phrase(text).split():
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over phrase, aliases, meaning and usage example
+    
+    The phrase and aliases are counted twice so naming a term outweighs
+    merely appearing in an example sentence. Scores are divided by the
+    best score the query could reach, giving values between 0 and 1.
+    """
+    
+    def __init__(self, australianisms: List[Dict[str, Any]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._items = australianisms
+        self._postings = defaultdict(list)
+        self._lengths = []
+        
+        for position, item in enumerate(australianisms):
+            names = " ".join([item["phrase"], *item.get("aliases", [])])
+            tokens = tokenize(names) * 2 + tokenize(item["meaning"]) + tokenize(item["usage_example"])
+            self._lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self._postings[term].append((position, frequency))
+        
+        count = len(australianisms)
+        self._average_length = sum(self._lengths) / count if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self._postings.items()
+        }
+    
+    def search(self, query: str, limit: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank catalog entries by BM25 relevance to the query
+        
+        Args:
+            query: The search query
+            limit: Maximum number of results to return
+        
+        Returns:
+            List of (australianism, normalized score) tuples, best first
+        """
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._idf]
+        if not terms or limit <= 0:
+            return []
+        
+        scores = defaultdict(float)
+        for term in terms:
+            idf = self._idf[term]
+            for position, frequency in self._postings[term]:
+                length_norm = 1 - self.b + self.b * self._lengths[position] / self._average_length
+                scores[position] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+        
+        # Upper bound on the score, reached as term frequency grows
+        best_possible = sum(self._idf[term] * (self.k1 + 1) for term in terms)
+        top = heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+        return [(self._items[position], score / best_possible) for position, score in top]
+
+class RandomSampler:
+    """
+    Constant-time random draws from the catalog
+    
+    Weighted draws use Vose's alias method over each entry's optional
+    ``weight`` field (default 1.0): one table lookup and one coin flip per
+    draw, regardless of catalog size.
+    """
+    
+    def __init__(self, australianisms: List[Dict[str, Any]]):
+        self._items = australianisms
+        weights = [max(float(item.get("weight", 1.0)), 0.0) for item in australianisms]
+        self._probability, self._alias = _alias_table(weights)
+    
+    def sample(self, seed: Optional[int] = None, weighted: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Draw one entry
+        
+        Args:
+            seed: Seed for a reproducible draw, or None for a fresh one
+            weighted: Honour entry weights rather than drawing uniformly
+        
+        Returns:
+            A catalog entry, or None if the catalog is empty
+        """
+        if not self._items:
+            return None
+        
+        rng = random.Random(seed) if seed is not None else random
+        column = rng.randrange(len(self._items))
+        if weighted and rng.random() >= self._probability[column]:
+            column = self._alias[column]
+        return self._items[column]
+    
+    def __len__(self) -> int:
+        return len(self._items)
+
+def _alias_table(weights: List[float]) -> Tuple[List[float], List[int]]:
+    """
+    Build Vose's alias table for a list of weights
+    
+    Args:
+        weights: Non-negative weight per entry
+    
+    Returns:
+        (probability, alias) lists; column i keeps itself with probability[i],
+        otherwise it yields alias[i]
+    """
+    count = len(weights)
+    total = sum(weights)
+    probability = [1.0] * count
+    alias = list(range(count))
+    if not count or total <= 0:
+        return probability, alias
+    
+    scaled = [weight * count / total for weight in weights]
+    small = [i for i, value in enumerate(scaled) if value < 1.0]
+    large = [i for i, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        short, tall = small.pop(), large.pop()
+        probability[short] = scaled[short]
+        alias[short] = tall
+        scaled[tall] -= 1.0 - scaled[short]
+        (small if scaled[tall] < 1.0 else large).append(tall)
+    
+    # Whatever is left is 1.0 up to rounding error
+    return probability, alias
+
+class CatalogRecord:
+    """
+    A catalog entry reduced to the fields a match returns, checked once at load
+    
+    The JSON of the match, up to its score, is serialized when the record
+    is built, so answering a query only appends the score.
+    """
+    
+    __slots__ = ("id", "phrase", "meaning", "usage_example", "_prefix")
+    
+    def __init__(self, record_id: str, phrase: str, meaning: str, usage_example: str):
+        self.id = record_id
+        self.phrase = str(phrase)
+        self.meaning = str(meaning)
+        self.usage_example = str(usage_example)
+        fields = json.dumps({"phrase": self.phrase, "meaning": self.meaning, "usage_example": self.usage_example})
+        self._prefix = (fields[:-1] + ', "score": ').encode("utf-8")
+    
+    @classmethod
+    def from_item(cls, record_id: str, item: Dict[str, Any]) -> "CatalogRecord":
+        """Build a record from an australianism dictionary"""
+        return cls(record_id, item["phrase"], item["meaning"], item["usage_example"])
+    
+    @classmethod
+    def from_document(cls, record_id: str, document: str) -> "CatalogRecord":
+        """
+        Build a record from a document stored in the vector index
+        
+        Args:
+            record_id: ID of the indexed record
+            document: The record's JSON document
+        
+        Returns:
+            CatalogRecord; documents that aren't JSON keep their first line as the phrase
+        """
+        try:
+            return cls.from_item(record_id, json.loads(document))
+        except (json.JSONDecodeError, TypeError, KeyError):
+            return cls(record_id, document.split("\n")[0], "Unknown", "Unknown")
+    
+    def to_match(self, score: float, rrf_score: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Match dictionary for this record at a given score
+        
+        Args:
+            score: The retriever's own score (vector similarity, or BM25 for lexical hits)
+            rrf_score: Fused rank score, for hybrid results only
+        
+        Returns:
+            Match dictionary; ``rrf_score`` is only present when given
+        """
+        match = {
+            "phrase": self.phrase,
+            "meaning": self.meaning,
+            "usage_example": self.usage_example,
+            "score": score
+        }
+        if rrf_score is not None:
+            match["rrf_score"] = rrf_score
+        return match
+    
+    def to_json(self, score: float, rrf_score: Optional[float] = None) -> bytes:
+        """Serialized match, identical to ``json.dumps(self.to_match(score, rrf_score))``"""
+        if rrf_score is None:
+            return self._prefix + json.dumps(score).encode("utf-8") + b"}"
+        return (
+            self._prefix + json.dumps(score).encode("utf-8")
+            + b', "rrf_score": ' + json.dumps(rrf_score).encode("utf-8") + b"}"
+        )
+
+class RecordTable:
+    """
+    Catalog records keyed by vector index record ID
+    
+    Vector search only needs to return IDs and distances; the records
+    behind them are looked up here instead of being decoded from the
+    index's documents.
+    """
+    
+    def __init__(self, australianisms: List[Dict[str, Any]]):
+        self._records = {}
+        # The lookup indexes hand back the catalog's own dicts, so their
+        # records can be found by identity; the table keeps the list alive
+        self._australianisms = australianisms
+        self._by_item = {}
+        for record_id, item in zip(record_ids(australianisms), australianisms):
+            record = CatalogRecord.from_item(record_id, item)
+            self._records[record_id] = record
+            self._by_item[id(item)] = record
+    
+    def get(self, record_id: str) -> Optional[CatalogRecord]:
+        """
+        Look up a record by ID
+        
+        Args:
+            record_id: Vector index record ID
+        
+        Returns:
+            The record, or None if the catalog doesn't hold it
+        """
+        return self._records.get(record_id)
+    
+    def for_item(self, item: Dict[str, Any]) -> CatalogRecord:
+        """
+        Get the record of an entry returned by one of the lookup indexes
+        
+        Args:
+            item: Australianism dictionary from the catalog
+        
+        Returns:
+            The entry's record
+        """
+        record = self._by_item.get(id(item))
+        if record is None:
+            # Not from this catalog, e.g. an index built before a refresh
+            record = CatalogRecord.from_item(record_ids([item])[0], item)
+        return record
+    
+    def __len__(self) -> int:
+        return len(self._records)
+
+def serialize_matches(hits: List[Tuple[Any, ...]]) -> bytes:
+    """
+    Serialize scored records as a JSON match list
+    
+    Args:
+        hits: (record, score) pairs, best first; hybrid hits also carry
+            their fused rank score as a third element
+    
+    Returns:
+        The same bytes as ``json.dumps`` of the match dictionaries
+    """
+    return b"[" + b", ".join(record.to_json(*scores) for record, *scores in hits) + b"]"
+
+# Process-wide catalog and lookup indexes, built on first use
+_australianisms = None
+_phrase_index = None
+_trigram_index = None
+_bm25_index = None
+_random_sampler = None
+_record_table = None
+_lock = threading.Lock()
+
+def get_catalog() -> List[Dict[str, Any]]:
+    """
+    Get the in-memory list of australianisms, loading it on first use
+    
+    Returns:
+        List of dictionaries containing australianisms data
+    """
+    if _australianisms is None:
+        refresh_catalog()
+    
+    return _australianisms
+
+def get_phrase_index() -> PhraseIndex:
+    """
+    Get the shared phrase index, building it on first use
+    
+    Returns:
+        PhraseIndex over the australianisms data
+    """
+    if _phrase_index is None:
+        refresh_catalog()
+    
+    return _phrase_index
+
+def get_trigram_index() -> TrigramIndex:
+    """
+    Get the shared trigram index, building it on first use
+    
+    Returns:
+        TrigramIndex over the australianisms data
+    """
+    if _trigram_index is None:
+        refresh_catalog()
+    
+    return _trigram_index
+
+def get_bm25_index() -> BM25Index:
+    """
+    Get the shared BM25 index, building it on first use
+    
+    Returns:
+        BM25Index over the australianisms data
+    """
+    if _bm25_index is None:
+        refresh_catalog()
+    
+    return _bm25_index
+
+def get_random_sampler() -> RandomSampler:
+    """
+    Get the shared random sampler, building it on first use
+    
+    Returns:
+        RandomSampler over the australianisms data
+    """
+    if _random_sampler is None:
+        refresh_catalog()
+    
+    return _random_sampler
+
+def get_record_table() -> RecordTable:
+    """
+    Get the shared record table, building it on first use
+    
+    Returns:
+        RecordTable over the australianisms data
+    """
+    if _record_table is None:
+        refresh_catalog()
+    
+    return _record_table
+
+def refresh_catalog():
+    """
+    Rebuild the in-memory catalog structures from the australianisms data
+    """
+    global _australianisms, _phrase_index, _trigram_index, _bm25_index, _random_sampler, _record_table
+    
+    australianisms = load_australianisms_data()
+    phrase_index = PhraseIndex(australianisms)
+    trigram_index = TrigramIndex(australianisms)
+    bm25_index = BM25Index(australianisms)
+    random_sampler = RandomSampler(australianisms)
+    record_table = RecordTable(australianisms)
+    with _lock:
+        changed = australianisms != _australianisms
+        # Carry the counters over so metrics survive a refresh
+        for new, old in ((phrase_index, _phrase_index), (trigram_index, _trigram_index)):
+            if old is not None:
+                new.lookups = old.lookups
+                new.hits = old.hits
+        _australianisms = australianisms
+        _phrase_index = phrase_index
+        _trigram_index = trigram_index
+        _bm25_index = bm25_index
+        _random_sampler = random_sampler
+        _record_table = record_table
+    
+    # Fast-path answers come from the catalog, so cached results are stale too
+    if changed:
+        bump_index_generation()
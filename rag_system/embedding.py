@@ -2,28 +2,345 @@
 Embedding generation for the G'Day Bot RAG system
 """
 import os
-from typing import List
+import time
+import asyncio
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from .cache import EmbeddingCache, LRUCache
+from .metrics import record_provider_request
 
 # Load environment variables for API access
 load_dotenv()
 
 # Constants
 EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")
+# Native output size of the supported OpenAI models
+NATIVE_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+# Models whose vectors can be shortened (by the API or by truncation); older
+# models such as ada-002 reject ``dimensions`` and don't survive truncation
+REDUCIBLE_MODELS = {"text-embedding-3-small", "text-embedding-3-large"}
+# Output size of the stored and query embeddings; below the native size
+# trades some recall for less memory and faster search. Required for models
+# not listed above, where it declares the model's output size
+EMBEDDING_DIMENSIONS = int(os.environ.get(
+    "EMBEDDING_DIMENSIONS", str(NATIVE_DIMENSIONS.get(EMBEDDING_MODEL, 0))
+))
+# How reduced embeddings are produced: "provider" asks the API for them via its
+# ``dimensions`` parameter, "truncate" cuts full vectors locally and renormalizes
+EMBEDDING_DIMENSIONS_METHOD = os.environ.get("EMBEDDING_DIMENSIONS_METHOD", "provider").lower()
+# Number of texts sent per embeddings request (OpenAI accepts up to 2048)
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "512"))
+EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+# Maximum embedding requests in flight at once from the async path
+EMBEDDING_CONCURRENCY = int(os.environ.get("EMBEDDING_CONCURRENCY", "16"))
+# Micro-batching of concurrent async query embeddings: while a request is in
+# flight, new queries wait up to the window (or until max items) and share one
+EMBEDDING_MICROBATCH_ENABLED = os.environ.get("EMBEDDING_MICROBATCH_ENABLED", "true").lower() == "true"
+EMBEDDING_MICROBATCH_WINDOW_MS = float(os.environ.get("EMBEDDING_MICROBATCH_WINDOW_MS", "2"))
+EMBEDDING_MICROBATCH_MAX_ITEMS = int(os.environ.get("EMBEDDING_MICROBATCH_MAX_ITEMS", "256"))
+
+# Shared clients so each embedding call doesn't build a new connection pool
+_client = None
+_async_client = None
+# One semaphore and query batcher per event loop, since asyncio primitives are loop-bound
+_semaphores = weakref.WeakKeyDictionary()
+_batchers = weakref.WeakKeyDictionary()
+# Shared disk cache, opened on first use
+_cache = None
+# In-memory cache of recent query embeddings
+query_cache = LRUCache()
+
+def validate_embedding_settings(model: str, dimensions: int, method: str):
+    """
+    Reject embedding settings the provider can't honour, before anything is embedded
+    
+    Args:
+        model: Embedding model name
+        dimensions: Configured output size
+        method: How reduced embeddings are produced, "provider" or "truncate"
+    """
+    if method not in ("provider", "truncate"):
+        raise ValueError(f"Unknown EMBEDDING_DIMENSIONS_METHOD: {method}")
+    native = NATIVE_DIMENSIONS.get(model)
+    if native is None:
+        if dimensions < 1:
+            raise ValueError(f"Set EMBEDDING_DIMENSIONS to the output size of {model}")
+        return
+    if not 1 <= dimensions <= native:
+        raise ValueError(f"EMBEDDING_DIMENSIONS must be between 1 and {native} for {model}, got {dimensions}")
+    if dimensions < native and model not in REDUCIBLE_MODELS:
+        raise ValueError(f"{model} can't produce reduced embeddings; unset EMBEDDING_DIMENSIONS or use {native}")
+
+# Fail at startup rather than with a provider error (or mis-sized vectors) on the first request
+validate_embedding_settings(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, EMBEDDING_DIMENSIONS_METHOD)
+
+class EmbeddingError(RuntimeError):
+    """The embedding provider failed to embed some texts"""
 
 def get_openai_client():
     """
-    Initialize and return an OpenAI client
+    Initialize and return a shared OpenAI client
     
     Returns:
         OpenAI client instance
     """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    global _client
+    
+    if _client is None:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        
+        _client = OpenAI(api_key=api_key)
+    
+    return _client
+
+def set_openai_client(client):
+    """
+    Replace the shared OpenAI client, e.g. with a local fake provider in tests
+    
+    Args:
+        client: Object exposing ``embeddings.create(input=..., model=...)``,
+            or None to reset to the default client
+    """
+    global _client
+    _client = client
+
+def get_async_openai_client():
+    """
+    Initialize and return a shared asynchronous OpenAI client
+    
+    Returns:
+        AsyncOpenAI client instance
+    """
+    global _async_client
+    
+    if _async_client is None:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        
+        _async_client = AsyncOpenAI(api_key=api_key)
+    
+    return _async_client
+
+def set_async_openai_client(client):
+    """
+    Replace the shared asynchronous OpenAI client
+    
+    Args:
+        client: Object exposing an awaitable ``embeddings.create(input=..., model=...)``,
+            or None to reset to the default client
+    """
+    global _async_client
+    _async_client = client
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Get the embedding concurrency limiter for the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+    return semaphore
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get the shared disk embedding cache
+    
+    Returns:
+        EmbeddingCache instance, or None if caching is disabled
+    """
+    global _cache
+    
+    if _cache is None and EMBEDDING_CACHE_ENABLED:
+        _cache = EmbeddingCache()
+    
+    return _cache
+
+def set_embedding_cache(cache: Optional[EmbeddingCache]):
+    """
+    Replace the shared disk embedding cache
+    
+    Args:
+        cache: EmbeddingCache instance, or None to reopen the default cache
+    """
+    global _cache
+    _cache = cache
+
+def _reduced_dimensions() -> Optional[int]:
+    """The configured output size, or None when the model's native size is used"""
+    native = NATIVE_DIMENSIONS.get(EMBEDDING_MODEL)
+    if native is None or EMBEDDING_DIMENSIONS >= native:
+        return None
+    return EMBEDDING_DIMENSIONS
+
+def embedding_dimensions() -> int:
+    """Length of the vectors actually produced by the current settings"""
+    return _reduced_dimensions() or NATIVE_DIMENSIONS.get(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS)
+
+def embedding_space() -> str:
+    """
+    Identify the vector space produced by the current embedding settings
+    
+    Vectors are only comparable within one space, so this is stored with
+    the index and mixed into cache keys.
+    
+    Returns:
+        The model name, suffixed with ``@<dimensions>`` for reduced embeddings
+    """
+    dimensions = _reduced_dimensions()
+    if dimensions is None:
+        return EMBEDDING_MODEL
+    return f"{EMBEDDING_MODEL}@{dimensions}"
+
+def truncate_embedding(vector: List[float], dimensions: int) -> List[float]:
+    """
+    Shorten an embedding to its leading dimensions and rescale it to unit length
+    
+    OpenAI's text-embedding-3 models are trained so that a prefix of the
+    vector is itself a usable embedding, which is what their ``dimensions``
+    parameter returns.
+    
+    Args:
+        vector: Full embedding vector
+        dimensions: Number of leading dimensions to keep
+        
+    Returns:
+        Truncated, renormalized vector
+    """
+    head = vector[:dimensions]
+    norm = sum(value * value for value in head) ** 0.5
+    if not norm:
+        return list(head)
+    return [value / norm for value in head]
+
+def _create_options() -> Dict[str, Any]:
+    """Keyword arguments for ``embeddings.create``"""
+    options = {"model": EMBEDDING_MODEL}
+    dimensions = _reduced_dimensions()
+    if dimensions is not None and EMBEDDING_DIMENSIONS_METHOD == "provider":
+        options["dimensions"] = dimensions
+    return options
+
+def _finish_embeddings(vectors: List[List[float]]) -> List[List[float]]:
+    """Apply local truncation to provider output when configured"""
+    dimensions = _reduced_dimensions()
+    if dimensions is None or EMBEDDING_DIMENSIONS_METHOD == "provider":
+        return list(vectors)
+    return [truncate_embedding(vector, dimensions) for vector in vectors]
+
+def _request_embeddings(texts: List[str], batch_size: int) -> List[Optional[List[float]]]:
+    """
+    Request embeddings from the provider in chunks
+    
+    Args:
+        texts: The texts to embed
+        batch_size: Maximum number of texts sent in a single request
+        
+    Returns:
+        List of embedding vectors aligned with ``texts``; entries are None
+        for chunks whose request failed
+    """
+    client = get_openai_client()
+    embeddings = []
+    
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        started = time.perf_counter()
+        
+        try:
+            # Request embeddings for the whole chunk in one round trip
+            response = client.embeddings.create(
+                input=chunk,
+                **_create_options()
+            )
+            record_provider_request(time.perf_counter() - started, len(chunk), ok=True)
+            
+            # The API tags each result with its input index, so sort on it
+            # rather than relying on response order
+            data = sorted(response.data, key=lambda item: item.index)
+            embeddings.extend(_finish_embeddings([item.embedding for item in data]))
+        except Exception as e:
+            record_provider_request(time.perf_counter() - started, len(chunk), ok=False)
+            print(f"Error generating embeddings: {str(e)}")
+            embeddings.extend(None for _ in chunk)
+    
+    return embeddings
+
+def _lookup_cached(texts: List[str]) -> List[Optional[List[float]]]:
+    """Serve what we can from the disk cache; misses come back as None"""
+    cache = get_embedding_cache()
+    if cache is None:
+        return [None] * len(texts)
+    return cache.get_many(embedding_space(), texts)
+
+def _merge_fetched(
+    embeddings: List[Optional[List[float]]],
+    missing: List[int],
+    missing_texts: List[str],
+    fetched: List[Optional[List[float]]],
+    strict: bool = False
+):
+    """
+    Cache freshly fetched embeddings and fill them into ``embeddings``
+    
+    Args:
+        embeddings: Embeddings being assembled, updated in place
+        missing: Positions in ``embeddings`` that were fetched
+        missing_texts: Texts at those positions
+        fetched: Provider results, None where a request failed
+        strict: Raise on failed requests instead of filling in zeros
+    """
+    cache = get_embedding_cache()
+    
+    # Only cache real embeddings, never the error fallback
+    if cache is not None:
+        ok = [(text, vector) for text, vector in zip(missing_texts, fetched) if vector is not None]
+        if ok:
+            cache.put_many(embedding_space(), [text for text, _ in ok], [vector for _, vector in ok])
+    
+    failed = sum(vector is None for vector in fetched)
+    if strict and failed:
+        raise EmbeddingError(f"Embedding provider failed for {failed} of {len(fetched)} texts")
+    
+    for i, vector in zip(missing, fetched):
+        # Fall back to a dummy embedding in case of error (all zeros)
+        # In production, you'd want better error handling
+        embeddings[i] = vector if vector is not None else [0.0] * embedding_dimensions()
+
+def generate_embeddings(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    strict: bool = False
+) -> List[List[float]]:
+    """
+    Generate embedding vectors for many texts using batched OpenAI requests
+    
+    Args:
+        texts: The texts to generate embeddings for
+        batch_size: Maximum number of texts sent in a single request
+        strict: Raise EmbeddingError if any request fails, rather than
+            returning all-zero vectors for its texts; indexing and search
+            use this so a failure is never stored or searched with
+        
+    Returns:
+        List of embedding vectors, in the same order as ``texts``
+    """
+    embeddings = _lookup_cached(texts)
+    
+    missing = [i for i, vector in enumerate(embeddings) if vector is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fetched = _request_embeddings(missing_texts, batch_size)
+        _merge_fetched(embeddings, missing, missing_texts, fetched, strict)
     
-    return OpenAI(api_key=api_key)
+    return embeddings
 
 def generate_embedding(text: str) -> List[float]:
     """
@@ -35,21 +352,296 @@ def generate_embedding(text: str) -> List[float]:
     Returns:
         List of floats representing the embedding vector
     """
-    client = get_openai_client()
+    return generate_embeddings([text])[0]
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize query text so trivially different queries share cache entries
     
-    try:
-        # Request the embedding from OpenAI
-        response = client.embeddings.create(
-            input=text,
-            model=EMBEDDING_MODEL
-        )
+    Args:
+        query: Raw query text
         
-        # Extract the embedding vector from the response
-        embedding = response.data[0].embedding
+    Returns:
+        Lowercased query with collapsed whitespace
+    """
+    return " ".join(query.lower().split())
+
+def _cached_queries(queries: List[str]):
+    """
+    Split queries into in-memory cache hits and distinct texts still to embed
+    
+    Returns:
+        Tuple of (normalized queries, embeddings with None for misses,
+        distinct normalized texts that missed)
+    """
+    normalized = [normalize_query(query) for query in queries]
+    space = embedding_space()
+    embeddings = [query_cache.get((space, text)) for text in normalized]
+    
+    # Embed each distinct missing text once, even if repeated in the batch
+    missing = list(dict.fromkeys(
+        text for text, vector in zip(normalized, embeddings) if vector is None
+    ))
+    return normalized, embeddings, missing
+
+def _fill_queries(
+    normalized: List[str],
+    embeddings: List[Optional[List[float]]],
+    missing: List[str],
+    fetched: List[List[float]]
+) -> List[List[float]]:
+    """Cache freshly embedded queries and fill them into ``embeddings``"""
+    by_text = dict(zip(missing, fetched))
+    for text, vector in by_text.items():
+        query_cache.put((embedding_space(), text), vector)
+    
+    return [
+        vector if vector is not None else by_text[text]
+        for text, vector in zip(normalized, embeddings)
+    ]
+
+def embed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    Generate embeddings for several search queries in one provider call
+    
+    A failed provider request raises EmbeddingError rather than returning
+    a zero vector, which would match every record about equally.
+    
+    Args:
+        queries: The search queries
         
-        return embedding
-    except Exception as e:
-        print(f"Error generating embedding: {str(e)}")
-        # Return a dummy embedding in case of error (all zeros)
-        # In production, you'd want better error handling
-        return [0.0] * 1536  # Default embedding size for OpenAI models
\ No newline at end of file
+    Returns:
+        List of embedding vectors, in the same order as ``queries``
+    """
+    normalized, embeddings, missing = _cached_queries(queries)
+    fetched = generate_embeddings(missing, strict=True) if missing else []
+    return _fill_queries(normalized, embeddings, missing, fetched)
+
+def embed_query(query: str) -> List[float]:
+    """
+    Generate an embedding for a search query, using the in-memory query cache
+    
+    Args:
+        query: The search query
+        
+    Returns:
+        List of floats representing the embedding vector
+    """
+    return embed_queries([query])[0]
+
+async def _arequest_embeddings(texts: List[str], batch_size: int) -> List[Optional[List[float]]]:
+    """
+    Request embeddings from the provider in concurrent chunks
+    
+    Args:
+        texts: The texts to embed
+        batch_size: Maximum number of texts sent in a single request
+        
+    Returns:
+        List of embedding vectors aligned with ``texts``; entries are None
+        for chunks whose request failed
+    """
+    client = get_async_openai_client()
+    semaphore = _get_semaphore()
+    
+    async def request_chunk(chunk: List[str]) -> List[Optional[List[float]]]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.embeddings.create(
+                    input=chunk,
+                    **_create_options()
+                )
+                record_provider_request(time.perf_counter() - started, len(chunk), ok=True)
+                data = sorted(response.data, key=lambda item: item.index)
+                return _finish_embeddings([item.embedding for item in data])
+            except Exception as e:
+                record_provider_request(time.perf_counter() - started, len(chunk), ok=False)
+                print(f"Error generating embeddings: {str(e)}")
+                return [None] * len(chunk)
+    
+    chunks = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    results = await asyncio.gather(*(request_chunk(chunk) for chunk in chunks))
+    return [vector for chunk_result in results for vector in chunk_result]
+
+async def agenerate_embeddings(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    strict: bool = False
+) -> List[List[float]]:
+    """
+    Asynchronous version of generate_embeddings that never blocks the event loop
+    
+    Args:
+        texts: The texts to generate embeddings for
+        batch_size: Maximum number of texts sent in a single request
+        strict: Raise EmbeddingError if any request fails instead of
+            returning all-zero vectors
+        
+    Returns:
+        List of embedding vectors, in the same order as ``texts``
+    """
+    # SQLite access is blocking, so keep it off the event loop
+    embeddings = await asyncio.to_thread(_lookup_cached, texts)
+    
+    missing = [i for i, vector in enumerate(embeddings) if vector is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fetched = await _arequest_embeddings(missing_texts, batch_size)
+        await asyncio.to_thread(_merge_fetched, embeddings, missing, missing_texts, fetched, strict)
+    
+    return embeddings
+
+class QueryBatcher:
+    """
+    Collects query texts from concurrent callers into multi-input embedding requests
+    
+    When no batch is in flight a query is sent on the next event loop turn,
+    so an idle server adds no latency (callers arriving in the same turn
+    still share the request). While batches are in flight, new queries wait
+    up to ``window`` seconds, or until ``max_items`` are queued, and then go
+    out together. Once ``max_in_flight`` batches are outstanding, queries
+    queue until one finishes, so batches grow with load instead of piling
+    up behind the provider. Each caller gets its own vector back.
+    """
+    
+    def __init__(
+        self,
+        window: float = EMBEDDING_MICROBATCH_WINDOW_MS / 1000,
+        max_items: int = EMBEDDING_MICROBATCH_MAX_ITEMS,
+        max_in_flight: int = EMBEDDING_CONCURRENCY
+    ):
+        self.window = window
+        self.max_items = max(1, max_items)
+        self.max_in_flight = max(1, max_in_flight)
+        self.batches = 0
+        self.items = 0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer = None
+        self._in_flight = 0
+        self._tasks = set()
+    
+    async def embed(self, text: str) -> List[float]:
+        """
+        Queue a text for the next batch and wait for its embedding
+        
+        Args:
+            text: Normalized query text
+            
+        Returns:
+            List of floats representing the embedding vector
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        
+        # When saturated, the next batch leaves as soon as one in flight completes
+        if self._in_flight < self.max_in_flight:
+            if len(self._pending) >= self.max_items:
+                self._flush()
+            elif self._timer is None:
+                delay = self.window if self._in_flight else 0
+                self._timer = loop.call_later(delay, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Send queued texts, as many batches as there is room for"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        while self._pending and self._in_flight < self.max_in_flight:
+            batch = self._pending[:self.max_items]
+            self._pending = self._pending[self.max_items:]
+            self._in_flight += 1
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Embed one batch and hand each waiting caller its vector"""
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            vectors = dict(zip(texts, await agenerate_embeddings(texts, strict=True)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for text, future in batch:
+                # Callers that gave up have cancelled their future
+                if not future.done():
+                    future.set_result(vectors[text])
+        finally:
+            self._in_flight -= 1
+            # Whatever queued up while saturated goes out now
+            if self._pending and self._timer is None:
+                self._flush()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching statistics
+        
+        Returns:
+            Dictionary with batches sent, queries embedded and mean batch size
+        """
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "pending": len(self._pending),
+            "in_flight": self._in_flight,
+            "window_ms": self.window * 1000,
+            "max_items": self.max_items,
+        }
+
+def get_query_batcher() -> QueryBatcher:
+    """
+    Get the query batcher for the running event loop
+    
+    Returns:
+        QueryBatcher instance
+    """
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = QueryBatcher()
+    return batcher
+
+async def aembed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    Asynchronous version of embed_queries
+    
+    Queries missing from the in-memory cache go through the micro-batcher,
+    so concurrent callers share embedding requests.
+    
+    Args:
+        queries: The search queries
+        
+    Returns:
+        List of embedding vectors, in the same order as ``queries``
+    """
+    normalized, embeddings, missing = _cached_queries(queries)
+    if not missing:
+        fetched = []
+    elif EMBEDDING_MICROBATCH_ENABLED:
+        batcher = get_query_batcher()
+        fetched = await asyncio.gather(*(batcher.embed(text) for text in missing))
+    else:
+        fetched = await agenerate_embeddings(missing, strict=True)
+    return _fill_queries(normalized, embeddings, missing, fetched)
+
+async def aembed_query(query: str) -> List[float]:
+    """
+    Asynchronous version of embed_query
+    
+    Args:
+        query: The search query
+        
+    Returns:
+        List of floats representing the embedding vector
+    """
+    return (await aembed_queries([query]))[0]
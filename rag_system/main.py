@@ -2,43 +2,105 @@
 FastAPI app for the G'Day Bot RAG system
 """
 import os
-from typing import Dict, List, Optional
-from fastapi import FastAPI, HTTPException
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 import uvicorn
 
 # Import these directly to avoid circular imports
 try:
-    from .retrieval import search_australianisms
-    from .storage import get_chroma_client, init_collection
+    from .retrieval import (
+        Hit, asearch_hits, asearch_hits_batch, get_random_australianism,
+        result_cache, result_cache_key, query_flights
+    )
+    from .storage import init_vector_store, warm_vector_store, index_status, index_generation
+    from .embedding import EmbeddingError, query_cache, get_embedding_cache, get_query_batcher
+    from .catalog import get_catalog, get_phrase_index, get_trigram_index, refresh_catalog, serialize_matches
+    from .metrics import MetricsMiddleware, registry, stage
 except ImportError:
     # For direct execution
-    from retrieval import search_australianisms
-    from storage import get_chroma_client, init_collection
+    from retrieval import (
+        Hit, asearch_hits, asearch_hits_batch, get_random_australianism,
+        result_cache, result_cache_key, query_flights
+    )
+    from storage import init_vector_store, warm_vector_store, index_status, index_generation
+    from embedding import EmbeddingError, query_cache, get_embedding_cache, get_query_batcher
+    from catalog import get_catalog, get_phrase_index, get_trigram_index, refresh_catalog, serialize_matches
+    from metrics import MetricsMiddleware, registry, stage
+
+# Largest number of queries accepted by /query/batch
+MAX_BATCH_QUERIES = int(os.environ.get("MAX_BATCH_QUERIES", "100"))
+# Seconds clients may reuse a query response before revalidating it
+RESULT_CACHE_MAX_AGE = int(os.environ.get("RESULT_CACHE_MAX_AGE", "60"))
+# Finished /init jobs kept for the status endpoint
+INIT_JOB_HISTORY = int(os.environ.get("INIT_JOB_HISTORY", "20"))
+
+# /init jobs by ID, oldest first, and the tasks running them
+init_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_init_tasks = set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the vector store once at startup so queries start warm"""
+    try:
+        count = warm_vector_store()
+        print(f"Vector store warm with {count} entries")
+        refresh_catalog()
+    except Exception as e:
+        # Keep serving; /ready reports not ready and queries retry the warm-up
+        print(f"Error warming vector store: {str(e)}")
+    yield
 
 # Define the FastAPI app
 # Important: This needs to be named 'app' to match the import in modal_wrapper.py
 app = FastAPI(
     title="G'Day Bot RAG API",
     description="API for retrieving Australian slang and phrases",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
+# Per-request latency metrics and Server-Timing headers
+app.add_middleware(MetricsMiddleware)
 
 # Define request/response models
 class QueryRequest(BaseModel):
     query: str
     max_results: Optional[int] = 3
     threshold: Optional[float] = 0.7
+    # Retrieval strategy; None uses the server's RETRIEVAL_MODE
+    mode: Optional[Literal["vector", "lexical", "hybrid"]] = None
 
 class AustralianismMatch(BaseModel):
     phrase: str
     meaning: str
     usage_example: str
+    # Vector similarity, or the BM25 score of a lexical match
     score: float
+    # Fused rank score that orders hybrid results; absent in other modes
+    rrf_score: Optional[float] = None
+
+class RandomResponse(BaseModel):
+    phrase: str
+    meaning: str
+    usage_example: str
 
 class QueryResponse(BaseModel):
     matches: List[AustralianismMatch]
     query: str
+
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest]
+
+class BatchQueryResponse(BaseModel):
+    results: List[QueryResponse]
     
 # Health check endpoint
 @app.get("/health")
@@ -46,38 +108,397 @@ async def health_check():
     """Check if the API is running"""
     return {"status": "healthy"}
 
+# Readiness endpoint
+@app.get("/ready")
+async def readiness_check():
+    """Check if the index is loaded and ready to serve queries"""
+    status = index_status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming", **status})
+    return {"status": "ready", **status}
+
+# Catalog endpoint
+@app.get("/catalog")
+async def catalog():
+    """List every known phrase, e.g. for clients that match terms locally"""
+    australianisms = get_catalog()
+    return {
+        "phrases": [
+            {
+                "phrase": item["phrase"],
+                "meaning": item["meaning"],
+                "usage_example": item["usage_example"],
+                "aliases": item.get("aliases", [])
+            }
+            for item in australianisms
+        ],
+        "count": len(australianisms)
+    }
+
+# Cache statistics endpoint
+@app.get("/stats")
+async def stats():
+    """Report embedding cache hit rates"""
+    embedding_cache = get_embedding_cache()
+    return {
+        "query_embedding_cache": query_cache.stats(),
+        "query_embedding_batcher": get_query_batcher().stats(),
+        "exact_match_fast_path": get_phrase_index().stats(),
+        "fuzzy_match_fast_path": get_trigram_index().stats(),
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None,
+        "query_result_cache": result_cache.stats(),
+        "query_coalescing": query_flights.stats(),
+        "index_generation": index_generation()
+    }
+
+def collect_runtime_metrics():
+    """
+    Export the counters kept by caches, fast paths and the batcher
+    
+    Returns:
+        (name, kind, help, samples) tuples for the metrics registry
+    """
+    embedding_cache = get_embedding_cache()
+    caches = {
+        "query_embedding": query_cache.stats(),
+        "query_result": result_cache.stats(),
+    }
+    if embedding_cache is not None:
+        caches["embedding_disk"] = embedding_cache.stats()
+    fast_paths = {"exact": get_phrase_index().stats(), "fuzzy": get_trigram_index().stats()}
+    batcher = get_query_batcher().stats()
+    status = index_status()
+    
+    return [
+        ("rag_cache_hits_total", "counter", "Cache lookups that hit",
+         [({"cache": name}, stats["hits"]) for name, stats in caches.items()]),
+        ("rag_cache_misses_total", "counter", "Cache lookups that missed",
+         [({"cache": name}, stats["misses"]) for name, stats in caches.items()]),
+        ("rag_fast_path_lookups_total", "counter", "Queries tried against a catalog fast path",
+         [({"path": name}, stats["lookups"]) for name, stats in fast_paths.items()]),
+        ("rag_fast_path_hits_total", "counter", "Queries answered by a catalog fast path",
+         [({"path": name}, stats["hits"]) for name, stats in fast_paths.items()]),
+        ("rag_fuzzy_fallback_lookups_total", "counter", "Searches with no hits retried as a typo",
+         [({}, fast_paths["fuzzy"]["fallback_lookups"])]),
+        ("rag_fuzzy_fallback_hits_total", "counter", "Searches with no hits answered by a typo match",
+         [({}, fast_paths["fuzzy"]["fallback_hits"])]),
+        ("rag_coalesced_queries_total", "counter", "Queries that shared an identical in-flight search",
+         [({}, query_flights.stats()["saved_calls"])]),
+        ("rag_embedding_batches_total", "counter", "Micro-batched query embedding requests",
+         [({}, batcher["batches"])]),
+        ("rag_embedding_batch_items_total", "counter", "Queries embedded through the micro-batcher",
+         [({}, batcher["items"])]),
+        ("rag_index_records", "gauge", "Records in the served vector index",
+         [({"backend": status["backend"]}, status["count"])]),
+        ("rag_index_generation", "gauge", "Current index generation",
+         [({}, index_generation())]),
+    ]
+
+registry.add_collector(collect_runtime_metrics)
+
+# Prometheus metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """Expose request, stage, cache and provider metrics in the Prometheus text format"""
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+# Random phrase endpoint
+@app.get("/random", response_model=RandomResponse)
+async def random_phrase(seed: Optional[int] = None, weighted: bool = True):
+    """Draw a random australianism from the in-memory catalog"""
+    item = get_random_australianism(seed=seed, weighted=weighted)
+    if item is None:
+        raise HTTPException(status_code=503, detail="Catalog is empty")
+    
+    return {
+        "phrase": item["phrase"],
+        "meaning": item["meaning"],
+        "usage_example": item["usage_example"]
+    }
+
+def response_etag(body: bytes) -> str:
+    """Strong validator for a serialized response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def cached_response(request: Request, body: bytes) -> Response:
+    """
+    Wrap a serialized JSON body for GET with validators, answering 304 if the client's copy is current
+    
+    Args:
+        request: Incoming GET request, checked for If-None-Match
+        body: Serialized response body
+        
+    Returns:
+        JSON response carrying ETag and Cache-Control headers
+    """
+    etag = response_etag(body)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={RESULT_CACHE_MAX_AGE}"}
+    
+    if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    # Weak comparison, as RFC 9110 specifies for If-None-Match
+    if "*" in if_none_match or etag in (tag[2:] if tag.startswith("W/") else tag for tag in if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def tagged_response(body: bytes) -> Response:
+    """
+    Wrap a serialized JSON body for POST with an ETag
+    
+    POST responses aren't reused by caches, and a matching If-None-Match
+    on POST would call for 412 rather than 304, so the ETag is only
+    informational here; clients revalidate through GET /query.
+    
+    Args:
+        body: Serialized response body
+        
+    Returns:
+        JSON response carrying an ETag header
+    """
+    return Response(content=body, media_type="application/json", headers={"ETag": response_etag(body)})
+
+def cached_matches(item: QueryRequest) -> Tuple[Tuple, Optional[bytes]]:
+    """
+    Look up the serialized matches of a query in the result cache
+    
+    Args:
+        item: Query request
+        
+    Returns:
+        Tuple of the cache key and the cached JSON match list, or None on a miss
+    """
+    with stage("result_cache"):
+        key = result_cache_key(item.query, item.max_results, item.threshold, item.mode)
+        return key, result_cache.get(key)
+
+def store_matches(key: Tuple, hits: List[Hit]) -> bytes:
+    """
+    Serialize a hit list and cache it under its request key
+    
+    Each record's JSON is prepared when the catalog loads, so this only
+    joins fragments and scores. Empty lists aren't cached: an index that
+    is cold or mid-failure also returns nothing, and that should not
+    outlive it. A provider outage raises EmbeddingError before this point,
+    so its results never reach the cache.
+    
+    Args:
+        key: Result cache key
+        hits: (record, score) pairs returned by retrieval
+        
+    Returns:
+        The JSON match list
+    """
+    with stage("serialize"):
+        fragment = serialize_matches(hits)
+    if hits:
+        result_cache.put(key, fragment, size=len(fragment))
+    return fragment
+
+async def query_body(request: QueryRequest) -> bytes:
+    """
+    Answer a query as a serialized QueryResponse body
+    
+    Args:
+        request: Query request
+        
+    Returns:
+        The JSON response body
+    """
+    key, fragment = cached_matches(request)
+    if fragment is None:
+        hits = await asearch_hits(
+            query=request.query,
+            max_results=request.max_results,
+            threshold=request.threshold,
+            mode=request.mode
+        )
+        fragment = store_matches(key, hits)
+    
+    return b'{"matches":' + fragment + b',"query":' + json.dumps(request.query).encode("utf-8") + b"}"
+
 # Query endpoint
 @app.post("/query", response_model=QueryResponse)
 async def query(request: QueryRequest):
     """Query the australianisms database for matches"""
     try:
-        matches = search_australianisms(
-            query=request.query,
-            max_results=request.max_results,
-            threshold=request.threshold
-        )
+        return tagged_response(await query_body(request))
+    except EmbeddingError as e:
+        # Searching without a query vector would return arbitrary matches
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
         
-        return {
-            "matches": matches,
-            "query": request.query
-        }
+# Cacheable query endpoint
+@app.get("/query", response_model=QueryResponse)
+async def query_get(
+    http_request: Request,
+    q: str,
+    max_results: int = 3,
+    threshold: float = 0.7,
+    mode: Optional[Literal["vector", "lexical", "hybrid"]] = None
+):
+    """
+    Query the australianisms database, with responses browsers and caches can reuse
+    
+    Responses carry an ETag and Cache-Control, and If-None-Match with a
+    current ETag is answered 304 Not Modified.
+    """
+    request = QueryRequest(query=q, max_results=max_results, threshold=threshold, mode=mode)
+    try:
+        return cached_response(http_request, await query_body(request))
+    except EmbeddingError as e:
+        # Searching without a query vector would return arbitrary matches
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
         
-# Initialize database endpoint
-@app.post("/init", status_code=201)
-async def initialize_database():
-    """Initialize or refresh the vector database"""
+# Batch query endpoint
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def query_batch(request: BatchQueryRequest):
+    """Query the australianisms database for many queries at once"""
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BATCH_QUERIES} queries per batch"
+        )
+    
     try:
-        # Get chroma client and initialize collection
-        client = get_chroma_client()
-        count = init_collection(client)
-        return {
-            "status": "success", 
-            "message": f"Initialized database with {count} entries"
-        }
+        lookups = [cached_matches(item) for item in request.queries]
+        fragments = [fragment for _, fragment in lookups]
+        pending = [i for i, fragment in enumerate(fragments) if fragment is None]
+        
+        # Only queries missing from the result cache go to retrieval
+        if pending:
+            results = await asearch_hits_batch(
+                queries=[request.queries[i].query for i in pending],
+                max_results=[request.queries[i].max_results for i in pending],
+                thresholds=[request.queries[i].threshold for i in pending],
+                modes=[request.queries[i].mode for i in pending]
+            )
+            for i, hits in zip(pending, results):
+                fragments[i] = store_matches(lookups[i][0], hits)
+        
+        body = b'{"results":[' + b",".join(
+            b'{"matches":' + fragment + b',"query":' + json.dumps(item.query).encode("utf-8") + b"}"
+            for item, fragment in zip(request.queries, fragments)
+        ) + b"]}"
+        return tagged_response(body)
+    except EmbeddingError as e:
+        # Searching without a query vector would return arbitrary matches
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+        
+def running_init_job() -> Optional[Dict[str, Any]]:
+    """
+    Find the /init job that is still running, if any
+    
+    Returns:
+        The running job, or None
+    """
+    for job in init_jobs.values():
+        if job["status"] == "running":
+            return job
+    return None
+
+async def run_init_job(job: Dict[str, Any]):
+    """
+    Sync the vector database for an /init job and record the outcome on it
+    
+    Args:
+        job: Job record, updated in place
+    """
+    def progress(counts: Dict[str, int]):
+        # Called from the sync thread; replacing the dict is atomic for readers
+        job["progress"] = dict(counts)
+    
+    try:
+        generation = index_generation()
+        # Sync the configured vector store off the event loop
+        with stage("index_sync"):
+            report = await asyncio.to_thread(init_vector_store, job["rebuild"], progress)
+        with stage("catalog_refresh"):
+            await asyncio.to_thread(refresh_catalog)
+        # Results cached for older generations can never be read again
+        if index_generation() != generation:
+            result_cache.clear()
+        job["status"] = "succeeded"
+        job["message"] = (
+            f"Initialized database with {report['count']} entries "
+            f"({report['added']} added, {report['updated']} updated, "
+            f"{report['removed']} removed, {report['skipped']} unchanged)"
+        )
+        job["report"] = report
+    except Exception as e:
+        job["status"] = "failed"
+        job["message"] = str(e)
+        print(f"Error initializing database: {str(e)}")
+    finally:
+        job["finished_at"] = time.time()
+
+def init_job_response(job: Dict[str, Any], status_code: int = 200) -> JSONResponse:
+    """Report a job along with where to poll it"""
+    status_url = f"/init/{job['job_id']}"
+    return JSONResponse(
+        status_code=status_code,
+        content={**job, "status_url": status_url},
+        headers={"Location": status_url}
+    )
+
+# Initialize database endpoint
+@app.post("/init", status_code=202)
+async def initialize_database(rebuild: bool = False):
+    """
+    Start syncing the vector database in the background, re-embedding only changed rows
+    
+    Queries keep using the current index until the new one is complete.
+    While a sync is running, further calls return that job instead of
+    starting another; asking for a rebuild while an incremental sync runs
+    is refused with 409, since that job would not re-embed everything.
+    """
+    job = running_init_job()
+    if job is not None and rebuild and not job["rebuild"]:
+        return JSONResponse(
+            status_code=409,
+            content={
+                "detail": "An incremental sync is running; retry the rebuild once it finishes",
+                "job_id": job["job_id"],
+                "status_url": f"/init/{job['job_id']}"
+            },
+            headers={"Location": f"/init/{job['job_id']}"}
+        )
+    if job is None:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "running",
+            "rebuild": rebuild,
+            "started_at": time.time(),
+            "finished_at": None,
+            "message": None,
+            "progress": None,
+            "report": None
+        }
+        init_jobs[job["job_id"]] = job
+        while len(init_jobs) > INIT_JOB_HISTORY:
+            init_jobs.popitem(last=False)
+        
+        # Hold a reference so the task isn't collected before it finishes
+        task = asyncio.create_task(run_init_job(job))
+        _init_tasks.add(task)
+        task.add_done_callback(_init_tasks.discard)
+    
+    return init_job_response(job, status_code=202)
+
+# Initialization status endpoint
+@app.get("/init/{job_id}")
+async def initialization_status(job_id: str):
+    """Report the progress of an /init job"""
+    job = init_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown init job {job_id}")
+    return init_job_response(job)
 
 # Direct execution for development/testing
 if __name__ == "__main__":
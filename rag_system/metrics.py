@@ -0,0 +1,312 @@
+"""
+Request and per-stage latency metrics for the G'Day Bot RAG system
+
+Metrics are kept in process and rendered in the Prometheus text format
+by the ``/metrics`` endpoint. Code marks the stages of a request with
+``stage("name")``; each stage feeds a histogram and, while a request is
+being served, that request's ``Server-Timing`` header.
+"""
+import os
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Constants
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+# Histogram bucket upper bounds in seconds, from fast-path lookups to slow provider calls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage timings of the request being served, shared by the tasks and threads it spawns
+_timings = contextvars.ContextVar("stage_timings", default=None)
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a label set as {name="value",...}"""
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    """
+    Monotonic count per label set
+    """
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, **labels):
+        """
+        Add to the count for a label set
+        
+        Args:
+            amount: Amount to add
+            **labels: Value for each of the counter's labels
+        """
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels) -> float:
+        """Current count for a label set"""
+        return self._values.get(tuple(str(labels[name]) for name in self.labels), 0.0)
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {value!r}" for key, value in values]
+
+class Histogram:
+    """
+    Distribution of observed values per label set, in cumulative buckets
+    """
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels):
+        """
+        Record one observation
+        
+        Args:
+            value: Observed value, e.g. seconds
+            **labels: Value for each of the histogram's labels
+        """
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def count(self, **labels) -> int:
+        """Number of observations for a label set"""
+        series = self._series.get(tuple(str(labels[name]) for name in self.labels))
+        return series[2] if series else 0
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels(self.labels, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+class Registry:
+    """
+    The set of metrics rendered by ``/metrics``
+    
+    Besides its own counters and histograms, the registry calls collectors
+    at render time, so statistics already kept elsewhere (cache hit counts,
+    fast-path hits) are exported without being counted twice.
+    """
+    
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable] = []
+    
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        """Create and register a counter"""
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """Create and register a histogram"""
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def add_collector(self, collector: Callable):
+        """
+        Register a callable producing metrics at render time
+        
+        Args:
+            collector: Returns (name, kind, help, samples) tuples, where
+                samples is a list of (labels dict, value) pairs
+        """
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+        
+        Returns:
+            Exposition text, ending with a newline
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {str(e)}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {float(value)!r}")
+        
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    "rag_request_duration_seconds", "Time to serve an HTTP request", ["method", "endpoint"]
+)
+REQUESTS = registry.counter(
+    "rag_requests_total", "HTTP requests served", ["method", "endpoint", "status"]
+)
+STAGE_SECONDS = registry.histogram(
+    "rag_stage_duration_seconds", "Time spent in each stage of serving a request", ["stage"]
+)
+PROVIDER_SECONDS = registry.histogram(
+    "rag_embedding_provider_duration_seconds", "Latency of embedding provider requests", ["outcome"]
+)
+PROVIDER_REQUESTS = registry.counter(
+    "rag_embedding_provider_requests_total", "Embedding provider requests", ["outcome"]
+)
+PROVIDER_INPUTS = registry.counter(
+    "rag_embedding_provider_inputs_total", "Texts sent to the embedding provider"
+)
+
+def record_provider_request(seconds: float, inputs: int, ok: bool):
+    """
+    Record one embedding provider round trip
+    
+    Args:
+        seconds: Request latency
+        inputs: Number of texts in the request
+        ok: Whether the request succeeded
+    """
+    outcome = "ok" if ok else "error"
+    PROVIDER_SECONDS.observe(seconds, outcome=outcome)
+    PROVIDER_REQUESTS.inc(outcome=outcome)
+    PROVIDER_INPUTS.inc(inputs)
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a stage of request handling
+    
+    The duration goes to the stage histogram and, inside a request, to
+    that request's Server-Timing breakdown.
+    
+    Args:
+        name: Stage name, e.g. "embed" or "vector_search"
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+def server_timing(timings: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """
+    Format stage timings as a Server-Timing header value
+    
+    Repeated stages (e.g. several embedding waits in a batch) are summed.
+    
+    Args:
+        timings: (stage, seconds) pairs in the order they finished
+        total: Whole request duration in seconds, if known
+    
+    Returns:
+        Header value such as "embed;dur=81.2, vector_search;dur=0.3"
+    """
+    durations: Dict[str, float] = {}
+    for name, seconds in timings:
+        durations[name] = durations.get(name, 0.0) + seconds
+    if total is not None:
+        durations["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items())
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request
+    
+    Requests are counted and timed per route template (not raw path, to
+    keep label values bounded), and responses get a Server-Timing header
+    with the stages recorded while serving them.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        timings = []
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(timings, time.perf_counter() - start)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            # The router records the matched route in the scope
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"], endpoint=endpoint)
+            REQUESTS.inc(method=scope["method"], endpoint=endpoint, status=status)
@@ -15,6 +15,8 @@ if parent_dir not in sys.path:
 BASE_DIR = parent_dir
 DATA_PATH = os.path.join(BASE_DIR, "data/australianisms.json")
 RAG_SYSTEM_DIR = os.path.join(BASE_DIR, "rag_system")
+# Prebuilt index from `python -m rag_system.build_index`
+ARTIFACT_DIR = os.path.join(BASE_DIR, "index_artifact")
 
 # Create a Modal image with required dependencies
 image = modal.Image.debian_slim().pip_install(
@@ -23,6 +25,7 @@ image = modal.Image.debian_slim().pip_install(
     "openai",
     "python-dotenv",
     "chromadb",
+    "numpy",
     "tiktoken",
 )
 
@@ -31,11 +34,17 @@ image = modal.Image.debian_slim().pip_install(
 image = image.add_local_file(DATA_PATH, "/app/data/australianisms.json")
 
 # 2. Add rag_system Python files individually
-for py_file in ["__init__.py", "main.py", "embedding.py", "retrieval.py", "storage.py"]:
+for py_file in ["__init__.py", "main.py", "embedding.py", "cache.py", "catalog.py", "metrics.py", "retrieval.py", "storage.py"]:
     file_path = os.path.join(RAG_SYSTEM_DIR, py_file)
     if os.path.exists(file_path):
         image = image.add_local_file(file_path, f"/app/rag_system/{py_file}")
 
+# 3. Bake in the prebuilt index, if one was built, so containers start query-ready
+if os.path.exists(os.path.join(ARTIFACT_DIR, "manifest.json")):
+    image = image.add_local_dir(ARTIFACT_DIR, "/app/index")
+else:
+    print("No prebuilt index found; containers will embed the dataset on first start")
+
 # Define the Modal app
 app = modal.App("gday-rag-api")
 
@@ -62,6 +71,13 @@ def serve():
     os.environ["AUSTRALIANISMS_PATH"] = "/app/data/australianisms.json"
     os.environ["CHROMA_DB_PATH"] = "/app/chroma_db"
     
+    # Serve the baked-in index read-only, with the catalog it was built from
+    if os.path.exists("/app/index/manifest.json"):
+        os.environ["AUSTRALIANISMS_PATH"] = "/app/index/australianisms.json"
+        os.environ["VECTOR_BACKEND"] = "mmap"
+        os.environ["MMAP_INDEX_PATH"] = "/app/index/mmap_index"
+        os.environ["MMAP_READ_ONLY"] = "true"
+    
     # Import the FastAPI app directly
     # Dynamically import here to avoid circular imports
     from rag_system.main import app as fastapi_app
@@ -2,17 +2,55 @@
 Retrieval logic for the G'Day Bot RAG system
 """
 import os
-import json
-from typing import Dict, List, Any
-from .embedding import generate_embedding
-from .storage import get_chroma_client, get_collection
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from .cache import LRUCache, SingleFlight, RESULT_CACHE_SIZE, RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES
+from .embedding import embed_query, aembed_query, embed_queries, aembed_queries, normalize_query
+from .storage import get_vector_store, index_generation, iter_australianisms
+from .catalog import (
+    CatalogRecord, get_phrase_index, get_trigram_index, get_bm25_index, get_random_sampler, get_record_table
+)
+from .metrics import stage
+
+# Constants
+# Threads available for vector search on the async path
+VECTOR_SEARCH_WORKERS = int(os.environ.get("VECTOR_SEARCH_WORKERS", "4"))
+
+# Bounded pool so a burst of queries can't spawn unbounded search threads
+_search_executor = ThreadPoolExecutor(
+    max_workers=VECTOR_SEARCH_WORKERS,
+    thread_name_prefix="vector-search"
+)
+
+# Retrieval strategy used when a request doesn't choose one
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+RETRIEVAL_MODE = os.environ.get("RETRIEVAL_MODE", "vector")
+# Normalized BM25 score a lexical match needs to be returned
+LEXICAL_MIN_SCORE = float(os.environ.get("LEXICAL_MIN_SCORE", "0.1"))
+# Rank offset for reciprocal rank fusion; larger values flatten the ranking
+RRF_K = int(os.environ.get("RRF_K", "60"))
+
+# A catalog record and its score; retrieval passes these around and only
+# turns them into match dictionaries or JSON at the edge
+Hit = Tuple[CatalogRecord, float]
+# Hybrid results also carry their fused rank score, returned as rrf_score
+FusedHit = Tuple[CatalogRecord, float, float]
+
+# Serialized match lists of repeated requests; the key includes the index
+# generation, so a rebuild or catalog change invalidates every entry
+result_cache = LRUCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES)
+# Identical async queries arriving together share one embedding and search
+query_flights = SingleFlight()
 
 def load_australianisms(file_path: str = None) -> List[Dict[str, Any]]:
     """
-    Load australianisms data from JSON file
+    Load australianisms data from a JSON array or JSON Lines file
     
     Args:
-        file_path: Path to the australianisms JSON file
+        file_path: Path to the australianisms data file
         
     Returns:
         List of dictionaries containing australianisms data
@@ -22,8 +60,7 @@ def load_australianisms(file_path: str = None) -> List[Dict[str, Any]]:
         file_path = os.environ.get("AUSTRALIANISMS_PATH", "./data/australianisms.json")
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return list(iter_australianisms(file_path))
     except Exception as e:
         print(f"Error loading australianisms: {str(e)}")
         # Return a minimal dataset if file can't be loaded
@@ -40,81 +77,643 @@ def load_australianisms(file_path: str = None) -> List[Dict[str, Any]]:
             }
         ]
 
+def materialize(hits: List[Hit]) -> List[Dict[str, Any]]:
+    """
+    Turn scored records into match dictionaries
+    
+    Args:
+        hits: (record, score) pairs, best first
+    
+    Returns:
+        List of matching australianisms with scores
+    """
+    return [record.to_match(*scores) for record, *scores in hits]
+
+def exact_match(query: str) -> Optional[Hit]:
+    """
+    Answer a query that is literally a known phrase or alias, without embeddings
+    
+    Args:
+        query: The search query
+    
+    Returns:
+        The matching record with a score of 1.0, or None
+    """
+    item = get_phrase_index().lookup(query)
+    if item is None:
+        return None
+    
+    return get_record_table().for_item(item), 1.0
+
+def fuzzy_match(query: str, fallback: bool = False) -> Optional[Hit]:
+    """
+    Answer a query that is a misspelling of a known phrase, without embeddings
+    
+    Args:
+        query: The search query
+        fallback: A search already found nothing, so the looser cutoff applies
+    
+    Returns:
+        The closest record scored by edit similarity, or None
+    """
+    found = get_trigram_index().lookup(query, fallback)
+    if found is None:
+        return None
+    
+    item, score = found
+    return get_record_table().for_item(item), score
+
+def local_match(query: str) -> Optional[List[Hit]]:
+    """
+    Try the in-memory fast paths (exact, then typo-tolerant) before any search
+    
+    A typo is only answered here when it is a confident one (see
+    FUZZY_FAST_PATH_SCORE); anything closer to an ordinary word is searched.
+    
+    Args:
+        query: The search query
+    
+    Returns:
+        Single-hit list on a match, or None to fall back to search
+    """
+    with stage("fast_path"):
+        hit = exact_match(query)
+        if hit is None:
+            hit = fuzzy_match(query)
+        return [hit] if hit is not None else None
+        
+def fuzzy_fallback(query: str, hits: List[Hit]) -> List[Hit]:
+    """
+    Try a typo-tolerant phrase match when search found nothing
+    
+    A misspelled phrase embeds poorly, so it may miss every vector match.
+    Typos too uncertain for the fast path ("jumped" is one edit from
+    "jumper") get a second chance here, with the looser FUZZY_MIN_SCORE,
+    once search has found nothing. A fuzzy hit is scored by edit similarity.
+    
+    Args:
+        query: The search query
+        hits: Hits the search found
+    
+    Returns:
+        ``hits`` if there are any, else the fuzzy match or nothing
+    """
+    if hits:
+        return hits
+    with stage("fuzzy"):
+        hit = fuzzy_match(query, fallback=True)
+    return [hit] if hit is not None else []
+
+def resolve_mode(mode: Optional[str] = None) -> str:
+    """
+    Pick the retrieval mode for a request
+    
+    Args:
+        mode: Requested mode, or None for the configured default
+    
+    Returns:
+        One of "vector", "lexical" or "hybrid"
+    """
+    mode = mode or RETRIEVAL_MODE
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    return mode
+
+def result_cache_key(
+    query: str,
+    max_results: int = 3,
+    threshold: float = 0.7,
+    mode: Optional[str] = None
+) -> Tuple[int, str, int, float, str]:
+    """
+    Key a search request for the result cache
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        threshold: Minimum similarity score threshold
+        mode: Retrieval mode, or None for the configured default
+        
+    Returns:
+        Tuple of index generation, normalized query, limits and resolved mode
+    """
+    return (index_generation(), normalize_query(query), int(max_results), float(threshold), resolve_mode(mode))
+
+def lexical_hits(query: str, max_results: int = 3) -> List[Hit]:
+    """
+    Rank catalog records with the in-memory BM25 index, without embeddings
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+    
+    Returns:
+        (record, normalized BM25 score) pairs, best first
+    """
+    with stage("lexical"):
+        table = get_record_table()
+        return [
+            (table.for_item(item), score)
+            for item, score in get_bm25_index().search(query, max_results)
+            if score >= LEXICAL_MIN_SCORE
+        ]
+
+def search_lexical(query: str, max_results: int = 3) -> List[Dict[str, Any]]:
+    """
+    Search for australianisms with the in-memory BM25 index, without embeddings
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+    
+    Returns:
+        List of matching australianisms with normalized BM25 scores
+    """
+    return materialize(lexical_hits(query, max_results))
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Hit]],
+    max_results: int = 3,
+    k: int = RRF_K
+) -> List[FusedHit]:
+    """
+    Merge ranked hit lists by summing 1 / (k + rank) for each phrase
+    
+    The fused value only orders the results. Each hit keeps the score
+    from the first ranking that found it, so with vector hits first a
+    record's ``score`` stays its vector similarity (the quantity the
+    request threshold is about), or its BM25 score if only lexical
+    search found it.
+    
+    Args:
+        rankings: Hit lists, each ordered best first
+        max_results: Maximum number of results to return
+        k: Rank offset
+    
+    Returns:
+        (record, score, fused rank score) triples, best fused first
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (record, score) in enumerate(ranking, start=1):
+            entry = fused.setdefault(record.phrase, [record, score, 0.0])
+            entry[2] += 1.0 / (k + rank)
+    
+    ranked = sorted(fused.values(), key=lambda entry: entry[2], reverse=True)[:max_results]
+    return [(record, score, rrf_score) for record, score, rrf_score in ranked]
+
+def _search_depth(max_results: int, mode: str) -> int:
+    """Number of vector hits to fetch; hybrid fetches extra candidates for fusion"""
+    return max_results * 2 if mode == "hybrid" else max_results
+
+def _finish_hits(
+    query: str,
+    vector_hits: List[Hit],
+    max_results: int,
+    mode: str
+) -> List[Hit]:
+    """Fuse vector hits with lexical hits in hybrid mode, falling back to a fuzzy match"""
+    if mode != "hybrid":
+        return fuzzy_fallback(query, vector_hits)
+    
+    lexical = lexical_hits(query, _search_depth(max_results, mode))
+    with stage("fuse"):
+        fused = reciprocal_rank_fusion([vector_hits, lexical], max_results)
+    return fuzzy_fallback(query, fused)
+
+def search_hits(
+    query: str, 
+    max_results: int = 3, 
+    threshold: float = 0.7,
+    mode: Optional[str] = None
+) -> List[Hit]:
+    """
+    Search for catalog records that match the query
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        threshold: Minimum similarity score threshold for vector matches
+        mode: "vector", "lexical" or "hybrid"; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        (record, score) pairs, best first
+    """
+    mode = resolve_mode(mode)
+    
+    # Known phrases are answered straight from the catalog
+    hits = local_match(query)
+    if hits is not None:
+        return hits
+    
+    if mode == "lexical":
+        return fuzzy_fallback(query, lexical_hits(query, max_results))
+    
+    # Generate embedding for the query (repeated queries hit the in-memory cache)
+    with stage("embed"):
+        query_embedding = embed_query(query)
+    
+    vector_hits = hits_by_embeddings([query_embedding], [_search_depth(max_results, mode)], [threshold])[0]
+    return _finish_hits(query, vector_hits, max_results, mode)
+
 def search_australianisms(
     query: str, 
     max_results: int = 3, 
-    threshold: float = 0.7
+    threshold: float = 0.7,
+    mode: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Search for australianisms that match the query
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        threshold: Minimum similarity score threshold for vector matches
+        mode: "vector", "lexical" or "hybrid"; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        List of matching australianisms with scores
+    """
+    return materialize(search_hits(query, max_results, threshold, mode))
+
+async def asearch_hits(
+    query: str, 
+    max_results: int = 3, 
+    threshold: float = 0.7,
+    mode: Optional[str] = None
+) -> List[Hit]:
+    """
+    Asynchronous version of search_hits
+    
+    The query is embedded with the async client and the vector search runs
+    in a bounded thread pool, so neither blocks the event loop. Concurrent
+    calls for the same normalized request share one search and receive
+    the same hit list.
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        threshold: Minimum similarity score threshold for vector matches
+        mode: "vector", "lexical" or "hybrid"; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        (record, score) pairs, best first
+    """
+    mode = resolve_mode(mode)
+    key = result_cache_key(query, max_results, threshold, mode)
+    return await query_flights.do(key, lambda: _asearch(query, max_results, threshold, mode))
+
+async def asearch_australianisms(
+    query: str, 
+    max_results: int = 3, 
+    threshold: float = 0.7,
+    mode: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
-    Search for australianisms that match the query using vector similarity
+    Asynchronous version of search_australianisms
     
     Args:
         query: The search query
         max_results: Maximum number of results to return
+        threshold: Minimum similarity score threshold for vector matches
+        mode: "vector", "lexical" or "hybrid"; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        List of matching australianisms with scores
+    """
+    return materialize(await asearch_hits(query, max_results, threshold, mode))
+
+async def _asearch(query: str, max_results: int, threshold: float, mode: str) -> List[Hit]:
+    """Uncoalesced body of asearch_hits"""
+    hits = local_match(query)
+    if hits is not None:
+        return hits
+    
+    if mode == "lexical":
+        return fuzzy_fallback(query, lexical_hits(query, max_results))
+    
+    with stage("embed"):
+        query_embedding = await aembed_query(query)
+    
+    found = await _in_search_pool(
+        hits_by_embeddings,
+        [query_embedding],
+        [_search_depth(max_results, mode)],
+        [threshold]
+    )
+    return _finish_hits(query, found[0], max_results, mode)
+
+def search_hits_batch(
+    queries: List[str],
+    max_results: List[int],
+    thresholds: List[float],
+    modes: Optional[List[Optional[str]]] = None
+) -> List[List[Hit]]:
+    """
+    Search for many queries with one embedding call and one similarity pass
+    
+    Args:
+        queries: The search queries
+        max_results: Maximum number of results per query
+        thresholds: Minimum similarity score threshold per query
+        modes: Retrieval mode per query; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        List of hit lists, in the same order as ``queries``
+    """
+    modes = [resolve_mode(mode) for mode in (modes or [None] * len(queries))]
+    results = _lexical_pass(queries, max_results, modes)
+    pending = [i for i, hits in enumerate(results) if hits is None]
+    if not pending:
+        return results
+    
+    with stage("embed"):
+        query_embeddings = embed_queries([queries[i] for i in pending])
+    found = hits_by_embeddings(
+        query_embeddings,
+        [_search_depth(max_results[i], modes[i]) for i in pending],
+        [thresholds[i] for i in pending]
+    )
+    for i, hits in zip(pending, found):
+        results[i] = _finish_hits(queries[i], hits, max_results[i], modes[i])
+    
+    return results
+
+def search_australianisms_batch(
+    queries: List[str],
+    max_results: List[int],
+    thresholds: List[float],
+    modes: Optional[List[Optional[str]]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search for many queries at once, returning match dictionaries
+    
+    Args:
+        queries: The search queries
+        max_results: Maximum number of results per query
+        thresholds: Minimum similarity score threshold per query
+        modes: Retrieval mode per query; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        List of match lists, in the same order as ``queries``
+    """
+    return [materialize(hits) for hits in search_hits_batch(queries, max_results, thresholds, modes)]
+
+async def asearch_hits_batch(
+    queries: List[str],
+    max_results: List[int],
+    thresholds: List[float],
+    modes: Optional[List[Optional[str]]] = None
+) -> List[List[Hit]]:
+    """
+    Asynchronous version of search_hits_batch
+    
+    Args:
+        queries: The search queries
+        max_results: Maximum number of results per query
+        thresholds: Minimum similarity score threshold per query
+        modes: Retrieval mode per query; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        List of hit lists, in the same order as ``queries``
+    """
+    modes = [resolve_mode(mode) for mode in (modes or [None] * len(queries))]
+    results = _lexical_pass(queries, max_results, modes)
+    pending = [i for i, hits in enumerate(results) if hits is None]
+    if not pending:
+        return results
+    
+    with stage("embed"):
+        query_embeddings = await aembed_queries([queries[i] for i in pending])
+    
+    found = await _in_search_pool(
+        hits_by_embeddings,
+        query_embeddings,
+        [_search_depth(max_results[i], modes[i]) for i in pending],
+        [thresholds[i] for i in pending]
+    )
+    for i, hits in zip(pending, found):
+        results[i] = _finish_hits(queries[i], hits, max_results[i], modes[i])
+    
+    return results
+
+async def asearch_australianisms_batch(
+    queries: List[str],
+    max_results: List[int],
+    thresholds: List[float],
+    modes: Optional[List[Optional[str]]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Asynchronous version of search_australianisms_batch
+    
+    Args:
+        queries: The search queries
+        max_results: Maximum number of results per query
+        thresholds: Minimum similarity score threshold per query
+        modes: Retrieval mode per query; defaults to RETRIEVAL_MODE
+    
+    Returns:
+        List of match lists, in the same order as ``queries``
+    """
+    results = await asearch_hits_batch(queries, max_results, thresholds, modes)
+    return [materialize(hits) for hits in results]
+
+def _lexical_pass(
+    queries: List[str],
+    max_results: List[int],
+    modes: List[str]
+) -> List[Optional[List[Hit]]]:
+    """
+    Answer every batch query that needs no embedding
+    
+    Args:
+        queries: The search queries
+        max_results: Maximum number of results per query
+        modes: Resolved retrieval mode per query
+    
+    Returns:
+        Hit list per query, or None where vector search is still needed
+    """
+    results = []
+    for query, limit, mode in zip(queries, max_results, modes):
+        hits = local_match(query)
+        if hits is None and mode == "lexical":
+            hits = fuzzy_fallback(query, lexical_hits(query, limit))
+        results.append(hits)
+    
+    return results
+
+async def _in_search_pool(func, *args):
+    """
+    Run a blocking search on the bounded thread pool
+    
+    The request's context goes along, so stages timed in the worker
+    thread still show up in its Server-Timing header.
+    
+    Args:
+        func: Search function
+        *args: Arguments for ``func``
+    
+    Returns:
+        Whatever ``func`` returns
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_search_executor, functools.partial(context.run, func, *args))
+
+def search_by_embedding(
+    query_embedding: List[float],
+    max_results: int = 3,
+    threshold: float = 0.7
+) -> List[Dict[str, Any]]:
+    """
+    Search for australianisms near an already computed query embedding
+    
+    Args:
+        query_embedding: Embedding vector of the query
+        max_results: Maximum number of results to return
         threshold: Minimum similarity score threshold
         
     Returns:
         List of matching australianisms with similarity scores
     """
-    # Generate embedding for the query
-    query_embedding = generate_embedding(query)
+    return search_by_embeddings([query_embedding], [max_results], [threshold])[0]
+
+def search_by_embeddings(
+    query_embeddings: List[List[float]],
+    max_results: List[int],
+    thresholds: List[float]
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search for several query embeddings in a single vector store pass
     
-    # Get chroma client and collection
-    client = get_chroma_client()
-    collection = get_collection(client)
+    Args:
+        query_embeddings: Embedding vectors of the queries
+        max_results: Maximum number of results per query
+        thresholds: Minimum similarity score threshold per query
     
-    # Query the collection
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=max_results
-    )
+    Returns:
+        List of match lists, in the same order as ``query_embeddings``
+    """
+    return [materialize(hits) for hits in hits_by_embeddings(query_embeddings, max_results, thresholds)]
+
+def hits_by_embeddings(
+    query_embeddings: List[List[float]],
+    max_results: List[int],
+    thresholds: List[float]
+) -> List[List[Hit]]:
+    """
+    Find the catalog records nearest to several query embeddings
     
-    matches = []
+    The vector store only returns IDs and distances; records come from
+    the in-memory record table, so no stored document is parsed.
+    
+    Args:
+        query_embeddings: Embedding vectors of the queries
+        max_results: Maximum number of results per query
+        thresholds: Minimum similarity score threshold per query
+    
+    Returns:
+        List of hit lists, in the same order as ``query_embeddings``
+    """
+    if not query_embeddings:
+        return []
+    
+    # Use the process-wide vector store
+    store = get_vector_store()
+    
+    # Query the vector store once, deep enough for the largest request
+    with stage("vector_search"):
+        results = store.query(
+            query_embeddings=query_embeddings,
+            n_results=max(max_results),
+            include=["distances"]
+        )
+    
+    with stage("parse"):
+        records = _lookup_records(store, results["ids"])
+        return [
+            _collect_hits(results, row, records, limit, threshold)
+            for row, (limit, threshold) in enumerate(zip(max_results, thresholds))
+        ]
+
+def _lookup_records(store, ids: List[List[str]]) -> Dict[str, CatalogRecord]:
+    """
+    Find the records behind the IDs returned by a vector query
+    
+    IDs the catalog doesn't hold (an index built from other data) fall
+    back to the documents stored in the index.
+    
+    Args:
+        store: Vector store that was queried
+        ids: Record IDs per query
+    
+    Returns:
+        Map of record ID to record
+    """
+    table = get_record_table()
+    records = {}
+    missing = []
+    for record_id in dict.fromkeys(record_id for row in ids for record_id in row):
+        record = table.get(record_id)
+        if record is None:
+            missing.append(record_id)
+        else:
+            records[record_id] = record
+    
+    if missing:
+        for record_id, document in store.get_documents(missing).items():
+            records[record_id] = CatalogRecord.from_document(record_id, document)
+    
+    return records
+
+def _collect_hits(
+    results: Dict[str, List[List[Any]]],
+    row: int,
+    records: Dict[str, CatalogRecord],
+    max_results: int,
+    threshold: float
+) -> List[Hit]:
+    """
+    Turn one row of vector store results into scored records
+    
+    Args:
+        results: Vector store query results (ids and distances)
+        row: Index of the query within the results
+        records: Records for the returned IDs
+        max_results: Maximum number of results to return
+        threshold: Minimum similarity score threshold
+    
+    Returns:
+        (record, similarity) pairs, best first
+    """
+    hits = []
     
     # Process results if available
-    if results and results["documents"]:
-        for i, doc in enumerate(results["documents"][0]):
-            # Skip results below threshold
-            distance = results["distances"][0][i] if "distances" in results else 0.5
+    if results and results["ids"]:
+        for record_id, distance in zip(results["ids"][row][:max_results], results["distances"][row]):
             # Convert distance to similarity (higher is better)
             # For scores that can exceed 1.0, subtract from 2.0
             similarity = 2.0 - distance
             
-            # Skip results below threshold
-            if similarity < threshold:
+            # Skip results below threshold, and IDs removed since the query
+            record = records.get(record_id)
+            if similarity < threshold or record is None:
                 continue
+            hits.append((record, similarity))
             
-            # Parse document content and add to matches with the similarity score
-            try:
-                data = json.loads(doc)
-                matches.append({
-                    "phrase": data["phrase"],
-                    "meaning": data["meaning"],
-                    "usage_example": data["usage_example"],
-                    "score": similarity  # Use similarity instead of distance
-                })
-            except json.JSONDecodeError:
-                # If not valid JSON, use the document text directly
-                matches.append({
-                    "phrase": doc.split("\n")[0] if "\n" in doc else doc,
-                    "meaning": "Unknown",
-                    "usage_example": "Unknown",
-                    "score": distance
-                })
-    
-    return matches
-
-def get_random_australianism() -> Dict[str, Any]:
+    return hits
+
+def get_random_australianism(seed: Optional[int] = None, weighted: bool = True) -> Dict[str, Any]:
     """
     Get a random australianism for fun responses
     
+    Args:
+        seed: Seed for a reproducible draw, or None for a fresh one
+        weighted: Honour entry weights rather than drawing uniformly
+    
     Returns:
         Dictionary containing a random australianism
     """
-    import random
-    
-    # Load all australianisms
-    australianisms = load_australianisms()
-    
-    # Return a random one
-    return random.choice(australianisms)
\ No newline at end of file
+    # Drawn from the in-memory catalog rather than re-reading the data file
+    return get_random_sampler().sample(seed=seed, weighted=weighted)
\ No newline at end of file
@@ -3,84 +3,1095 @@ Vector database storage for the G'Day Bot RAG system
 """
 import os
 import json
+import mmap
+import shutil
+import hashlib
+import threading
 import chromadb
-from typing import Dict, List, Any
-from .embedding import generate_embedding
+import numpy as np
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
+from .embedding import generate_embeddings, embedding_space, EMBEDDING_MODEL
+from .metrics import stage
 
 # Constants
 CHROMA_DB_PATH = os.environ.get("CHROMA_DB_PATH", "./chroma_db")
 COLLECTION_NAME = os.environ.get("COLLECTION_NAME", "australianisms")
+# Vector index backend: "chroma" (persistent), "numpy" (in-memory matrix)
+# or "mmap" (quantized vectors memory-mapped from disk)
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "chroma").lower()
+# Location and element type of the memory-mapped index
+MMAP_INDEX_PATH = os.environ.get("MMAP_INDEX_PATH", os.path.join(CHROMA_DB_PATH, "mmap_index"))
+MMAP_DTYPE = os.environ.get("MMAP_DTYPE", "int8").lower()
+# Serve a prebuilt memory-mapped index as is, never writing to it
+MMAP_READ_ONLY = os.environ.get("MMAP_READ_ONLY", "false").lower() == "true"
+# Rows scored per block when scanning the memory-mapped index
+MMAP_BLOCK_ROWS = int(os.environ.get("MMAP_BLOCK_ROWS", "1024"))
+# Records embedded and written per step when syncing, bounding memory during ingestion
+INGEST_CHUNK_SIZE = int(os.environ.get("INGEST_CHUNK_SIZE", "1000"))
+# Characters read from the dataset file at a time
+INGEST_READ_SIZE = 1 << 20
+
+# Result fields a vector query returns unless told otherwise; ids always come back
+QUERY_INCLUDE = ("documents", "metadatas", "distances")
+
+# Process-wide client and vector store, shared across requests
+_client = None
+_store = None
+# Bumped whenever the served index or catalog changes; keys cached results
+_generation = 0
+_generation_lock = threading.Lock()
+# Serializes warm-ups and syncs, so concurrent callers never build the index twice
+_build_lock = threading.RLock()
+
+class VectorStore:
+    """
+    Interface shared by the vector index backends
+    
+    Query results use Chroma's shape: per query embedding, lists of ids,
+    documents, metadatas and squared L2 distances, nearest first. Callers
+    that already hold the records can ask for ids and distances only. Each
+    record's metadata carries a ``content_hash`` so the store can be
+    synced incrementally.
+    """
+    
+    name = "base"
+    
+    def add(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """Add records to the index"""
+        raise NotImplementedError
+    
+    def upsert(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """Add records, replacing any that already exist with the same ID"""
+        raise NotImplementedError
+    
+    def upsert_chunks(
+        self,
+        ids: Iterable[str],
+        chunks: Iterable[Tuple[List[str], List[str], List[List[float]], List[Dict[str, Any]]]]
+    ):
+        """
+        Upsert records arriving as a stream of chunks
+        
+        Args:
+            ids: Every ID the chunks will write
+            chunks: (ids, documents, embeddings, metadatas) batches, produced lazily
+        """
+        for chunk in chunks:
+            with stage("index_write"):
+                self.upsert(*chunk)
+    
+    def delete(self, ids: List[str]):
+        """Remove records from the index"""
+        raise NotImplementedError
+    
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        include: Tuple[str, ...] = QUERY_INCLUDE
+    ) -> Dict[str, List[List[Any]]]:
+        """Find the ``n_results`` nearest records for each query embedding, with the ``include`` fields"""
+        raise NotImplementedError
+    
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        """Map of record ID to stored document, for the IDs present in the index"""
+        raise NotImplementedError
+    
+    def count(self) -> int:
+        """Number of records in the index"""
+        raise NotImplementedError
+    
+    def get_hashes(self) -> Dict[str, str]:
+        """Map of record ID to the content hash stored with it"""
+        raise NotImplementedError
+    
+    def get_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the dataset the index was last synced from"""
+        raise NotImplementedError
+    
+    def set_fingerprint(self, fingerprint: str):
+        """Record the fingerprint of the dataset the index was synced from"""
+        raise NotImplementedError
+    
+    def get_embedding_space(self) -> Optional[str]:
+        """Embedding space (model and dimensions) the stored vectors belong to"""
+        raise NotImplementedError
+    
+    def set_embedding_space(self, space: str):
+        """Record the embedding space of the stored vectors"""
+        raise NotImplementedError
+    
+    def clear(self):
+        """Remove every record from the index"""
+        raise NotImplementedError
+
+class ChromaVectorStore(VectorStore):
+    """
+    Vector store backed by a persistent ChromaDB collection
+    """
+    
+    name = "chroma"
+    
+    def __init__(self, collection):
+        self.collection = collection
+    
+    def add(self, ids, documents, embeddings, metadatas):
+        self.collection.add(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas
+        )
+    
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.collection.upsert(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas
+        )
+    
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+    
+    def query(self, query_embeddings, n_results, include=QUERY_INCLUDE):
+        return self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            include=list(include)
+        )
+    
+    def get_documents(self, ids):
+        records = self.collection.get(ids=list(ids), include=["documents"])
+        return dict(zip(records["ids"], records["documents"]))
+    
+    def count(self):
+        return self.collection.count()
+    
+    def _pages(self, include: List[str]) -> Iterator[Dict[str, Any]]:
+        """Read the collection INGEST_CHUNK_SIZE records at a time"""
+        offset = 0
+        while True:
+            page = self.collection.get(include=include, limit=INGEST_CHUNK_SIZE, offset=offset)
+            if not page["ids"]:
+                return
+            yield page
+            offset += len(page["ids"])
+    
+    def get_hashes(self):
+        hashes = {}
+        for page in self._pages(["metadatas"]):
+            for record_id, metadata in zip(page["ids"], page["metadatas"]):
+                hashes[record_id] = (metadata or {}).get("content_hash", "")
+        return hashes
+    
+    def get_fingerprint(self):
+        return (self.collection.metadata or {}).get("fingerprint")
+    
+    def set_fingerprint(self, fingerprint):
+        metadata = dict(self.collection.metadata or {})
+        metadata["fingerprint"] = fingerprint
+        self.collection.modify(metadata=metadata)
+    
+    def get_embedding_space(self):
+        return (self.collection.metadata or {}).get("embedding_space")
+    
+    def set_embedding_space(self, space):
+        metadata = dict(self.collection.metadata or {})
+        metadata["embedding_space"] = space
+        self.collection.modify(metadata=metadata)
+    
+    def copy_to(self, target: "ChromaVectorStore"):
+        """
+        Copy every record, with its stored embedding, into another collection
+        
+        Records are read and written INGEST_CHUNK_SIZE at a time and nothing
+        is re-embedded.
+        
+        Args:
+            target: Empty store to fill
+        """
+        for page in self._pages(["documents", "embeddings", "metadatas"]):
+            target.add(page["ids"], page["documents"], page["embeddings"], page["metadatas"])
+        space = self.get_embedding_space()
+        if space is not None:
+            target.set_embedding_space(space)
+    
+    def set_complete(self):
+        """Mark a newly built collection version as ready to serve"""
+        metadata = dict(self.collection.metadata or {})
+        metadata["complete"] = True
+        self.collection.modify(metadata=metadata)
+    
+    def clear(self):
+        # Chroma keeps the collection's dimension, so init_collection builds
+        # a new collection when the embedding size changes. Deleting a page
+        # shifts the rest forward, so always read from the start
+        while True:
+            ids = self.collection.get(include=[], limit=INGEST_CHUNK_SIZE)["ids"]
+            if not ids:
+                return
+            self.collection.delete(ids=ids)
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length, leaving all-zero rows untouched"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-memory vector store holding every embedding in one float32 matrix
+    
+    Rows are normalized on insert, so a query is a single matrix-vector
+    product followed by an ``argpartition`` top-k. Distances are reported
+    as squared L2 between unit vectors (``2 - 2 * cosine``), which matches
+    Chroma's default metric for normalized embeddings.
+    """
+    
+    name = "numpy"
+    
+    def __init__(self):
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self.matrix = None
+        self.fingerprint = None
+        self.embedding_space = None
+        self._rows = {}
+    
+    def add(self, ids, documents, embeddings, metadatas):
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        self.matrix = vectors if self.matrix is None else np.vstack([self.matrix, vectors])
+        for record_id in ids:
+            self._rows[record_id] = len(self.ids)
+            self.ids.append(record_id)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+    
+    def upsert(self, ids, documents, embeddings, metadatas):
+        new = [i for i, record_id in enumerate(ids) if record_id not in self._rows]
+        existing = [i for i, record_id in enumerate(ids) if record_id in self._rows]
+        
+        # Overwrite existing rows in place
+        if existing:
+            rows = [self._rows[ids[i]] for i in existing]
+            matrix = self.matrix.copy()
+            matrix[rows] = _normalize_rows(np.asarray([embeddings[i] for i in existing], dtype=np.float32))
+            for row, i in zip(rows, existing):
+                self.documents[row] = documents[i]
+                self.metadatas[row] = metadatas[i]
+            self.matrix = matrix
+        
+        if new:
+            self.add(
+                [ids[i] for i in new],
+                [documents[i] for i in new],
+                [embeddings[i] for i in new],
+                [metadatas[i] for i in new]
+            )
+    
+    def delete(self, ids):
+        doomed = {self._rows[record_id] for record_id in ids if record_id in self._rows}
+        if not doomed:
+            return
+        
+        keep = [row for row in range(len(self.ids)) if row not in doomed]
+        self.matrix = self.matrix[keep]
+        self.ids = [self.ids[row] for row in keep]
+        self.documents = [self.documents[row] for row in keep]
+        self.metadatas = [self.metadatas[row] for row in keep]
+        self._rows = {record_id: row for row, record_id in enumerate(self.ids)}
+    
+    def query(self, query_embeddings, n_results, include=QUERY_INCLUDE):
+        result = {"ids": [], **{field: [] for field in include}}
+        k = min(n_results, self.count())
+        if k <= 0:
+            for key in result:
+                result[key] = [[] for _ in query_embeddings]
+            return result
+        
+        queries = _normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        scores = queries @ self.matrix.T
+        
+        # Unordered top-k per row, then sort just those k
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        distances = 2.0 - 2.0 * np.take_along_axis(top_scores, order, axis=1)
+        
+        for row, row_distances in zip(top.tolist(), distances.tolist()):
+            result["ids"].append([self.ids[j] for j in row])
+            if "documents" in result:
+                result["documents"].append([self.documents[j] for j in row])
+            if "metadatas" in result:
+                result["metadatas"].append([self.metadatas[j] for j in row])
+            if "distances" in result:
+                result["distances"].append(row_distances)
+        
+        return result
+    
+    def get_documents(self, ids):
+        return {
+            record_id: self.documents[self._rows[record_id]]
+            for record_id in ids if record_id in self._rows
+        }
+    
+    def count(self):
+        return len(self.ids)
+    
+    def get_hashes(self):
+        return {
+            record_id: metadata.get("content_hash", "")
+            for record_id, metadata in zip(self.ids, self.metadatas)
+        }
+    
+    def get_fingerprint(self):
+        return self.fingerprint
+    
+    def set_fingerprint(self, fingerprint):
+        self.fingerprint = fingerprint
+    
+    def get_embedding_space(self):
+        return self.embedding_space
+    
+    def set_embedding_space(self, space):
+        self.embedding_space = space
+    
+    def clear(self):
+        self.__init__()
+    
+    def copy(self) -> "NumpyVectorStore":
+        """
+        Copy the store for writing while this one keeps serving
+        
+        Writes never modify the matrix in place, so it is shared.
+        
+        Returns:
+            NumpyVectorStore with the same records
+        """
+        store = NumpyVectorStore()
+        store.ids = list(self.ids)
+        store.documents = list(self.documents)
+        store.metadatas = list(self.metadatas)
+        store.matrix = self.matrix
+        store.fingerprint = self.fingerprint
+        store.embedding_space = self.embedding_space
+        store._rows = dict(self._rows)
+        return store
+    
+    def nbytes(self) -> int:
+        """Memory held by the embedding matrix"""
+        return 0 if self.matrix is None else self.matrix.nbytes
+
+def quantize_rows(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize unit-length rows for compact storage
+    
+    Args:
+        vectors: float32 matrix of normalized rows
+        dtype: "float16", or "int8" for symmetric per-row scaling
+    
+    Returns:
+        (quantized rows, float32 scale per row); a row is recovered as
+        ``quantized * scale``
+    """
+    if dtype == "float16":
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    if dtype != "int8":
+        raise ValueError(f"Unsupported quantized dtype: {dtype}")
+    
+    scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, dtype=np.float32)
+    scales[scales == 0] = 1.0
+    quantized = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+class MmapVectorStore(VectorStore):
+    """
+    On-disk vector store reading quantized embeddings through memory maps
+    
+    The index is a directory holding:
+    
+    - ``vectors.npy``: one float16 or int8 row per record
+    - ``scales.npy``: float32 dequantization scale per row
+    - ``records.jsonl``: id, document and metadata per row, as JSON lines
+    - ``offsets.npy``: int64 start and end of each row in ``records.jsonl``
+    - ``ids.npy``: fixed-width record ID per row, so ID-only queries decode nothing
+    - ``meta.json``: dtype, dimensions, count, dataset fingerprint and embedding space
+    
+    Queries scan the vectors in blocks straight from the page cache and
+    decode at most the records of the final top-k, so resident memory stays
+    flat however large the index gets. Writes rebuild the directory
+    block by block and swap it in, since syncs are rare.
+    
+    A read-only store serves a prebuilt index in whatever element type it
+    was built with and refuses every write.
+    """
+    
+    name = "mmap"
+    
+    def __init__(self, path: str, dtype: str = "int8", read_only: bool = False):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported quantized dtype: {dtype}")
+        self.path = path
+        self.dtype = dtype
+        self.read_only = read_only
+        self._open()
+    
+    def _open(self):
+        """Map the index files, treating a missing or mismatched index as empty"""
+        self.meta = {"dtype": self.dtype, "dimensions": 0, "count": 0, "fingerprint": None, "embedding_space": None}
+        self._vectors = None
+        self._scales = None
+        self._offsets = None
+        self._records = None
+        self._ids = None
+        self._rows = None
+        
+        try:
+            with open(os.path.join(self.path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if self.read_only and meta.get("dtype") in ("float16", "int8"):
+            self.dtype = meta["dtype"]
+        if meta.get("dtype") != self.dtype or not meta.get("count"):
+            return
+        
+        self.meta = meta
+        self._vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+        self._scales = np.load(os.path.join(self.path, "scales.npy"), mmap_mode="r")
+        self._offsets = np.load(os.path.join(self.path, "offsets.npy"), mmap_mode="r")
+        with open(os.path.join(self.path, "records.jsonl"), "rb") as f:
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Indexes written before ids.npy existed read IDs from the records
+        if os.path.exists(os.path.join(self.path, "ids.npy")):
+            self._ids = np.load(os.path.join(self.path, "ids.npy"), mmap_mode="r")
+    
+    def _record(self, row: int) -> Dict[str, Any]:
+        """Decode one record from the memory-mapped records file"""
+        start, end = self._offsets[row]
+        return json.loads(self._records[start:end])
+    
+    def _id(self, row: int) -> str:
+        """Record ID of one row, without decoding the record when possible"""
+        if self._ids is not None:
+            return str(self._ids[row])
+        return self._record(row)["id"]
+    
+    def _iter_records(self):
+        for row in range(self.count()):
+            yield self._record(row)
+    
+    def _row_map(self) -> Dict[str, int]:
+        """ID to row table, built on first use and dropped on rewrite"""
+        if self._rows is None:
+            self._rows = {self._id(row): row for row in range(self.count())}
+        return self._rows
+    
+    def _rewrite(self, keep: List[int], chunks: Iterable[Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]], new_count: int):
+        """
+        Write kept rows followed by new records into a fresh index and swap it in
+        
+        New records arrive in chunks and are written as they come, so a sync
+        of any size holds one chunk in memory and writes the index once.
+        
+        Args:
+            keep: Existing rows to carry over, in order
+            chunks: (records, vectors, scales) batches of new records, where
+                records are id/document/metadata dicts and vectors are quantized
+            new_count: Total number of records in ``chunks``
+        """
+        self._check_writable()
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        count = len(keep) + new_count
+        if keep:
+            dimensions = self.meta["dimensions"]
+        else:
+            dimensions = first[1].shape[1] if first is not None else 0
+        staging = self.path + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        
+        if count:
+            out_vectors = np.lib.format.open_memmap(
+                os.path.join(staging, "vectors.npy"), mode="w+", dtype=self.dtype, shape=(count, dimensions)
+            )
+            out_scales = np.lib.format.open_memmap(
+                os.path.join(staging, "scales.npy"), mode="w+", dtype=np.float32, shape=(count,)
+            )
+            out_offsets = np.lib.format.open_memmap(
+                os.path.join(staging, "offsets.npy"), mode="w+", dtype=np.int64, shape=(count, 2)
+            )
+            # IDs are spooled to disk until the longest is known, which fixes ids.npy's width
+            ids_path = os.path.join(staging, "ids.jsonl")
+            width = 1
+            with open(os.path.join(staging, "records.jsonl"), "wb") as out_records, \
+                    open(ids_path, "w", encoding="utf-8") as out_ids:
+                position = 0
+                # Copy surviving rows a block at a time to keep memory flat
+                for start in range(0, len(keep), MMAP_BLOCK_ROWS):
+                    block = np.asarray(keep[start:start + MMAP_BLOCK_ROWS], dtype=np.int64)
+                    out_vectors[start:start + len(block)] = self._vectors[block]
+                    out_scales[start:start + len(block)] = self._scales[block]
+                    for row, old in enumerate(block.tolist(), start=start):
+                        begin, end = self._offsets[old]
+                        out_records.write(self._records[begin:end])
+                        out_records.write(b"\n")
+                        out_offsets[row] = (position, position + end - begin)
+                        record_id = self._id(old)
+                        out_ids.write(json.dumps(record_id) + "\n")
+                        width = max(width, len(record_id))
+                        position += end - begin + 1
+                
+                row = len(keep)
+                chunk = first
+                while chunk is not None:
+                    with stage("index_write"):
+                        records, vectors, scales = chunk
+                        if row + len(records) > count:
+                            raise ValueError(f"Expected {new_count} new records, got more")
+                        out_vectors[row:row + len(records)] = vectors
+                        out_scales[row:row + len(records)] = scales
+                        for record in records:
+                            line = json.dumps(record).encode("utf-8")
+                            out_records.write(line)
+                            out_records.write(b"\n")
+                            out_offsets[row] = (position, position + len(line))
+                            out_ids.write(json.dumps(record["id"]) + "\n")
+                            width = max(width, len(record["id"]))
+                            position += len(line) + 1
+                            row += 1
+                    chunk = next(chunks, None)
+                if row != count:
+                    raise ValueError(f"Expected {new_count} new records, got {row - len(keep)}")
+            
+            out_id_array = np.lib.format.open_memmap(
+                os.path.join(staging, "ids.npy"), mode="w+", dtype=f"<U{width}", shape=(count,)
+            )
+            with open(ids_path, "r", encoding="utf-8") as spooled:
+                for row, line in enumerate(spooled):
+                    out_id_array[row] = json.loads(line)
+            os.remove(ids_path)
+            
+            for array in (out_vectors, out_scales, out_offsets, out_id_array):
+                array.flush()
+            del out_vectors, out_scales, out_offsets, out_id_array
+        
+        meta = {**self.meta, "dimensions": dimensions, "count": count, "dtype": self.dtype}
+        with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        
+        replace_index_directory(staging, self.path)
+        self._open()
+    
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError(f"Vector index at {self.path} is read-only")
+    
+    def add(self, ids, documents, embeddings, metadatas):
+        self.upsert(ids, documents, embeddings, metadatas)
+    
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.upsert_chunks(ids, [(ids, documents, embeddings, metadatas)])
+    
+    def upsert_chunks(self, ids, chunks):
+        ids = list(ids)
+        if not ids:
+            return
+        
+        rows = self._row_map()
+        replaced = {rows[record_id] for record_id in ids if record_id in rows}
+        keep = [row for row in range(self.count()) if row not in replaced]
+        self._rewrite(keep, (self._encode_chunk(*chunk) for chunk in chunks), len(ids))
+    
+    def _encode_chunk(self, ids, documents, embeddings, metadatas) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]:
+        """Quantize a chunk of records for writing"""
+        vectors, scales = quantize_rows(_normalize_rows(np.asarray(embeddings, dtype=np.float32)), self.dtype)
+        records = [
+            {"id": record_id, "document": document, "metadata": metadata}
+            for record_id, document, metadata in zip(ids, documents, metadatas)
+        ]
+        return records, vectors, scales
+    
+    def delete(self, ids):
+        rows = self._row_map()
+        doomed = {rows[record_id] for record_id in ids if record_id in rows}
+        if not doomed:
+            return
+        
+        keep = [row for row in range(self.count()) if row not in doomed]
+        self._rewrite(keep, [], 0)
+    
+    def query(self, query_embeddings, n_results, include=QUERY_INCLUDE):
+        result = {"ids": [], **{field: [] for field in include}}
+        k = min(n_results, self.count())
+        if k <= 0:
+            for key in result:
+                result[key] = [[] for _ in query_embeddings]
+            return result
+        
+        queries = _normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        
+        # Top-k per block, then top-k over the block winners
+        candidates = []
+        candidate_scores = []
+        # Blocks are widened into one reused, cache-sized float32 buffer
+        buffer = np.empty((min(MMAP_BLOCK_ROWS, self.count()), self.meta["dimensions"]), dtype=np.float32)
+        for start in range(0, self.count(), MMAP_BLOCK_ROWS):
+            stored = self._vectors[start:start + MMAP_BLOCK_ROWS]
+            block = buffer[:len(stored)]
+            np.copyto(block, stored, casting="unsafe")
+            scores = (queries @ block.T) * self._scales[start:start + len(block)]
+            block_k = min(k, len(block))
+            top = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+            candidates.append(top + start)
+            candidate_scores.append(np.take_along_axis(scores, top, axis=1))
+        candidates = np.hstack(candidates)
+        scores = np.hstack(candidate_scores)
+        
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        rows = np.take_along_axis(np.take_along_axis(candidates, top, axis=1), order, axis=1)
+        distances = 2.0 - 2.0 * np.take_along_axis(top_scores, order, axis=1)
+        
+        decode = "documents" in result or "metadatas" in result
+        for row, row_distances in zip(rows.tolist(), distances.tolist()):
+            if not decode:
+                result["ids"].append([self._id(j) for j in row])
+            else:
+                records = [self._record(j) for j in row]
+                result["ids"].append([record["id"] for record in records])
+                if "documents" in result:
+                    result["documents"].append([record["document"] for record in records])
+                if "metadatas" in result:
+                    result["metadatas"].append([record["metadata"] for record in records])
+            if "distances" in result:
+                result["distances"].append(row_distances)
+        
+        return result
+    
+    def get_documents(self, ids):
+        rows = self._row_map()
+        return {
+            record_id: self._record(rows[record_id])["document"]
+            for record_id in ids if record_id in rows
+        }
+    
+    def count(self):
+        return int(self.meta["count"]) if self._vectors is not None else 0
+    
+    def get_hashes(self):
+        return {
+            record["id"]: record["metadata"].get("content_hash", "")
+            for record in self._iter_records()
+        }
+    
+    def get_fingerprint(self):
+        return self.meta.get("fingerprint")
+    
+    def set_fingerprint(self, fingerprint):
+        self._check_writable()
+        self.meta["fingerprint"] = fingerprint
+        self._save_meta()
+    
+    def get_embedding_space(self):
+        return self.meta.get("embedding_space")
+    
+    def set_embedding_space(self, space):
+        self._check_writable()
+        self.meta["embedding_space"] = space
+        self._save_meta()
+    
+    def _save_meta(self):
+        """Persist metadata changes once the index exists on disk"""
+        if self.count():
+            with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(self.meta, f)
+    
+    def clear(self):
+        """Remove the index from disk"""
+        self._check_writable()
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._open()
+    
+    def nbytes(self) -> int:
+        """Size of the quantized vectors and scales on disk"""
+        if self._vectors is None:
+            return 0
+        return self._vectors.nbytes + self._scales.nbytes
+
+def replace_index_directory(staging: str, path: str):
+    """
+    Move a finished index directory into place
+    
+    Stores that still map the old files keep reading them until they
+    are reopened.
+    
+    Args:
+        staging: Directory holding the new index
+        path: Directory the index is served from
+    """
+    retired = path + ".old"
+    shutil.rmtree(retired, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, retired)
+    os.replace(staging, path)
+    shutil.rmtree(retired, ignore_errors=True)
 
 def get_chroma_client():
     """
-    Initialize and return a ChromaDB client with persistence
+    Initialize and return a shared ChromaDB client with persistence
     
     Returns:
         ChromaDB client
     """
-    # Create the directory if it doesn't exist
-    os.makedirs(CHROMA_DB_PATH, exist_ok=True)
+    global _client
     
-    # Initialize ChromaDB with persistence
-    client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-    return client
+    if _client is None:
+        # Create the directory if it doesn't exist
+        os.makedirs(CHROMA_DB_PATH, exist_ok=True)
+        
+        # Initialize ChromaDB with persistence
+        _client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    
+    return _client
 
-def get_collection(client, collection_name=COLLECTION_NAME):
+def warm_vector_store() -> int:
+    """
+    Open the configured vector store once and keep it for later requests
+    
+    The index is built if it is missing or empty, so the first query never
+    pays for it.
+    
+    Returns:
+        Number of records in the warm store
+    """
+    global _store
+    
+    with _build_lock:
+        if VECTOR_BACKEND == "numpy":
+            store = build_numpy_store()
+        elif VECTOR_BACKEND == "mmap":
+            store = build_mmap_store()
+        else:
+            client = get_chroma_client()
+            collection = get_collection(client)
+        
+            # Validate the collection before serving from it
+            if collection is None or collection.count() == 0:
+                print(f"Collection {COLLECTION_NAME} is empty. Initializing...")
+                init_collection(client)
+                collection = get_collection(client)
+            elif index_embedding_space(ChromaVectorStore(collection)) != embedding_space():
+                print(f"Collection {COLLECTION_NAME} holds embeddings from another model or size. Rebuilding...")
+                init_collection(client)
+                collection = get_collection(client)
+            store = ChromaVectorStore(collection)
+    
+        _store = store
+        bump_index_generation()
+        return _store.count()
+
+def get_vector_store() -> VectorStore:
+    """
+    Get the shared vector store, warming it on first use
+    
+    Returns:
+        VectorStore instance for the configured backend
+    """
+    if _store is None:
+        with _build_lock:
+            # Another thread may have warmed it while this one waited
+            if _store is None:
+                warm_vector_store()
+    
+    return _store
+
+def init_vector_store(
+    rebuild: bool = False,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Sync the configured vector store with the australianisms data
+    
+    The served store is never written to: the sync goes into a copy (or,
+    for a rebuild, a fresh index) that replaces it once complete, so
+    queries running meanwhile keep using the previous generation.
+    
+    Args:
+        rebuild: Discard the existing index and re-add every record
+        progress: Called as chunks of records are embedded and written
+    
+    Returns:
+        Report with counts of added, updated, removed and skipped records
+    """
+    global _store
+    
+    with _build_lock:
+        if VECTOR_BACKEND == "numpy":
+            if rebuild or _store is None or _space_changed(_store):
+                store = NumpyVectorStore()
+            else:
+                store = _store.copy()
+            report = sync_vector_store(store, australianisms_source(), progress)
+            _store = store
+        elif VECTOR_BACKEND == "mmap":
+            current = _store or MmapVectorStore(MMAP_INDEX_PATH, MMAP_DTYPE, read_only=MMAP_READ_ONLY)
+            if rebuild or _space_changed(current):
+                report, store = rebuild_mmap_store(progress)
+            else:
+                # A second handle on the same files; its writes swap in a new
+                # directory while the served handle keeps its maps
+                store = MmapVectorStore(MMAP_INDEX_PATH, MMAP_DTYPE, read_only=MMAP_READ_ONLY)
+                report = sync_vector_store(store, australianisms_source(), progress)
+            _store = store
+        else:
+            report = init_collection(get_chroma_client(), rebuild=rebuild, progress=progress)
+    
+        if rebuild or report["added"] or report["updated"] or report["removed"]:
+            bump_index_generation()
+        return report
+
+def _space_changed(store: VectorStore) -> bool:
+    """Whether a store holds vectors from another embedding model or size"""
+    return index_embedding_space(store) not in (None, embedding_space())
+
+def index_generation() -> int:
+    """
+    Get the current index generation
+    
+    Returns:
+        Counter that changes whenever the served index or catalog changes
+    """
+    return _generation
+
+def bump_index_generation() -> int:
+    """
+    Start a new index generation, invalidating results cached for older ones
+    
+    Returns:
+        The new generation
+    """
+    global _generation
+    
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+def index_status() -> Dict[str, Any]:
+    """
+    Report whether the vector store is warm
+    
+    Returns:
+        Dictionary with readiness, backend, record count, dataset fingerprint
+        and embedding space
     """
-    Get an existing collection from ChromaDB
+    if _store is None:
+        return {
+            "ready": False,
+            "backend": VECTOR_BACKEND,
+            "count": 0,
+            "fingerprint": None,
+            "embedding_space": None
+        }
+    
+    count = _store.count()
+    return {
+        "ready": count > 0,
+        "backend": _store.name,
+        "count": count,
+        "fingerprint": _store.get_fingerprint(),
+        "embedding_space": index_embedding_space(_store)
+    }
+
+def collection_versions(client, collection_name=COLLECTION_NAME) -> List[Tuple[int, bool, Any]]:
+    """
+    List the generations of a collection, oldest first
+    
+    Rebuilds write to collections named ``<collection_name>_v<version>``;
+    a plain ``collection_name`` collection from before versioning counts
+    as version 0.
     
     Args:
         client: ChromaDB client
         collection_name: Name of the collection
         
     Returns:
-        ChromaDB collection
+        (version, complete, collection) tuples
     """
-    try:
-        # Try to get the existing collection
-        collection = client.get_collection(name=collection_name)
-        return collection
-    except Exception as e:
-        # If collection doesn't exist, create and initialize it
-        print(f"Collection {collection_name} not found. Creating and initializing...")
-        collection = init_collection(client, collection_name)
-        return collection
+    versions = []
+    for collection in client.list_collections():
+        metadata = collection.metadata or {}
+        if collection.name == collection_name:
+            versions.append((0, True, collection))
+        elif metadata.get("base") == collection_name and isinstance(metadata.get("version"), int):
+            versions.append((metadata["version"], bool(metadata.get("complete")), collection))
+    
+    return sorted(versions, key=lambda version: version[0])
 
-def init_collection(client, collection_name=COLLECTION_NAME):
+def get_collection(client, collection_name=COLLECTION_NAME):
     """
-    Initialize a collection with australianisms data
+    Get the collection currently serving queries from ChromaDB
     
     Args:
         client: ChromaDB client
         collection_name: Name of the collection
         
     Returns:
-        Number of records added to the collection
+        The newest complete version of the collection, or None if there is none
     """
-    # Create or get the collection
-    try:
-        # If collection exists, delete it first for clean initialization
-        client.delete_collection(name=collection_name)
-    except:
-        pass  # Collection didn't exist, that's fine
+    complete = [collection for _, done, collection in collection_versions(client, collection_name) if done]
+    return complete[-1] if complete else None
+
+def iter_australianisms(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream australianisms from a JSON array or JSON Lines file
+    
+    The file is read in fixed-size pieces and decoded one entry at a
+    time, so memory doesn't grow with the size of the dataset. The format
+    is detected from the first character: ``[`` starts a JSON array,
+    anything else is one JSON object per line.
+    
+    Args:
+        path: Path to the dataset file
+    
+    Returns:
+        Iterator over the australianism dictionaries, in file order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(INGEST_READ_SIZE)
+        if head.lstrip().startswith("["):
+            yield from _iter_json_array(f, head)
+            return
+        
+        pending = ""
+        while head:
+            lines = (pending + head).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+            head = f.read(INGEST_READ_SIZE)
+        if pending.strip():
+            yield json.loads(pending)
+
+def _iter_json_array(f, buffer: str) -> Iterator[Dict[str, Any]]:
+    """
+    Decode the elements of a JSON array one at a time
+    
+    Args:
+        f: Text file positioned after ``buffer``
+        buffer: Text already read, starting with the array
+    
+    Returns:
+        Iterator over the array's elements
+    """
+    decoder = json.JSONDecoder()
+    position = buffer.index("[") + 1
+    expect_value = True
+    first = True
+    eof = False
+    
+    while True:
+        # Skip whitespace and the comma between elements
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ","):
+            if buffer[position] == ",":
+                if expect_value:
+                    raise ValueError(f"Unexpected ',' at character {position}")
+                expect_value = True
+            position += 1
+        
+        if position < len(buffer) and buffer[position] == "]":
+            if expect_value and not first:
+                raise ValueError(f"Trailing ',' before character {position}")
+            return
         
-    # Create a new collection
-    collection = client.create_collection(
-        name=collection_name,
-        metadata={"description": "Australian slang and phrases"}
-    )
+        if position < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # A value cut off at the end of the buffer may still parse (e.g. a number)
+                if end < len(buffer) or eof:
+                    if not expect_value:
+                        raise ValueError(f"Expected ',' or ']' at character {position}")
+                    yield item
+                    position = end
+                    expect_value = False
+                    first = False
+                    continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            raise ValueError("Unterminated JSON array")
+        
+        # Drop what has been consumed and read the next piece
+        buffer = buffer[position:]
+        position = 0
+        more = f.read(INGEST_READ_SIZE)
+        eof = not more
+        buffer += more
+
+class AustralianismsFile:
+    """
+    A dataset file that can be iterated over more than once
+    
+    Each pass streams the file again with ``iter_australianisms``, so a
+    sync can hash every record first and embed the changed ones second
+    without holding the dataset in memory.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter_australianisms(self.path)
+
+def australianisms_source() -> Iterable[Dict[str, Any]]:
+    """
+    Get the australianisms dataset for indexing, streamed from disk when possible
+    
+    Returns:
+        AustralianismsFile over the configured data file, or the fallback
+        dataset if the file can't be opened
+    """
+    data_path = os.environ.get("AUSTRALIANISMS_PATH", "./data/australianisms.json")
+    if os.path.isfile(data_path):
+        return AustralianismsFile(data_path)
+    return load_australianisms_data()
+
+def load_australianisms_data() -> List[Dict[str, Any]]:
+    """
+    Load the australianisms dataset used to build the index
     
+    Returns:
+        List of dictionaries containing australianisms data
+    """
     # Get the data file path from environment or use default
     data_path = os.environ.get("AUSTRALIANISMS_PATH", "./data/australianisms.json")
     
     # Load the australianisms data
     try:
-        with open(data_path, "r", encoding="utf-8") as f:
-            australianisms = json.load(f)
+        return list(iter_australianisms(data_path))
     except Exception as e:
         print(f"Error loading australianisms data: {str(e)}")
         # Create minimal dataset if file loading fails
-        australianisms = [
+        return [
             {
                 "phrase": "G'day",
                 "meaning": "Hello, good day",
@@ -92,42 +1103,377 @@ def init_collection(client, collection_name=COLLECTION_NAME):
                 "usage_example": "Is that fair dinkum or are you pulling my leg?"
             }
         ]
+
+def iter_record_ids(australianisms: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Derive stable record IDs from each australianism's phrase, as a stream
     
-    # Add the australianisms to the collection
-    ids = []
+    IDs don't depend on position in the file, so inserting or reordering
+    entries doesn't invalidate the rest of the index. Repeated phrases get
+    a numeric suffix.
+    
+    Args:
+        australianisms: Iterable of australianism dictionaries
+    
+    Returns:
+        Iterator over (id, australianism) pairs, in dataset order
+    """
+    seen = {}
+    
+    for item in australianisms:
+        key = hashlib.sha1(item["phrase"].strip().lower().encode("utf-8")).hexdigest()[:16]
+        seen[key] = seen.get(key, 0) + 1
+        yield (f"phrase_{key}" if seen[key] == 1 else f"phrase_{key}_{seen[key]}"), item
+
+def record_ids(australianisms: List[Dict[str, Any]]) -> List[str]:
+    """
+    Derive stable record IDs from each australianism's phrase
+    
+    Args:
+        australianisms: List of australianism dictionaries
+    
+    Returns:
+        List of IDs aligned with ``australianisms``
+    """
+    return [record_id for record_id, _ in iter_record_ids(australianisms)]
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """
+    Hash a record's content together with the embedding model and size
+    
+    Args:
+        item: Australianism dictionary
+    
+    Returns:
+        Hex SHA-256 digest; changes whenever the record must be re-embedded
+    """
+    payload = json.dumps(item, sort_keys=True, ensure_ascii=False) + "\n" + embedding_space()
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def dataset_fingerprint(hashes: Dict[str, str]) -> str:
+    """
+    Fingerprint a whole dataset from its record IDs and content hashes
+    
+    Args:
+        hashes: Map of record ID to content hash
+    
+    Returns:
+        Hex SHA-256 digest of the dataset
+    """
+    digest = hashlib.sha256()
+    for record_id in sorted(hashes):
+        digest.update(f"{record_id}:{hashes[record_id]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def build_records(
+    australianisms: List[Dict[str, Any]],
+    ids: List[str]
+) -> Tuple[List[str], List[str], List[List[float]], List[Dict[str, Any]]]:
+    """
+    Turn australianisms into index records and embed them
+    
+    Args:
+        australianisms: List of australianism dictionaries
+        ids: Record IDs aligned with ``australianisms``
+    
+    Returns:
+        Tuple of (ids, documents, embeddings, metadatas)
+    """
     documents = []
-    embeddings = []
+    texts_to_embed = []
     metadatas = []
     
-    for i, item in enumerate(australianisms):
-        # Create unique ID
-        item_id = f"phrase_{i}"
-        ids.append(item_id)
-        
+    for item in australianisms:
         # Format the document
         doc_text = json.dumps(item)
         documents.append(doc_text)
         
-        # Generate embeddings
         # For embedding, use the phrase and meaning together
-        text_to_embed = f"{item['phrase']} - {item['meaning']}"
-        embedding = generate_embedding(text_to_embed)
-        embeddings.append(embedding)
+        texts_to_embed.append(f"{item['phrase']} - {item['meaning']}")
         
         # Add metadata
         metadata = {
             "phrase": item["phrase"],
             "length": len(item["phrase"]),
+            "content_hash": content_hash(item),
         }
         metadatas.append(metadata)
     
-    # Add documents to collection
-    if ids:
-        collection.add(
-            ids=ids,
-            documents=documents,
-            embeddings=embeddings,
-            metadatas=metadatas
+    # Generate all embeddings in a few batched requests; a failed request
+    # raises, so zero vectors are never stored under a valid content hash
+    embeddings = generate_embeddings(texts_to_embed, strict=True)
+    
+    return list(ids), documents, embeddings, metadatas
+
+def index_embedding_space(store: VectorStore) -> Optional[str]:
+    """
+    Get the embedding space of the vectors held by a store
+    
+    Args:
+        store: Vector store to inspect
+    
+    Returns:
+        Recorded embedding space, or None for an empty store
+    """
+    space = store.get_embedding_space()
+    if space is None and store.count():
+        # Indexes built before the space was recorded used the model's full size
+        return EMBEDDING_MODEL
+    return space
+
+def sync_vector_store(
+    store: VectorStore,
+    australianisms: Iterable[Dict[str, Any]],
+    progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Bring a vector store in line with the dataset, touching only changed records
+    
+    The dataset is read twice: once to hash every record, and once more
+    to embed and write the changed ones in chunks of INGEST_CHUNK_SIZE,
+    so memory holds one chunk of records and vectors however large the
+    dataset is; only the map of record IDs to content hashes grows with
+    it. Vectors from different embedding spaces can't be compared,
+    so a store built with another model or size is cleared and re-embedded
+    in full.
+    
+    Args:
+        store: Vector store to update
+        australianisms: Australianism dictionaries; anything that can be
+            iterated twice, such as a list or an AustralianismsFile
+        progress: Called after each chunk is written with counts of
+            records embedded so far, to embed, and in the dataset
+    
+    Returns:
+        Report with counts of added, updated, removed and skipped records
+    """
+    if iter(australianisms) is australianisms:
+        # A one-shot iterator can't be read twice
+        australianisms = list(australianisms)
+    
+    hashes = {record_id: content_hash(item) for record_id, item in iter_record_ids(australianisms)}
+    fingerprint = dataset_fingerprint(hashes)
+    
+    report = {"added": 0, "updated": 0, "removed": 0, "skipped": 0, "fingerprint": fingerprint}
+    
+    space = embedding_space()
+    stored_space = index_embedding_space(store)
+    if stored_space not in (None, space):
+        print(f"Index holds {stored_space} embeddings, re-embedding for {space}")
+        store.clear()
+    
+    # Nothing changed since the last sync
+    if store.get_fingerprint() == fingerprint:
+        report["skipped"] = len(hashes)
+        report["count"] = store.count()
+        return report
+    
+    existing = store.get_hashes()
+    changed = set()
+    for record_id, record_hash in hashes.items():
+        if record_id not in existing:
+            report["added"] += 1
+            changed.add(record_id)
+        elif existing[record_id] != record_hash:
+            report["updated"] += 1
+            changed.add(record_id)
+        else:
+            report["skipped"] += 1
+    
+    removed = [record_id for record_id in existing if record_id not in hashes]
+    report["removed"] = len(removed)
+    del existing
+    
+    # Only embed and write the records that changed
+    if changed:
+        store.upsert_chunks(changed, _embedded_chunks(australianisms, changed, len(hashes), progress))
+    
+    if removed:
+        with stage("index_write"):
+            store.delete(removed)
+    
+    store.set_embedding_space(space)
+    store.set_fingerprint(fingerprint)
+    report["count"] = store.count()
+    return report
+
+def _embedded_chunks(
+    australianisms: Iterable[Dict[str, Any]],
+    changed: set,
+    total: int,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Iterator[Tuple[List[str], List[str], List[List[float]], List[Dict[str, Any]]]]:
+    """
+    Embed the changed records a chunk at a time
+    
+    Args:
+        australianisms: Australianism dictionaries
+        changed: IDs of the records to embed
+        total: Number of records in the dataset, for progress reports
+        progress: Called after each chunk has been written
+    
+    Returns:
+        Iterator over (ids, documents, embeddings, metadatas) chunks
+    """
+    embedded = 0
+    items = []
+    ids = []
+    
+    def embed():
+        with stage("index_embed"):
+            return build_records(items, ids)
+    
+    for record_id, item in iter_record_ids(australianisms):
+        if record_id not in changed:
+            continue
+        items.append(item)
+        ids.append(record_id)
+        if len(items) >= INGEST_CHUNK_SIZE:
+            yield embed()
+            embedded += len(items)
+            items, ids = [], []
+            if progress is not None:
+                progress({"embedded": embedded, "to_embed": len(changed), "total": total})
+    
+    if items:
+        yield embed()
+        embedded += len(items)
+        if progress is not None:
+            progress({"embedded": embedded, "to_embed": len(changed), "total": total})
+
+def build_numpy_store() -> NumpyVectorStore:
+    """
+    Build an in-memory NumPy vector store from the australianisms data
+    
+    Embeddings come through the disk cache, so rebuilding an unchanged
+    dataset makes no provider calls.
+    
+    Returns:
+        Populated NumpyVectorStore
+    """
+    store = NumpyVectorStore()
+    sync_vector_store(store, australianisms_source())
+    return store
+
+def build_mmap_store() -> MmapVectorStore:
+    """
+    Open the memory-mapped vector store, syncing it with the australianisms data
+    
+    An up-to-date index on disk is mapped as is, without reading any vectors.
+    With MMAP_READ_ONLY the index is a prebuilt artifact and is never synced;
+    a fingerprint that disagrees with the dataset is only reported.
+    
+    Returns:
+        Populated MmapVectorStore
+    """
+    if MMAP_READ_ONLY:
+        store = MmapVectorStore(MMAP_INDEX_PATH, MMAP_DTYPE, read_only=True)
+        fingerprint = dataset_fingerprint({
+            record_id: content_hash(item) for record_id, item in iter_record_ids(australianisms_source())
+        })
+        # Query vectors from another space would be meaningless against this index
+        space = index_embedding_space(store)
+        if space not in (None, embedding_space()):
+            raise ValueError(
+                f"Prebuilt index at {MMAP_INDEX_PATH} holds {space} embeddings "
+                f"but queries use {embedding_space()}; rebuild the artifact"
+            )
+        if store.get_fingerprint() != fingerprint:
+            print(f"Prebuilt index at {MMAP_INDEX_PATH} does not match the dataset; rebuild the artifact")
+        return store
+    
+    os.makedirs(os.path.dirname(os.path.abspath(MMAP_INDEX_PATH)), exist_ok=True)
+    store = MmapVectorStore(MMAP_INDEX_PATH, MMAP_DTYPE)
+    sync_vector_store(store, australianisms_source())
+    return store
+
+def rebuild_mmap_store(
+    progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Tuple[Dict[str, Any], MmapVectorStore]:
+    """
+    Build a complete memory-mapped index beside the served one and swap it in
+    
+    Args:
+        progress: Called as chunks of records are embedded and written
+    
+    Returns:
+        Tuple of the sync report and a store opened on the new index
+    """
+    if MMAP_READ_ONLY:
+        raise PermissionError(f"Vector index at {MMAP_INDEX_PATH} is read-only")
+    
+    staging = MMAP_INDEX_PATH + ".next"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(os.path.dirname(os.path.abspath(MMAP_INDEX_PATH)), exist_ok=True)
+    report = sync_vector_store(MmapVectorStore(staging, MMAP_DTYPE), australianisms_source(), progress)
+    
+    if os.path.exists(staging):
+        replace_index_directory(staging, MMAP_INDEX_PATH)
+    else:
+        # An empty dataset writes no index
+        shutil.rmtree(MMAP_INDEX_PATH, ignore_errors=True)
+    return report, MmapVectorStore(MMAP_INDEX_PATH, MMAP_DTYPE)
+
+def init_collection(client, collection_name=COLLECTION_NAME, rebuild=False, progress=None) -> Dict[str, Any]:
+    """
+    Initialize a collection with australianisms data, or bring it up to date
+    
+    Only records whose content changed are re-embedded and written; an
+    unchanged dataset is a no-op. Any other sync fills a new version of the
+    collection, which starts serving only once it is complete: an
+    incremental sync starts from a copy of the live version's records and
+    embeddings, while a rebuild (or a collection built with another
+    embedding model or size) starts empty. The version it replaces is kept
+    until the next sync, for queries still using it.
+    
+    Args:
+        client: ChromaDB client
+        collection_name: Name of the collection
+        rebuild: Build a new version and re-add every record
+        progress: Called as chunks of records are embedded and written
+    
+    Returns:
+        Report with counts of added, updated, removed and skipped records
+    """
+    global _store
+    
+    versions = collection_versions(client, collection_name)
+    live = get_collection(client, collection_name)
+    # The collection's dimension is fixed, so another space means starting over
+    if live is not None and _space_changed(ChromaVectorStore(live)):
+        rebuild = True
+    
+    source = australianisms_source()
+    if live is not None and not rebuild and ChromaVectorStore(live).get_fingerprint() == dataset_fingerprint({
+        record_id: content_hash(item) for record_id, item in iter_record_ids(source)
+    }):
+        # Nothing to write, so the live version stays
+        store = ChromaVectorStore(live)
+        report = sync_vector_store(store, source, progress)
+    else:
+        version = versions[-1][0] + 1 if versions else 1
+        collection = client.create_collection(
+            name=f"{collection_name}_v{version}",
+            metadata={
+                "description": "Australian slang and phrases",
+                "base": collection_name,
+                "version": version,
+                "complete": False
+            }
         )
+        store = ChromaVectorStore(collection)
+        if live is not None and not rebuild:
+            ChromaVectorStore(live).copy_to(store)
+        report = sync_vector_store(store, source, progress)
+        store.set_complete()
+    
+        # Earlier versions (and builds that never completed) go, except the one being replaced
+        for _, _, old in versions:
+            if live is None or old.name != live.name:
+                client.delete_collection(name=old.name)
+    
+    # Point the shared store at the synced collection
+    if VECTOR_BACKEND == "chroma" and collection_name == COLLECTION_NAME and client is _client:
+        _store = store
     
-    return len(ids)
\ No newline at end of file
+    return report
@@ -0,0 +1,140 @@
+# benchmark_cold_start.py
+# Measures container cold start - process launch to first answered query -
+# with and without the prebuilt index artifact. Each scenario runs in a fresh
+# interpreter against an offline provider with injected per-call latency.
+#
+#   python tests/benchmark_cold_start.py --phrases 30 5000 --provider-latency 0.5
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+# Shared by the parent (to build the artifact) and each child process
+PROVIDER = '''
+import time
+import asyncio
+import hashlib
+import numpy as np
+from types import SimpleNamespace
+
+class OfflineProvider:
+    def __init__(self, latency, dimensions=1536):
+        self.latency = latency
+        self.dimensions = dimensions
+        self.requests = 0
+        self.embeddings = SimpleNamespace(create=self.create)
+        self.async_client = SimpleNamespace(embeddings=SimpleNamespace(create=self.acreate))
+
+    def vector_for(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.lower().encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).normal(size=self.dimensions).astype(np.float32).tolist()
+
+    def respond(self, input):
+        self.requests += 1
+        inputs = [input] if isinstance(input, str) else list(input)
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=self.vector_for(text)) for i, text in enumerate(inputs)
+        ])
+
+    def create(self, input, model):
+        time.sleep(self.latency)
+        return self.respond(input)
+
+    async def acreate(self, input, model):
+        await asyncio.sleep(self.latency)
+        return self.respond(input)
+'''
+
+CHILD = PROVIDER + '''
+import sys
+import json
+sys.path.insert(0, {root!r})
+from rag_system import embedding
+provider = OfflineProvider({latency!r})
+embedding.set_openai_client(provider)
+embedding.set_async_openai_client(provider.async_client)
+
+from fastapi.testclient import TestClient
+from rag_system.main import app
+
+with TestClient(app) as client:
+    ready = client.get("/ready").status_code
+    answered = client.post("/query", json={{"query": "see you this afternoon", "threshold": 0.0}}).status_code
+print(json.dumps({{"ready": ready, "answered": answered, "requests": provider.requests}}))
+'''
+
+
+def synthetic_dataset(count):
+    with open(DATA_PATH, encoding="utf-8") as f:
+        base = json.load(f)
+    dataset = [dict(item) for item in base[:count]]
+    for i in range(len(dataset), count):
+        item = base[i % len(base)]
+        dataset.append(dict(item, phrase=f"{item['phrase']} {i // len(base)}"))
+    return dataset
+
+
+def cold_start(env, latency):
+    child_env = {**os.environ, **env}
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=parent_dir, latency=latency)],
+        env=child_env, capture_output=True, text=True, check=True
+    ).stdout
+    seconds = time.perf_counter() - start
+    return seconds, json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start with and without the prebuilt index")
+    parser.add_argument("--phrases", type=int, nargs="+", default=[30, 5000])
+    parser.add_argument("--provider-latency", type=float, default=0.5, help="Seconds per embeddings call")
+    args = parser.parse_args()
+
+    namespace = {}
+    exec(PROVIDER, namespace)
+    from rag_system import embedding
+    from rag_system.build_index import build_index_artifact
+
+    print(f"{'phrases':>8} {'scenario':>18} {'seconds':>8} {'calls':>6} {'query':>6}")
+    for count in args.phrases:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "australianisms.json")
+            with open(data_path, "w", encoding="utf-8") as f:
+                json.dump(synthetic_dataset(count), f)
+
+            artifact = os.path.join(tmp, "index_artifact")
+            embedding.set_openai_client(namespace["OfflineProvider"](0.0))
+            embedding.set_embedding_cache(None)
+            embedding.EMBEDDING_CACHE_ENABLED = False
+            build_index_artifact(artifact, data_path, "int8")
+
+            scenarios = {
+                "chroma, no cache": {"VECTOR_BACKEND": "chroma"},
+                "numpy, no cache": {"VECTOR_BACKEND": "numpy"},
+                "prebuilt artifact": {
+                    "VECTOR_BACKEND": "mmap",
+                    "MMAP_INDEX_PATH": os.path.join(artifact, "mmap_index"),
+                    "MMAP_READ_ONLY": "true",
+                    "AUSTRALIANISMS_PATH": os.path.join(artifact, "australianisms.json"),
+                },
+            }
+            for name, env in scenarios.items():
+                scratch = tempfile.mkdtemp(dir=tmp)
+                env = {"AUSTRALIANISMS_PATH": data_path, "CHROMA_DB_PATH": scratch, **env}
+                seconds, result = cold_start(env, args.provider_latency)
+                print(f"{count:>8} {name:>18} {seconds:>8.2f} {result['requests']:>6} {result['answered']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmark_embedding_dimensions.py
+# Measures the recall/latency/memory trade-off of reduced embedding sizes.
+# Vectors are cut to their leading dimensions and renormalized, which is what
+# EMBEDDING_DIMENSIONS_METHOD=truncate does and what text-embedding-3 models
+# return for the API's dimensions parameter.
+#
+# By default runs offline on synthetic embeddings whose leading dimensions
+# carry most of the signal, like Matryoshka-trained models; recall is against
+# the full-size ranking. --live embeds the dataset and the labelled queries
+# in tests/benchmark_queries.json once with the configured provider and
+# reports how often the labelled phrase is found at each size.
+#
+#   python tests/benchmark_embedding_dimensions.py --size 50000
+#   OPENAI_API_KEY=... python tests/benchmark_embedding_dimensions.py --live
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding
+from rag_system.storage import NumpyVectorStore
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+QUERIES_PATH = os.path.join(parent_dir, "tests/benchmark_queries.json")
+
+
+def matryoshka_unit_vectors(count, dimensions, rng, clusters=200, spread=0.6):
+    """Clustered unit vectors with variance decaying along the dimensions"""
+    decay = (np.arange(dimensions, dtype=np.float32) + 1) ** -0.5
+    centres = rng.normal(size=(clusters, dimensions)).astype(np.float32) * decay
+    vectors = centres[rng.integers(0, clusters, size=count)]
+    vectors += spread * rng.normal(size=(count, dimensions)).astype(np.float32) * decay
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def truncate_rows(vectors, dimensions):
+    """Row-wise equivalent of embedding.truncate_embedding"""
+    head = np.ascontiguousarray(vectors[:, :dimensions])
+    return head / np.linalg.norm(head, axis=1, keepdims=True)
+
+
+def populate(store, vectors):
+    ids = [f"phrase_{i}" for i in range(len(vectors))]
+    store.add(ids, ids, vectors, [{"i": i} for i in range(len(vectors))])
+    return store
+
+
+def run_queries(store, queries, n_results):
+    found = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        result = store.query([query], n_results=n_results)
+        latencies.append(time.perf_counter() - start)
+        found.append(result["ids"][0])
+    return found, np.percentile(np.array(latencies) * 1000, 50)
+
+
+def benchmark_synthetic(args):
+    rng = np.random.default_rng(0)
+    full = max(args.dimensions)
+    vectors = matryoshka_unit_vectors(args.size, full, rng)
+    # Queries are noisy copies of stored rows
+    queries = vectors[rng.integers(0, args.size, size=args.queries)]
+    queries = queries + 0.3 * rng.normal(size=queries.shape).astype(np.float32) / np.sqrt(full)
+
+    print(f"{'dims':>6} {'MB':>8} {'saved':>6} {f'recall@{args.n_results}':>10} {'p50 ms':>7}")
+    truth = baseline = None
+    for dimensions in sorted(args.dimensions, reverse=True):
+        store = populate(NumpyVectorStore(), truncate_rows(vectors, dimensions))
+        found, p50 = run_queries(store, truncate_rows(queries, dimensions), args.n_results)
+        if truth is None:
+            truth, baseline = found, store.nbytes()
+        recall = np.mean([
+            len(set(expected) & set(actual)) / len(expected)
+            for expected, actual in zip(truth, found)
+        ])
+        saved = 1 - store.nbytes() / baseline
+        print(f"{dimensions:>6} {store.nbytes() / 1e6:>8.1f} {saved:>6.0%} {recall:>10.3f} {p50:>7.2f}")
+
+
+def benchmark_live(args):
+    with open(DATA_PATH, encoding="utf-8") as f:
+        australianisms = json.load(f)
+    with open(QUERIES_PATH, encoding="utf-8") as f:
+        labelled = json.load(f)
+
+    # Embed once at full size; every smaller size is a truncation of these
+    embedding.EMBEDDING_DIMENSIONS = embedding.NATIVE_DIMENSIONS.get(embedding.EMBEDDING_MODEL, 1536)
+    documents = np.asarray(embedding.generate_embeddings(
+        [f"{item['phrase']} - {item['meaning']}" for item in australianisms]
+    ), dtype=np.float32)
+    queries = np.asarray(embedding.generate_embeddings(
+        [case["query"] for case in labelled]
+    ), dtype=np.float32)
+    phrases = [item["phrase"] for item in australianisms]
+
+    print(f"{embedding.EMBEDDING_MODEL}, {len(labelled)} labelled queries, {len(phrases)} phrases")
+    print(f"{'dims':>6} {f'recall@{args.n_results}':>10} {'MRR':>6} {'p50 ms':>7}")
+    for dimensions in sorted(args.dimensions, reverse=True):
+        if dimensions > documents.shape[1]:
+            continue
+        store = populate(NumpyVectorStore(), truncate_rows(documents, dimensions))
+        found, p50 = run_queries(store, truncate_rows(queries, dimensions), args.n_results)
+        hits = reciprocal_rank = 0.0
+        for case, ids in zip(labelled, found):
+            ranked = [phrases[int(record_id.split("_")[1])] for record_id in ids]
+            if case["phrase"] in ranked:
+                hits += 1
+                reciprocal_rank += 1 / (ranked.index(case["phrase"]) + 1)
+        print(
+            f"{dimensions:>6} {hits / len(labelled):>10.3f} "
+            f"{reciprocal_rank / len(labelled):>6.3f} {p50:>7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reduced embedding dimensions")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[1536, 1024, 512, 256, 128])
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=10)
+    parser.add_argument("--live", action="store_true", help="Embed the labelled set with the configured provider")
+    args = parser.parse_args()
+
+    if args.live:
+        benchmark_live(args)
+    else:
+        benchmark_synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
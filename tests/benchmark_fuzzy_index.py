@@ -0,0 +1,82 @@
+# benchmark_fuzzy_index.py
+# Measures typo-tolerant lookup latency of the trigram index as the
+# phrase catalog grows. Runs offline on synthetic phrases.
+#
+#   python tests/benchmark_fuzzy_index.py --sizes 1000 10000 100000
+import os
+import sys
+import time
+import random
+import string
+import argparse
+
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system.catalog import TrigramIndex
+
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+
+def synthetic_catalog(size, rng):
+    catalog = []
+    for _ in range(size):
+        words = [random_word(rng) for _ in range(rng.choice([1, 1, 2]))]
+        catalog.append({"phrase": " ".join(words), "meaning": "", "usage_example": ""})
+    return catalog
+
+
+def misspell(phrase, rng):
+    """Apply one random insertion, deletion or substitution"""
+    i = rng.randrange(len(phrase))
+    letter = rng.choice(string.ascii_lowercase)
+    edit = rng.choice(["insert", "delete", "substitute"])
+    if edit == "insert":
+        return phrase[:i] + letter + phrase[i:]
+    if edit == "delete" and len(phrase) > 4:
+        return phrase[:i] + phrase[i + 1:]
+    return phrase[:i] + letter + phrase[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trigram fuzzy index")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'phrases':>8} {'build s':>8} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8} {'found':>6} {'correct':>8}")
+    for size in args.sizes:
+        catalog = synthetic_catalog(size, rng)
+        targets = [rng.choice(catalog) for _ in range(args.queries)]
+        queries = [misspell(item["phrase"], rng) for item in targets]
+
+        start = time.perf_counter()
+        index = TrigramIndex(catalog)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        found = correct = 0
+        for query, target in zip(queries, targets):
+            start = time.perf_counter()
+            result = index.lookup(query)
+            latencies.append(time.perf_counter() - start)
+            if result is not None:
+                found += 1
+                correct += result[0]["phrase"] == target["phrase"]
+
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1e6, [50, 95, 99])
+        print(
+            f"{size:>8} {build_seconds:>8.2f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} "
+            f"{found / len(queries):>6.2f} {correct / len(queries):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# benchmark_load.py
+# HTTP load test for the RAG API. Starts rag_system.main under uvicorn in a
+# separate process (one replica, like one Modal container) with the offline
+# bag-of-words provider and an injectable embedding latency, then drives it
+# over real HTTP at fixed arrival rates. Reports throughput, error rate and
+# latency percentiles per endpoint, and the highest rate the replica kept up
+# with, which is what a deploy's replica limit should be sized from.
+#
+# Arrivals are open loop and latency is measured from each request's
+# scheduled start, so time spent queueing for a connection is counted.
+#
+#   python tests/benchmark_load.py --rates 50 200 400 800 --provider-latency-ms 80
+#   python tests/benchmark_load.py --url http://localhost:8000 --rates 20 50
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+import urllib.request
+
+import aiohttp
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+QUERIES_PATH = os.path.join(parent_dir, "tests/benchmark_queries.json")
+ENDPOINTS = ("query", "batch", "random", "catalog")
+
+
+def serve(port, backend, provider_latency, server_limit, workdir):
+    """Run the API with the fake provider; the target of the server process"""
+    # Configuration is read at import, so set it before importing the app
+    os.environ["VECTOR_BACKEND"] = backend
+    os.environ["CHROMA_DB_PATH"] = os.path.join(workdir, "chroma_db")
+    os.environ["MMAP_INDEX_PATH"] = os.path.join(workdir, "mmap_index")
+    os.environ["AUSTRALIANISMS_PATH"] = os.path.join(parent_dir, "data/australianisms.json")
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import uvicorn
+    from rag_system import embedding
+    from rag_system.main import app
+    from fake_provider import BagOfWordsEmbeddingClient
+
+    provider = BagOfWordsEmbeddingClient(latency=provider_latency)
+    embedding.set_openai_client(provider)
+    embedding.set_async_openai_client(provider.async_client)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error", limit_concurrency=server_limit)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/ready", timeout=1.0):
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def parse_mix(spec):
+    """Turn "query=8,batch=1,random=1" into endpoint weights"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; expected one of {ENDPOINTS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Workload:
+    """Builds requests for each endpoint from the labelled query set"""
+
+    def __init__(self, queries, unique, batch_size, rng):
+        self.queries = queries
+        self.unique = unique
+        self.batch_size = batch_size
+        self.rng = rng
+        self.counter = 0
+
+    def text(self):
+        query = self.rng.choice(self.queries)
+        # A share of queries are made distinct so they miss the result cache
+        if self.rng.random() < self.unique:
+            self.counter += 1
+            query = f"{query} {self.counter}"
+        return query
+
+    def request(self, endpoint):
+        if endpoint == "query":
+            return "POST", "/query", {"query": self.text()}
+        if endpoint == "batch":
+            return "POST", "/query/batch", {"queries": [{"query": self.text()} for _ in range(self.batch_size)]}
+        if endpoint == "random":
+            return "GET", "/random", None
+        return "GET", "/catalog", None
+
+
+async def run_rate(url, rate, seconds, concurrency, mix, workload, rng):
+    """Drive one arrival rate; returns per-endpoint outcomes and elapsed time"""
+    outcomes = {endpoint: [] for endpoint in mix}
+    names, weights = list(mix), list(mix.values())
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30.0)
+
+    async with aiohttp.ClientSession(url, connector=connector, timeout=timeout) as client:
+        async def one(endpoint, scheduled):
+            method, path, body = workload.request(endpoint)
+            try:
+                async with client.request(method, path, json=body) as response:
+                    await response.read()
+                    ok = response.status < 400
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                ok = False
+            outcomes[endpoint].append((ok, time.perf_counter() - scheduled))
+
+        tasks = []
+        total = int(rate * seconds)
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            endpoint = rng.choices(names, weights)[0]
+            tasks.append(asyncio.ensure_future(one(endpoint, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return outcomes, elapsed
+
+
+def summarize(outcomes, elapsed):
+    rows = {}
+    for endpoint, results in list(outcomes.items()) + [("all", [r for rs in outcomes.values() for r in rs])]:
+        if not results:
+            continue
+        ok = [latency for success, latency in results if success]
+        latencies = np.array(ok or [0.0]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        rows[endpoint] = {
+            "sent": len(results),
+            "ok": len(ok),
+            "error_rate": 1 - len(ok) / len(results),
+            "throughput": len(ok) / elapsed,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+        }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the RAG API over HTTP")
+    parser.add_argument("--rates", type=float, nargs="+", default=[25, 50, 100, 200, 400])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=256, help="Client connection limit")
+    parser.add_argument("--mix", default="query=8,batch=1,random=1", help="Endpoint weights")
+    parser.add_argument("--unique", type=float, default=0.5, help="Share of queries that miss the result cache")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--provider-latency-ms", type=float, default=80.0, help="Fake embedding request latency")
+    parser.add_argument("--backend", default="numpy", choices=["chroma", "numpy", "mmap"])
+    parser.add_argument("--server-limit", type=int, default=None, help="Uvicorn limit_concurrency (503 beyond it)")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0, help="p99 latency a sustainable rate must meet")
+    parser.add_argument("--url", default=None, help="Load an already running server instead of starting one")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(QUERIES_PATH, "r", encoding="utf-8") as f:
+        queries = [case["query"] for case in json.load(f)]
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    workload = Workload(queries, args.unique, args.batch_size, rng)
+
+    server = None
+    workdir = tempfile.TemporaryDirectory()
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = multiprocessing.get_context("spawn").Process(
+            target=serve,
+            args=(port, args.backend, args.provider_latency_ms / 1000, args.server_limit, workdir.name),
+            daemon=True
+        )
+        server.start()
+    results = []
+    try:
+        wait_ready(url)
+        print(f"{url}, mix {args.mix}, {args.unique:.0%} unique queries, provider {args.provider_latency_ms:.0f}ms")
+        print(f"{'rps':>6} {'endpoint':>8} {'sent':>6} {'ok/s':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for rate in args.rates:
+            outcomes, elapsed = asyncio.run(
+                run_rate(url, rate, args.seconds, args.concurrency, mix, workload, rng)
+            )
+            rows = summarize(outcomes, elapsed)
+            results.append({"rate": rate, "elapsed": elapsed, "endpoints": rows})
+            for endpoint, row in rows.items():
+                print(
+                    f"{rate:>6.0f} {endpoint:>8} {row['sent']:>6} {row['throughput']:>7.1f} "
+                    f"{row['error_rate']:>7.1%} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+                )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+        workdir.cleanup()
+
+    # Sustainable: nearly every arrival served, few errors, p99 inside the SLO
+    sustained = [
+        result["rate"] for result in results
+        if result["endpoints"]["all"]["throughput"] >= 0.95 * result["rate"]
+        and result["endpoints"]["all"]["error_rate"] < 0.01
+        and result["endpoints"]["all"]["p99_ms"] <= args.slo_p99_ms
+    ]
+    if sustained:
+        print(f"\nHighest sustained rate: {max(sustained):.0f} req/s per replica (p99 <= {args.slo_p99_ms:.0f}ms)")
+    else:
+        print(f"\nNo tested rate was sustained within p99 <= {args.slo_p99_ms:.0f}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results, "sustained_rps": max(sustained, default=None)}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmark_microbatch.py
+# Load test for query embedding micro-batching: fires distinct queries at a
+# fixed arrival rate against an offline provider whose latency grows with
+# batch size, with batching off and on. Runs offline; no OpenAI key needed.
+#
+#   python tests/benchmark_microbatch.py --rates 5 100 400 1000 --seconds 3
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import argparse
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding
+from rag_system.cache import LRUCache
+
+
+class SlowProvider:
+    """Async provider taking ``base`` seconds per request plus ``per_item`` per input"""
+
+    def __init__(self, base, per_item, dimensions=64):
+        self.base = base
+        self.per_item = per_item
+        self.dimensions = dimensions
+        self.requests = 0
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    async def create(self, input, model):
+        self.requests += 1
+        await asyncio.sleep(self.base + self.per_item * len(input))
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[b / 255.0 for b in hashlib.sha256(text.encode()).digest()[:self.dimensions]])
+            for i, text in enumerate(input)
+        ])
+
+
+async def run_load(rate, seconds):
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        await embedding.aembed_query(f"distinct query {i} {time.perf_counter()}")
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    total = int(rate * seconds)
+    start = time.perf_counter()
+    for i in range(total):
+        # Open loop: arrivals follow the clock, not completions
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(i)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return np.array(latencies) * 1000, total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query embedding micro-batching under load")
+    parser.add_argument("--rates", type=float, nargs="+", default=[5, 100, 400, 1000])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--base-ms", type=float, default=80.0, help="Provider latency per request")
+    parser.add_argument("--per-item-ms", type=float, default=0.2, help="Provider latency per input")
+    args = parser.parse_args()
+
+    embedding.set_embedding_cache(None)
+    embedding.EMBEDDING_CACHE_ENABLED = False
+    print(f"concurrency limit {embedding.EMBEDDING_CONCURRENCY}, window {embedding.EMBEDDING_MICROBATCH_WINDOW_MS}ms")
+    print(f"{'rps':>6} {'batching':>9} {'done/s':>7} {'calls':>6} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    for rate in args.rates:
+        for enabled in (False, True):
+            provider = SlowProvider(args.base_ms / 1000, args.per_item_ms / 1000)
+            embedding.set_async_openai_client(provider)
+            embedding.query_cache = LRUCache()
+            embedding.EMBEDDING_MICROBATCH_ENABLED = enabled
+            latencies, throughput = asyncio.run(run_load(rate, args.seconds))
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            print(
+                f"{rate:>6.0f} {'on' if enabled else 'off':>9} {throughput:>7.0f} {provider.requests:>6} "
+                f"{p50:>7.1f} {p95:>7.1f} {p99:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmark_phrase_scanner.py
+# Measures Aho-Corasick build time and per-message scan cost as the
+# phrase catalog grows. Runs offline on synthetic phrases.
+#
+#   python tests/benchmark_phrase_scanner.py --sizes 1000 10000 100000
+import os
+import sys
+import time
+import random
+import string
+import argparse
+
+# Add the parent directory to sys.path to allow imports from discord_bot
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from discord_bot.phrase_scanner import PhraseScanner
+
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+
+def synthetic_catalog(size, rng):
+    catalog = []
+    for _ in range(size):
+        words = [random_word(rng) for _ in range(rng.choice([1, 1, 2, 3]))]
+        catalog.append({"phrase": " ".join(words), "meaning": "", "usage_example": ""})
+    return catalog
+
+
+def synthetic_messages(catalog, count, rng, words_per_message=20):
+    messages = []
+    for _ in range(count):
+        words = [random_word(rng) for _ in range(words_per_message)]
+        # Sprinkle a couple of known phrases into each message
+        for _ in range(2):
+            words.insert(rng.randrange(len(words)), rng.choice(catalog)["phrase"])
+        messages.append(" ".join(words))
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bot's phrase scanner")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'phrases':>8} {'build s':>8} {'scan us/msg':>12} {'hits/msg':>9}")
+    for size in args.sizes:
+        catalog = synthetic_catalog(size, rng)
+        messages = synthetic_messages(catalog, args.messages, rng)
+
+        start = time.perf_counter()
+        scanner = PhraseScanner(catalog)
+        build_seconds = time.perf_counter() - start
+
+        hits = 0
+        start = time.perf_counter()
+        for message in messages:
+            hits += len(scanner.scan(message))
+        scan_micros = (time.perf_counter() - start) / len(messages) * 1e6
+
+        print(f"{size:>8} {build_seconds:>8.2f} {scan_micros:>12.1f} {hits / len(messages):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
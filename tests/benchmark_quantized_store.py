@@ -0,0 +1,86 @@
+# benchmark_quantized_store.py
+# Measures recall loss against memory saved for the memory-mapped float16
+# and int8 vector stores, using the float32 NumPy store as ground truth.
+# Runs offline on clustered synthetic embeddings.
+#
+#   python tests/benchmark_quantized_store.py --sizes 10000 50000 --dimensions 1536
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system.storage import MmapVectorStore, NumpyVectorStore
+
+
+def clustered_unit_vectors(count, dimensions, rng, clusters=200, spread=0.6):
+    """Unit vectors scattered around random topic centres, like real embeddings"""
+    centres = rng.normal(size=(clusters, dimensions)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, size=count)]
+    vectors += spread * rng.normal(size=(count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def populate(store, vectors):
+    ids = [f"phrase_{i}" for i in range(len(vectors))]
+    store.add(ids, ids, vectors, [{"i": i} for i in range(len(vectors))])
+    return store
+
+
+def run_queries(store, queries, n_results):
+    found = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        result = store.query([query], n_results=n_results)
+        latencies.append(time.perf_counter() - start)
+        found.append(result["ids"][0])
+    return found, np.percentile(np.array(latencies) * 1000, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized memory-mapped vector stores")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'vectors':>8} {'store':>8} {'MB':>8} {'saved':>6} {f'recall@{args.n_results}':>10} {'p50 ms':>7}")
+    for size in args.sizes:
+        vectors = clustered_unit_vectors(size, args.dimensions, rng)
+        # Queries are noisy copies of stored rows
+        queries = vectors[rng.integers(0, size, size=args.queries)]
+        queries = queries + 0.3 * rng.normal(size=queries.shape).astype(np.float32) / np.sqrt(args.dimensions)
+
+        exact = populate(NumpyVectorStore(), vectors)
+        truth, p50 = run_queries(exact, queries, args.n_results)
+        baseline = exact.nbytes()
+        print(f"{size:>8} {'float32':>8} {baseline / 1e6:>8.1f} {'-':>6} {1.0:>10.3f} {p50:>7.2f}")
+        del exact
+
+        for dtype in ("float16", "int8"):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = populate(MmapVectorStore(os.path.join(tmp, "index"), dtype), vectors)
+                found, p50 = run_queries(store, queries, args.n_results)
+                recall = np.mean([
+                    len(set(expected) & set(actual)) / len(expected)
+                    for expected, actual in zip(truth, found)
+                ])
+                saved = 1 - store.nbytes() / baseline
+                print(
+                    f"{size:>8} {dtype:>8} {store.nbytes() / 1e6:>8.1f} {saved:>6.0%} "
+                    f"{recall:>10.3f} {p50:>7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
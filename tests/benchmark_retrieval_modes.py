@@ -0,0 +1,89 @@
+# benchmark_retrieval_modes.py
+# Compares recall of vector, lexical and hybrid retrieval on a labelled set of
+# paraphrased queries (tests/benchmark_queries.json). By default runs offline
+# with a hashed bag-of-words embedder; --live uses the configured provider.
+#
+#   python tests/benchmark_retrieval_modes.py --k 3
+#   OPENAI_API_KEY=... python tests/benchmark_retrieval_modes.py --live
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding, storage
+from rag_system.retrieval import search_australianisms
+from fake_provider import BagOfWordsEmbeddingClient
+
+QUERIES_PATH = os.path.join(parent_dir, "tests/benchmark_queries.json")
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+
+def evaluate(labelled, mode, k):
+    recall_at_1 = recall_at_k = reciprocal_rank = 0.0
+    latencies = []
+    for case in labelled:
+        start = time.perf_counter()
+        matches = search_australianisms(case["query"], max_results=k, threshold=0.0, mode=mode)
+        latencies.append(time.perf_counter() - start)
+
+        phrases = [match["phrase"] for match in matches]
+        if case["phrase"] in phrases:
+            rank = phrases.index(case["phrase"]) + 1
+            recall_at_1 += rank == 1
+            recall_at_k += 1
+            reciprocal_rank += 1.0 / rank
+
+    count = len(labelled)
+    return {
+        "recall@1": recall_at_1 / count,
+        f"recall@{k}": recall_at_k / count,
+        "mrr": reciprocal_rank / count,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector, lexical and hybrid retrieval")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="Embed with the configured provider")
+    args = parser.parse_args()
+
+    with open(QUERIES_PATH, "r", encoding="utf-8") as f:
+        labelled = json.load(f)
+
+    if not args.live:
+        embedding.set_openai_client(BagOfWordsEmbeddingClient())
+        # Keep offline vectors out of the shared disk cache
+        embedding.EMBEDDING_CACHE_ENABLED = False
+        embedding.set_embedding_cache(None)
+
+    # Query-time only: build an in-memory index of the repo's dataset rather than touching ChromaDB
+    os.environ["AUSTRALIANISMS_PATH"] = DATA_PATH
+    storage.VECTOR_BACKEND = "numpy"
+    storage.warm_vector_store()
+    embedding.query_cache.clear()
+
+    fingerprint = storage.get_vector_store().get_fingerprint()
+    print(
+        f"{len(labelled)} labelled queries, {'live' if args.live else 'offline'} embeddings, "
+        f"{storage.get_vector_store().count()} records ({fingerprint[:12]})"
+    )
+    print(f"{'mode':>8} {'recall@1':>9} {f'recall@{args.k}':>9} {'mrr':>6} {'p50 ms':>7}")
+    for mode in ("vector", "lexical", "hybrid"):
+        result = evaluate(labelled, mode, args.k)
+        print(
+            f"{mode:>8} {result['recall@1']:>9.2f} {result[f'recall@{args.k}']:>9.2f} "
+            f"{result['mrr']:>6.2f} {result['p50_ms']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
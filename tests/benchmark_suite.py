@@ -0,0 +1,195 @@
+# benchmark_suite.py
+# Runs the labelled query set (tests/benchmark_queries.json) through
+# search_australianisms on every vector backend and retrieval mode, and
+# reports recall@1, recall@k, MRR and p50/p95/p99 latency. Runs offline with
+# the deterministic bag-of-words provider in fake_provider.py unless --live.
+#
+# Results are written as JSON so runs can be compared between commits:
+#
+#   python tests/benchmark_suite.py --output before.json
+#   git checkout my-branch
+#   python tests/benchmark_suite.py --output after.json --compare before.json
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding, storage
+from rag_system.retrieval import RETRIEVAL_MODES, search_australianisms
+from fake_provider import BagOfWordsEmbeddingClient
+
+QUERIES_PATH = os.path.join(parent_dir, "tests/benchmark_queries.json")
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+BACKENDS = ("chroma", "numpy", "mmap-int8", "mmap-float16")
+
+
+def git_commit():
+    """Commit the suite is running against, or None outside a checkout"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=parent_dir, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_meta(data_path):
+    """Fingerprint and record count of the dataset the indexes are built from"""
+    hashes = {
+        record_id: storage.content_hash(item)
+        for record_id, item in storage.iter_record_ids(storage.AustralianismsFile(data_path))
+    }
+    return {
+        "path": os.path.relpath(data_path, parent_dir),
+        "fingerprint": storage.dataset_fingerprint(hashes),
+        "records": len(hashes),
+    }
+
+
+def use_backend(backend, workdir):
+    """Point the storage module at a fresh index for ``backend`` under ``workdir``"""
+    name, _, dtype = backend.partition("-")
+    # Index the repo's dataset wherever the suite is run from
+    os.environ["AUSTRALIANISMS_PATH"] = DATA_PATH
+    storage.VECTOR_BACKEND = name
+    storage.CHROMA_DB_PATH = os.path.join(workdir, backend, "chroma_db")
+    storage.MMAP_INDEX_PATH = os.path.join(workdir, backend, "mmap_index")
+    storage.MMAP_DTYPE = dtype or storage.MMAP_DTYPE
+    storage._client = None
+    storage._store = None
+    storage.warm_vector_store()
+
+
+def evaluate(labelled, mode, k, threshold, repeat):
+    """Score one mode on the warm store; latency covers ``repeat`` timed passes"""
+    # Untimed pass: fills the query embedding cache so timings measure retrieval
+    ranked = [
+        [match["phrase"] for match in search_australianisms(case["query"], k, threshold, mode)]
+        for case in labelled
+    ]
+
+    latencies = []
+    for _ in range(repeat):
+        for case in labelled:
+            start = time.perf_counter()
+            search_australianisms(case["query"], k, threshold, mode)
+            latencies.append(time.perf_counter() - start)
+
+    ranks = [
+        phrases.index(case["phrase"]) + 1 if case["phrase"] in phrases else None
+        for case, phrases in zip(labelled, ranked)
+    ]
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "recall@1": sum(rank == 1 for rank in ranks) / len(ranks),
+        f"recall@{k}": sum(rank is not None for rank in ranks) / len(ranks),
+        "mrr": sum(1.0 / rank for rank in ranks if rank) / len(ranks),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "misses": [case["query"] for case, rank in zip(labelled, ranks) if rank is None],
+    }
+
+
+def compare(results, baseline, k, dataset):
+    """Print changes against a previous run's JSON"""
+    before = {(row["backend"], row["mode"]): row for row in baseline["results"]}
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    if baseline["meta"].get("dataset", {}).get("fingerprint") != dataset["fingerprint"]:
+        print("Note: the baseline was run on a different dataset")
+    print(f"{'backend':>13} {'mode':>8} {f'recall@{k}':>10} {'mrr':>7} {'p95 ms':>8}")
+    for row in results:
+        old = before.get((row["backend"], row["mode"]))
+        if old is None or f"recall@{k}" not in old:
+            continue
+        print(
+            f"{row['backend']:>13} {row['mode']:>8} "
+            f"{row[f'recall@{k}'] - old[f'recall@{k}']:>+10.3f} "
+            f"{row['mrr'] - old['mrr']:>+7.3f} "
+            f"{row['p95_ms'] - old['p95_ms']:>+8.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval quality and latency suite")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--modes", nargs="+", default=list(RETRIEVAL_MODES), choices=RETRIEVAL_MODES)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes over the query set")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to diff against")
+    parser.add_argument("--live", action="store_true", help="Embed with the configured provider")
+    args = parser.parse_args()
+
+    with open(QUERIES_PATH, "r", encoding="utf-8") as f:
+        labelled = json.load(f)
+
+    if not args.live:
+        embedding.set_openai_client(BagOfWordsEmbeddingClient())
+        # Keep offline vectors out of the shared disk cache
+        embedding.EMBEDDING_CACHE_ENABLED = False
+        embedding.set_embedding_cache(None)
+
+    dataset = dataset_meta(DATA_PATH)
+    results = []
+    print(
+        f"{len(labelled)} labelled queries, {'live' if args.live else 'offline'} embeddings, "
+        f"{dataset['records']} records ({dataset['fingerprint'][:12]})"
+    )
+    print(
+        f"{'backend':>13} {'mode':>8} {'recall@1':>9} {f'recall@{args.k}':>9} {'mrr':>6} "
+        f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends:
+            use_backend(backend, workdir)
+            for mode in args.modes:
+                row = {"backend": backend, "mode": mode, **evaluate(labelled, mode, args.k, args.threshold, args.repeat)}
+                results.append(row)
+                print(
+                    f"{backend:>13} {mode:>8} {row['recall@1']:>9.3f} {row[f'recall@{args.k}']:>9.3f} "
+                    f"{row['mrr']:>6.3f} {row['p50_ms']:>7.2f} {row['p95_ms']:>7.2f} {row['p99_ms']:>7.2f}"
+                )
+        # Release Chroma's files before the directory goes away
+        storage._client = None
+        storage._store = None
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "run_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "embeddings": embedding.EMBEDDING_MODEL if args.live else "bag-of-words",
+            "dataset": dataset,
+            "queries": len(labelled),
+            "k": args.k,
+            "threshold": args.threshold,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f), args.k, dataset)
+
+
+if __name__ == "__main__":
+    main()
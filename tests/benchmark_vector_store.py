@@ -0,0 +1,83 @@
+# benchmark_vector_store.py
+# Compares query latency and memory of the Chroma and NumPy vector stores
+# on synthetic unit-length embeddings. Runs offline; no OpenAI key needed.
+#
+#   python tests/benchmark_vector_store.py --sizes 30 1000 10000 --dimensions 1536
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import chromadb
+import numpy as np
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system.storage import ChromaVectorStore, NumpyVectorStore
+
+
+def rss_bytes():
+    """Current resident set size of this process (Linux), or 0 if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def random_unit_vectors(count, dimensions, seed):
+    vectors = np.random.default_rng(seed).normal(size=(count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def populate(store, vectors, chunk_size=5000):
+    for start in range(0, len(vectors), chunk_size):
+        chunk = vectors[start:start + chunk_size]
+        ids = [f"phrase_{i}" for i in range(start, start + len(chunk))]
+        store.add(ids, ids, chunk.tolist(), [{"i": i} for i in range(start, start + len(chunk))])
+
+
+def time_queries(store, queries, n_results):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.query([query], n_results=n_results)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chroma and NumPy vector store latency and memory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 1000, 10000])
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'size':>8} {'p50 ms':>9} {'p95 ms':>9} {'memory MB':>10}")
+    for size in args.sizes:
+        vectors = random_unit_vectors(size, args.dimensions, seed=size)
+        queries = random_unit_vectors(args.queries, args.dimensions, seed=size + 1).tolist()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            before = rss_bytes()
+            client = chromadb.PersistentClient(path=tmp)
+            chroma = ChromaVectorStore(client.create_collection(f"bench_{size}"))
+            populate(chroma, vectors)
+            chroma_memory = rss_bytes() - before
+            p50, p95 = time_queries(chroma, queries, args.n_results)
+            print(f"{'chroma':<8} {size:>8} {p50:>9.3f} {p95:>9.3f} {chroma_memory / 1e6:>10.1f}")
+
+        numpy_store = NumpyVectorStore()
+        populate(numpy_store, vectors)
+        p50, p95 = time_queries(numpy_store, queries, args.n_results)
+        print(f"{'numpy':<8} {size:>8} {p50:>9.3f} {p95:>9.3f} {numpy_store.nbytes() / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# conftest.py
+# Shared fixtures for the offline rag_system tests
+import os
+import sys
+import random
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding
+from rag_system.cache import EmbeddingCache, LRUCache
+
+# Live Discord/Modal scripts that connect on import; run them by hand
+collect_ignore = [
+    "test_bot_commands.py",
+    "test_bot_connection.py",
+    "test_real_bot.py",
+]
+
+
+class FakeEmbeddingClient:
+    """Stands in for the OpenAI client and counts embeddings requests"""
+
+    def __init__(self, dimensions=8, latency=0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.requests = []
+        # Extra options (e.g. reduced dimensions) sent with each request
+        self.options = []
+        self.embeddings = SimpleNamespace(create=self._create)
+        # AsyncOpenAI-shaped view over the same fake provider
+        self.async_client = SimpleNamespace(embeddings=SimpleNamespace(create=self._acreate))
+
+    def vector_for(self, text, dimensions=None):
+        digest = hashlib.sha256(text.lower().encode("utf-8")).digest()
+        return [b / 255.0 for b in digest[:dimensions or self.dimensions]]
+
+    def _create(self, input, model, dimensions=None):
+        inputs = [input] if isinstance(input, str) else list(input)
+        self.requests.append(inputs)
+        self.options.append({"model": model, "dimensions": dimensions})
+        data = [
+            SimpleNamespace(index=i, embedding=self.vector_for(text, dimensions))
+            for i, text in enumerate(inputs)
+        ]
+        # Shuffle so callers have to honour the index field
+        random.shuffle(data)
+        return SimpleNamespace(data=data)
+
+    async def _acreate(self, input, model, dimensions=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._create(input, model, dimensions)
+
+
+@pytest.fixture
+def fake_client(tmp_path, monkeypatch):
+    client = FakeEmbeddingClient()
+    monkeypatch.setattr(embedding, "query_cache", LRUCache())
+    embedding.set_openai_client(client)
+    embedding.set_async_openai_client(client.async_client)
+    embedding.set_embedding_cache(EmbeddingCache(str(tmp_path / "embedding_cache.sqlite3")))
+    yield client
+    embedding.set_openai_client(None)
+    embedding.set_async_openai_client(None)
+    embedding.set_embedding_cache(None)
@@ -0,0 +1,51 @@
+# fake_provider.py
+# Deterministic offline stand-in for the OpenAI embeddings API, shared by the
+# benchmark scripts so retrieval can be measured without an API key.
+import asyncio
+import hashlib
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from rag_system.catalog import tokenize
+
+
+class BagOfWordsEmbeddingClient:
+    """Normalized hashed term counts, so texts sharing words get similar vectors"""
+
+    def __init__(self, dimensions=256, latency=0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.requests = 0
+        self.embeddings = SimpleNamespace(create=self._create)
+        # AsyncOpenAI-shaped view over the same provider
+        self.async_client = SimpleNamespace(embeddings=SimpleNamespace(create=self._acreate))
+
+    def vector_for(self, text, dimensions=None):
+        size = dimensions or self.dimensions
+        vector = np.zeros(size, dtype=np.float32)
+        for term in tokenize(text):
+            digest = hashlib.sha256(term.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % size] += 1.0
+        # Unit length like OpenAI's embeddings, which Chroma's L2 distance relies on
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def _response(self, input, dimensions):
+        inputs = [input] if isinstance(input, str) else list(input)
+        self.requests += 1
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=self.vector_for(text, dimensions))
+            for i, text in enumerate(inputs)
+        ])
+
+    def _create(self, input, model, dimensions=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response(input, dimensions)
+
+    async def _acreate(self, input, model, dimensions=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._response(input, dimensions)
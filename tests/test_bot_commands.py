@@ -31,13 +31,20 @@ async def on_ready():
             # Initialize the database
             print("\nInitializing the database...")
             async with session.post(f"{RAG_API_URL}/init") as response:
-                if response.status == 201:
-                    print(f"Database initialization successful: {await response.text()}")
+                if response.status == 202:
+                    job = await response.json()
+                    print(f"Database initialization started: job {job['job_id']}")
                 else:
                     print(f"Database initialization failed: {response.status} - {await response.text()}")
+                    job = None
             
-            # Wait a moment for initialization to complete
-            await asyncio.sleep(2)
+            # Wait for the background initialization to complete
+            while job is not None and job["status"] == "running":
+                await asyncio.sleep(2)
+                async with session.get(f"{RAG_API_URL}{job['status_url']}") as response:
+                    job = await response.json()
+            if job is not None:
+                print(f"Database initialization {job['status']}: {job['message']}")
 
             # Test a query
             payload = {"query": "g'day", "max_results": 1, "threshold": 0.5}
@@ -0,0 +1,80 @@
+# test_build_index.py
+# Offline tests for the prebuilt index artifact
+import os
+import sys
+import json
+
+import pytest
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import storage
+from rag_system.build_index import build_index_artifact, load_manifest
+from rag_system.embedding import EmbeddingError
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+
+@pytest.fixture
+def artifact(fake_client, tmp_path):
+    output = str(tmp_path / "index_artifact")
+    manifest = build_index_artifact(output, DATA_PATH, "int8")
+    return output, manifest
+
+
+def test_artifact_holds_vectors_catalog_and_manifest(artifact):
+    output, manifest = artifact
+
+    assert load_manifest(output) == manifest
+    assert manifest["count"] == 30
+    assert manifest["dtype"] == "int8"
+    assert manifest["dimensions"] == 8
+    with open(os.path.join(output, "australianisms.json"), encoding="utf-8") as f:
+        assert len(json.load(f)) == manifest["count"]
+    assert load_manifest(str(os.path.dirname(output))) is None
+
+
+def test_read_only_artifact_serves_without_embedding(artifact, fake_client, monkeypatch):
+    output, manifest = artifact
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", os.path.join(output, "australianisms.json"))
+    monkeypatch.setattr(storage, "VECTOR_BACKEND", "mmap")
+    monkeypatch.setattr(storage, "MMAP_INDEX_PATH", os.path.join(output, "mmap_index"))
+    # The configured element type is ignored in favour of the artifact's
+    monkeypatch.setattr(storage, "MMAP_DTYPE", "float16")
+    monkeypatch.setattr(storage, "MMAP_READ_ONLY", True)
+    monkeypatch.setattr(storage, "_store", None)
+    requests_before = len(fake_client.requests)
+
+    count = storage.warm_vector_store()
+
+    assert count == manifest["count"]
+    assert len(fake_client.requests) == requests_before
+    assert storage.index_status()["fingerprint"] == manifest["fingerprint"]
+    # An unchanged dataset syncs as a no-op; writes are refused
+    assert storage.init_vector_store()["skipped"] == manifest["count"]
+    with pytest.raises(PermissionError):
+        storage.get_vector_store().delete([storage.get_vector_store().get_hashes().popitem()[0]])
+
+
+def test_rebuilding_replaces_the_artifact_only_once_complete(artifact, monkeypatch):
+    output, manifest = artifact
+    generate_embeddings = storage.generate_embeddings
+
+    def provider_down(texts, strict=False):
+        raise EmbeddingError("provider down")
+
+    monkeypatch.setattr(storage, "generate_embeddings", provider_down)
+    with pytest.raises(EmbeddingError):
+        build_index_artifact(output, DATA_PATH, "float16")
+    # A failed build leaves the previous artifact in place
+    assert load_manifest(output) == manifest
+
+    monkeypatch.setattr(storage, "generate_embeddings", generate_embeddings)
+    rebuilt = build_index_artifact(output, DATA_PATH, "float16")
+
+    assert load_manifest(output) == rebuilt
+    assert rebuilt["dtype"] == "float16"
+    assert not os.path.exists(output + ".old") and not os.path.exists(output + ".tmp")
@@ -0,0 +1,138 @@
+# test_cache.py
+# Offline tests for the embedding caches
+import os
+import sys
+import time
+import asyncio
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system.cache import EmbeddingCache, LRUCache, SingleFlight
+
+
+def test_embedding_cache_round_trip(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many("model-a", ["arvo"], [[0.5, 0.25]])
+
+    assert cache.get_many("model-a", ["arvo", "esky"]) == [[0.5, 0.25], None]
+    # The model name is part of the key
+    assert cache.get_many("model-b", ["arvo"]) == [None]
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_embedding_cache_persists(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path)
+    cache.put_many("model-a", ["arvo"], [[1.0]])
+    cache.close()
+
+    assert EmbeddingCache(path).get_many("model-a", ["arvo"]) == [[1.0]]
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    # Each 4-dim float32 vector is 16 bytes, so two fit
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=32)
+    vector = [0.0] * 4
+
+    cache.put_many("m", ["a"], [vector])
+    cache.put_many("m", ["b"], [vector])
+    cache.get_many("m", ["a"])  # Touch "a" so "b" is the oldest
+    cache.put_many("m", ["c"], [vector])
+
+    assert cache.get_many("m", ["a", "b", "c"]) == [vector, None, vector]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 32
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(capacity=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LRUCache(capacity=2, ttl=10)
+    cache.put("a", 1)
+
+    now[0] += 5
+    assert cache.get("a") == 1
+    now[0] += 10
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_cache_evicts_to_stay_under_max_bytes():
+    cache = LRUCache(capacity=10, ttl=60, max_bytes=100)
+    cache.put("a", b"x" * 40, size=40)
+    cache.put("b", b"x" * 40, size=40)
+    cache.put("a", b"x" * 50, size=50)  # Replacing an entry re-charges its size
+    cache.put("c", b"x" * 30, size=30)
+    cache.put("huge", b"x" * 101, size=101)
+
+    assert cache.get("b") is None
+    assert cache.get("huge") is None
+    assert cache.get("a") == b"x" * 50
+    assert cache.stats()["bytes"] == 80
+    assert cache.stats()["evictions"] == 1
+
+
+def test_single_flight_shares_one_computation():
+    flights = SingleFlight()
+    started = []
+
+    async def compute(value):
+        started.append(value)
+        await asyncio.sleep(0.05)
+        return [value]
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.do("arvo", lambda: compute("arvo")) for _ in range(5)),
+            flights.do("esky", lambda: compute("esky"))
+        )
+
+    results = asyncio.run(run())
+
+    assert started == ["arvo", "esky"]
+    assert results[0] is results[4]
+    assert flights.stats() == {"computations": 2, "saved_calls": 4, "saved_rate": 4 / 6, "in_flight": 0}
+
+
+def test_single_flight_shares_failures_and_survives_cancelled_callers():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("k", failing))
+        second = asyncio.ensure_future(flights.do("k", failing))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(run())
+
+    assert isinstance(first, asyncio.CancelledError)
+    assert isinstance(second, RuntimeError)
+    assert flights.stats()["in_flight"] == 0
+
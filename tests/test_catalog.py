@@ -0,0 +1,171 @@
+# test_catalog.py
+# Offline tests for the in-memory phrase catalog
+import os
+import sys
+import json
+from collections import Counter
+
+import pytest
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system.catalog import (
+    BM25Index, CatalogRecord, PhraseIndex, RandomSampler, RecordTable, TrigramIndex, bounded_edit_distance,
+    normalize_phrase, serialize_matches, tokenize
+)
+from rag_system.storage import record_ids
+
+CATALOG = [
+    {"phrase": "G'day", "meaning": "Hello", "usage_example": "G'day mate!", "aliases": ["Gidday"]},
+    {"phrase": "Fair dinkum", "meaning": "Genuine", "usage_example": "Fair dinkum, mate."},
+    {"phrase": "Thongs", "meaning": "Flip-flops", "usage_example": "Wear your thongs."},
+    {"phrase": "Bottle-o", "meaning": "Liquor store", "usage_example": "Off to the bottle-o."},
+]
+
+
+def test_normalize_phrase():
+    assert normalize_phrase("  G’DAY!! ") == "gday"
+    assert normalize_phrase("Bottle-o") == "bottle o"
+    assert normalize_phrase("fair   dinkum?") == "fair dinkum"
+
+
+@pytest.mark.parametrize("query, phrase", [
+    ("g'day", "G'day"),
+    ("GDAY", "G'day"),
+    ("gidday", "G'day"),
+    ("Fair Dinkum!", "Fair dinkum"),
+    ("fair dinkums", "Fair dinkum"),
+    ("thong", "Thongs"),
+    ("bottle o", "Bottle-o"),
+])
+def test_phrase_index_matches_variants(query, phrase):
+    assert PhraseIndex(CATALOG).lookup(query)["phrase"] == phrase
+
+
+def test_phrase_index_counts_hits():
+    index = PhraseIndex(CATALOG)
+
+    assert index.lookup("what does fair dinkum mean") is None
+    assert index.lookup("gday") is not None
+
+    assert index.stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.parametrize("query, phrase", [
+    ("giddday", "G'day"),
+    ("thongz", "Thongs"),
+    ("fair dinkem", "Fair dinkum"),
+    ("dinkem", "Fair dinkum"),
+    ("botle o", "Bottle-o"),
+])
+def test_trigram_index_tolerates_typos(query, phrase):
+    item, score = TrigramIndex(CATALOG).lookup(query, fallback=True)
+
+    assert item["phrase"] == phrase
+    assert 0.75 <= score < 1.0
+
+
+def test_trigram_fast_path_only_takes_confident_typos():
+    index = TrigramIndex(CATALOG)
+
+    assert index.lookup("fair dinkem")[0]["phrase"] == "Fair dinkum"
+    # One edit on six letters is left to the fallback
+    assert index.lookup("thongz") is None
+    assert index.lookup("thongz", fallback=True)[0]["phrase"] == "Thongs"
+    assert index.stats()["hits"] == index.stats()["fallback_hits"] == 1
+
+
+@pytest.mark.parametrize("query", ["mat", "what does fair dinkum mean", "thingamajig"])
+def test_trigram_index_rejects_distant_queries(query):
+    assert TrigramIndex(CATALOG).lookup(query) is None
+
+
+@pytest.mark.parametrize("word", ["late", "date", "cute", "mute", "grow", "dunno"])
+def test_trigram_index_leaves_common_words_alone(word):
+    with open(os.path.join(parent_dir, "data/australianisms.json"), encoding="utf-8") as f:
+        index = TrigramIndex(json.load(f))
+
+    assert index.lookup(word) is None
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance("dinkem", "dinkum", 2) == 1
+    assert bounded_edit_distance("gdaay", "gday", 1) == 1
+    assert bounded_edit_distance("arvo", "esky", 2) == 3
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("What does Thongs mean?") == ["thong"]
+    assert tokenize("the glass is full") == ["glass", "full"]
+
+
+@pytest.mark.parametrize("query, phrase", [
+    ("flip-flops", "Thongs"),
+    ("where is the liquor store", "Bottle-o"),
+    ("is that genuine", "Fair dinkum"),
+])
+def test_bm25_index_ranks_by_description(query, phrase):
+    results = BM25Index(CATALOG).search(query, limit=2)
+
+    assert results[0][0]["phrase"] == phrase
+    assert 0.0 < results[0][1] <= 1.0
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_bm25_index_ignores_unknown_terms():
+    assert BM25Index(CATALOG).search("quantum chromodynamics") == []
+
+
+def test_random_sampler_is_reproducible_with_a_seed():
+    sampler = RandomSampler(CATALOG)
+
+    assert sampler.sample(seed=7) == sampler.sample(seed=7)
+    assert {sampler.sample()["phrase"] for _ in range(200)} == {item["phrase"] for item in CATALOG}
+
+
+def test_random_sampler_honours_weights():
+    weighted = [dict(item, weight=weight) for item, weight in zip(CATALOG, [6, 2, 2, 0])]
+    sampler = RandomSampler(weighted)
+
+    draws = Counter(sampler.sample(seed=seed)["phrase"] for seed in range(5000))
+
+    assert draws["Bottle-o"] == 0
+    assert 0.55 < draws["G'day"] / 5000 < 0.65
+    assert len(Counter(sampler.sample(seed=seed, weighted=False)["phrase"] for seed in range(500))) == 4
+    assert RandomSampler([]).sample() is None
+
+
+def test_serialized_matches_equal_json_dumps():
+    catalog = CATALOG + [{"phrase": "Str\u00e8uth \"mate\"", "meaning": "Wow\n", "usage_example": "\u2018Strewth!\u2019"}]
+    table = RecordTable(catalog)
+    hits = [(table.for_item(item), score) for item, score in zip(catalog, [1.0, 0.8734, 1e-7, 2, 0.5])]
+
+    expected = json.dumps([record.to_match(score) for record, score in hits]).encode("utf-8")
+
+    assert serialize_matches(hits) == expected
+    assert serialize_matches([]) == b"[]"
+    fused = [(record, score, 1 / 61) for record, score in hits]
+    assert serialize_matches(fused) == json.dumps([record.to_match(*scores) for record, *scores in fused]).encode("utf-8")
+
+
+def test_record_table_is_keyed_by_index_id():
+    table = RecordTable(CATALOG)
+    ids = record_ids(CATALOG)
+
+    assert len(table) == len(CATALOG)
+    assert table.get(ids[1]).phrase == "Fair dinkum"
+    assert table.for_item(CATALOG[1]) is table.get(ids[1])
+    assert table.get("phrase_unknown") is None
+    # Entries from outside the catalog still get a record
+    assert table.for_item(dict(CATALOG[2])).id == ids[2]
+
+
+def test_catalog_record_from_stored_document():
+    record = CatalogRecord.from_document("phrase_1", json.dumps(CATALOG[0]))
+    legacy = CatalogRecord.from_document("phrase_2", "Arvo\nAfternoon")
+
+    assert record.to_match(0.9) == {"phrase": "G'day", "meaning": "Hello", "usage_example": "G'day mate!", "score": 0.9}
+    assert (legacy.phrase, legacy.meaning) == ("Arvo", "Unknown")
@@ -0,0 +1,186 @@
+# test_embedding.py
+# Offline tests for batched embedding generation using a fake provider
+import os
+import sys
+import asyncio
+
+import chromadb
+import pytest
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding
+from rag_system.storage import init_collection
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+
+def test_generate_embeddings_chunks_and_keeps_order(fake_client):
+    texts = [f"phrase {i}" for i in range(10)]
+
+    vectors = embedding.generate_embeddings(texts, batch_size=4)
+
+    assert [len(chunk) for chunk in fake_client.requests] == [4, 4, 2]
+    assert vectors == [fake_client.vector_for(text) for text in texts]
+
+
+def test_generate_embedding_single_text(fake_client):
+    assert embedding.generate_embedding("arvo") == fake_client.vector_for("arvo")
+    assert len(fake_client.requests) == 1
+
+
+def test_init_collection_uses_one_request(fake_client, monkeypatch):
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", DATA_PATH)
+    client = chromadb.EphemeralClient()
+
+    count = init_collection(client, "test_batched_init")["count"]
+
+    assert count > 1
+    assert len(fake_client.requests) == 1
+    assert len(fake_client.requests[0]) == count
+
+
+def test_rebuild_of_unchanged_dataset_hits_cache(fake_client, monkeypatch):
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", DATA_PATH)
+    client = chromadb.EphemeralClient()
+
+    count = init_collection(client, "test_cached_init")["count"]
+    init_collection(client, "test_cached_init", rebuild=True)
+
+    assert len(fake_client.requests) == 1
+    stats = embedding.get_embedding_cache().stats()
+    assert stats["misses"] == count
+    assert stats["hits"] == count
+
+
+def test_cache_only_embeds_misses(fake_client):
+    embedding.generate_embeddings(["arvo", "barbie"])
+    vectors = embedding.generate_embeddings(["arvo", "esky", "barbie"])
+
+    assert fake_client.requests == [["arvo", "barbie"], ["esky"]]
+    assert vectors[1] == pytest.approx(fake_client.vector_for("esky"))
+
+
+def test_repeated_queries_skip_the_provider(fake_client):
+    first = embedding.embed_query("G'day")
+    second = embedding.embed_query("  g'day ")
+
+    assert first == second
+    assert len(fake_client.requests) == 1
+    assert embedding.query_cache.stats()["hits"] == 1
+
+
+def test_concurrent_queries_share_a_batched_request(fake_client):
+    fake_client.latency = 0.05
+
+    async def run():
+        # Idle: the first query goes out on its own, on the next loop turn
+        first = asyncio.ensure_future(embedding.aembed_query("arvo"))
+        await asyncio.sleep(0.01)
+        # In flight: these wait for the window and go out together
+        rest = await asyncio.gather(*(embedding.aembed_query(f"query {i}") for i in range(20)))
+        return await first, rest, embedding.get_query_batcher().stats()
+
+    first, rest, stats = asyncio.run(run())
+
+    assert [len(request) for request in fake_client.requests] == [1, 20]
+    assert first == fake_client.vector_for("arvo")
+    assert rest == [fake_client.vector_for(f"query {i}") for i in range(20)]
+    assert stats["batches"] == 2
+    assert stats["items"] == 21
+
+
+def test_batcher_splits_at_max_items(fake_client, monkeypatch):
+    async def run():
+        batcher = embedding.QueryBatcher(window=0.01, max_items=8)
+        monkeypatch.setitem(embedding._batchers, asyncio.get_running_loop(), batcher)
+        return await asyncio.gather(*(embedding.aembed_query(f"query {i}") for i in range(20)))
+
+    vectors = asyncio.run(run())
+
+    assert [len(request) for request in fake_client.requests] == [8, 8, 4]
+    assert vectors[19] == fake_client.vector_for("query 19")
+
+
+def test_saturated_batcher_queues_until_a_batch_completes(fake_client, monkeypatch):
+    fake_client.latency = 0.05
+
+    async def run():
+        batcher = embedding.QueryBatcher(window=0.001, max_items=100, max_in_flight=1)
+        monkeypatch.setitem(embedding._batchers, asyncio.get_running_loop(), batcher)
+        first = asyncio.ensure_future(embedding.aembed_query("arvo"))
+        await asyncio.sleep(0.01)
+        later = []
+        for i in range(5):
+            later.append(asyncio.ensure_future(embedding.aembed_query(f"query {i}")))
+            await asyncio.sleep(0.005)
+        await asyncio.gather(first, *later)
+
+    asyncio.run(run())
+
+    # Queries arriving over 25ms while the first was in flight left together
+    assert [len(request) for request in fake_client.requests] == [1, 5]
+
+
+def test_reduced_dimensions_are_requested_from_the_provider(fake_client, monkeypatch):
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", 4)
+
+    vectors = embedding.generate_embeddings(["arvo", "barbie"])
+
+    assert fake_client.options[-1]["dimensions"] == 4
+    assert vectors == [fake_client.vector_for("arvo", 4), fake_client.vector_for("barbie", 4)]
+    assert embedding.embedding_space() == "text-embedding-3-small@4"
+
+
+@pytest.mark.parametrize("model, dimensions, method", [
+    ("text-embedding-3-small", 2048, "provider"),
+    ("text-embedding-3-small", 0, "truncate"),
+    ("text-embedding-3-small", 256, "shrink"),
+    ("text-embedding-ada-002", 256, "provider"),
+    ("text-embedding-ada-002", 256, "truncate"),
+    ("my-own-model", 0, "provider"),
+])
+def test_unsupported_dimension_settings_fail_fast(model, dimensions, method):
+    with pytest.raises(ValueError):
+        embedding.validate_embedding_settings(model, dimensions, method)
+
+
+def test_supported_dimension_settings_pass():
+    embedding.validate_embedding_settings("text-embedding-3-large", 256, "truncate")
+    embedding.validate_embedding_settings("text-embedding-ada-002", 1536, "provider")
+    embedding.validate_embedding_settings("my-own-model", 768, "provider")
+
+
+def test_failed_embeddings_are_sized_like_real_ones(fake_client, monkeypatch):
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", 4)
+    monkeypatch.setattr(fake_client.embeddings, "create", lambda **kwargs: 1 / 0)
+
+    assert embedding.generate_embeddings(["arvo"]) == [[0.0] * 4]
+    monkeypatch.setattr(embedding, "EMBEDDING_MODEL", "text-embedding-3-large")
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", 3072)
+    assert len(embedding.generate_embeddings(["arvo"])[0]) == 3072
+
+
+def test_truncated_embeddings_are_renormalized(fake_client, monkeypatch):
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", 4)
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS_METHOD", "truncate")
+
+    vector = asyncio.run(embedding.agenerate_embeddings(["arvo"]))[0]
+
+    assert fake_client.options[-1]["dimensions"] is None
+    head = fake_client.vector_for("arvo")[:4]
+    scale = sum(value * value for value in head) ** 0.5
+    assert vector == pytest.approx([value / scale for value in head])
+
+
+def test_caches_are_keyed_by_embedding_space(fake_client, monkeypatch):
+    embedding.generate_embeddings(["arvo"])
+    embedding.embed_query("esky")
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", 4)
+
+    assert len(embedding.generate_embeddings(["arvo"])[0]) == 4
+    assert len(embedding.embed_query("esky")) == 4
+    assert len(fake_client.requests) == 4
@@ -0,0 +1,372 @@
+# test_main.py
+# Offline tests for the RAG API endpoints
+import os
+import sys
+import threading
+import time
+
+import chromadb
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding, storage
+from rag_system.main import app
+from rag_system.retrieval import result_cache
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+
+@pytest.fixture
+def api(fake_client, tmp_path, monkeypatch):
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", DATA_PATH)
+    monkeypatch.setattr(storage, "_client", chromadb.PersistentClient(path=str(tmp_path / "chroma")))
+    monkeypatch.setattr(storage, "_store", None)
+    result_cache.clear()
+    with TestClient(app) as client:
+        yield client
+
+
+def wait_for_init(api, response, timeout=10.0):
+    """Poll an /init job until it finishes"""
+    assert response.status_code == 202
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = api.get(response.json()["status_url"]).json()
+        if job["status"] != "running":
+            return job
+        time.sleep(0.02)
+    raise AssertionError("init job did not finish")
+
+
+def test_startup_warms_the_collection(api, fake_client):
+    response = api.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 30
+    # The cold start built the index once; queries reuse the warm handle
+    requests_after_startup = len(fake_client.requests)
+    api.post("/query", json={"query": "see you this afternoon"})
+    api.post("/query", json={"query": "see you this afternoon"})
+    assert len(fake_client.requests) == requests_after_startup + 1
+
+
+def test_ready_reports_cold_index(fake_client, monkeypatch):
+    monkeypatch.setattr(storage, "_store", None)
+
+    response = TestClient(app).get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+
+def test_batch_query_uses_one_embedding_call(api, fake_client):
+    queries = [
+        {"query": "Arvo - Afternoon", "max_results": 1, "threshold": 0.0},
+        {"query": "Esky - Cooler, ice chest", "max_results": 2, "threshold": 0.0},
+        {"query": "arvo - afternoon", "max_results": 3, "threshold": 0.0},
+    ]
+    requests_before = len(fake_client.requests)
+
+    response = api.post("/query/batch", json={"queries": queries})
+
+    assert response.status_code == 200
+    assert len(fake_client.requests) == requests_before + 1
+    assert len(fake_client.requests[-1]) == 2  # Duplicate query embedded once
+    results = response.json()["results"]
+    assert [result["query"] for result in results] == [q["query"] for q in queries]
+    assert [len(result["matches"]) for result in results] == [1, 2, 3]
+    assert results[0]["matches"][0]["phrase"] == "Arvo"
+    assert results[1]["matches"][0]["phrase"] == "Esky"
+    # Same answers as the single-query endpoint
+    single = api.post("/query", json=queries[1]).json()
+    assert single["matches"] == results[1]["matches"]
+
+
+def test_known_phrase_skips_embeddings(api, fake_client):
+    requests_before = len(fake_client.requests)
+
+    response = api.post("/query", json={"query": "Arvos?"})
+
+    assert response.json()["matches"][0]["phrase"] == "Arvo"
+    assert response.json()["matches"][0]["score"] == 1.0
+    assert len(fake_client.requests) == requests_before
+    assert api.get("/stats").json()["exact_match_fast_path"]["hits"] >= 1
+
+
+def test_lexical_mode_skips_embeddings(api, fake_client):
+    requests_before = len(fake_client.requests)
+
+    response = api.post("/query", json={"query": "petrol station", "mode": "lexical"})
+
+    assert response.status_code == 200
+    assert response.json()["matches"][0]["phrase"] == "Servo"
+    assert len(fake_client.requests) == requests_before
+
+
+def test_hybrid_mode_fuses_lexical_and_vector_hits(api, fake_client):
+    requests_before = len(fake_client.requests)
+
+    response = api.post("/query", json={"query": "petrol station", "mode": "hybrid", "threshold": 0.0})
+
+    matches = response.json()["matches"]
+    assert len(fake_client.requests) == requests_before + 1
+    assert len(matches) == 3
+    assert "Servo" in [match["phrase"] for match in matches]
+    assert api.post("/query", json={"query": "petrol station", "mode": "fuzzy"}).status_code == 422
+
+
+def test_hybrid_scores_keep_their_meaning(api):
+    payload = {"query": "petrol station", "max_results": 6, "threshold": 0.0}
+    vector = {match["phrase"]: match["score"] for match in api.post("/query", json=payload).json()["matches"]}
+
+    matches = api.post("/query", json={**payload, "max_results": 3, "mode": "hybrid"}).json()["matches"]
+
+    # Ordered by the fused rank, which is reported separately
+    assert [match["rrf_score"] for match in matches] == sorted((match["rrf_score"] for match in matches), reverse=True)
+    from_vector = [match for match in matches if match["phrase"] in vector]
+    assert from_vector
+    for match in from_vector:
+        assert match["score"] == vector[match["phrase"]]
+    assert all("rrf_score" not in match for match in api.post("/query", json=payload).json()["matches"])
+
+
+def test_provider_outage_is_neither_answered_nor_cached(fake_client, tmp_path, monkeypatch):
+    # Index and query vectors share the fake provider's size, so a zero
+    # query vector would search the index rather than fail on its shape
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", fake_client.dimensions)
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", DATA_PATH)
+    monkeypatch.setattr(storage, "_client", chromadb.PersistentClient(path=str(tmp_path / "chroma")))
+    monkeypatch.setattr(storage, "_store", None)
+    result_cache.clear()
+    payload = {"query": "Esky - Cooler, ice chest", "max_results": 1, "threshold": 0.0}
+    create = fake_client._create
+
+    def provider_down(*args, **kwargs):
+        raise ConnectionError("provider down")
+
+    with TestClient(app) as api:
+        monkeypatch.setattr(fake_client, "_create", provider_down)
+        monkeypatch.setattr(fake_client.embeddings, "create", provider_down)
+        during = [
+            api.post("/query", json=payload),
+            api.get("/query", params={"q": payload["query"], "max_results": 1, "threshold": 0.0}),
+            api.post("/query/batch", json={"queries": [payload]}),
+        ]
+
+        monkeypatch.setattr(fake_client, "_create", create)
+        monkeypatch.setattr(fake_client.embeddings, "create", create)
+        after = api.post("/query", json=payload)
+
+    assert [response.status_code for response in during] == [503, 503, 503]
+    assert after.status_code == 200
+    assert after.json()["matches"][0]["phrase"] == "Esky"
+
+
+def test_random_draws_from_the_catalog_without_embeddings(api, fake_client):
+    requests_before = len(fake_client.requests)
+
+    first = api.get("/random", params={"seed": 42})
+    second = api.get("/random", params={"seed": 42})
+
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert set(first.json()) == {"phrase", "meaning", "usage_example"}
+    assert len(fake_client.requests) == requests_before
+
+
+def test_repeated_query_is_served_from_the_result_cache(api, fake_client):
+    payload = {"query": "see you this afternoon", "threshold": 0.0}
+
+    first = api.post("/query", json=payload)
+    requests_before = len(fake_client.requests)
+    hits_before = api.get("/stats").json()["query_result_cache"]["hits"]
+    # Case and spacing are normalized away
+    second = api.post("/query", json={**payload, "query": "  See you THIS afternoon"})
+
+    assert second.json()["matches"] == first.json()["matches"]
+    assert second.json()["query"] == "  See you THIS afternoon"
+    assert len(fake_client.requests) == requests_before
+    assert api.get("/stats").json()["query_result_cache"]["hits"] == hits_before + 1
+    # POST responses aren't reused by caches, so they only carry an ETag
+    assert "Cache-Control" not in first.headers
+
+
+def test_get_query_revalidates_with_etags(api):
+    params = {"q": "see you this afternoon", "threshold": 0.0}
+    first = api.get("/query", params=params)
+    etag = first.headers["ETag"]
+
+    response = api.get("/query", params=params, headers={"If-None-Match": etag})
+
+    assert first.json() == api.post("/query", json={"query": params["q"], "threshold": 0.0}).json()
+    assert first.headers["Cache-Control"].startswith("private, max-age=")
+    assert response.status_code == 304
+    assert response.content == b""
+    assert api.get("/query", params=params, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert api.get("/query", params=params, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_post_query_ignores_if_none_match(api):
+    payload = {"query": "see you this afternoon", "threshold": 0.0}
+    etag = api.post("/query", json=payload).headers["ETag"]
+
+    response = api.post("/query", json=payload, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == etag
+    assert response.json()["query"] == payload["query"]
+
+
+def test_index_change_invalidates_cached_results(api):
+    payload = {"query": "see you this afternoon", "threshold": 0.0}
+    api.post("/query", json=payload)
+    stats = api.get("/stats").json()
+
+    # An unchanged dataset keeps the generation and the cached results
+    wait_for_init(api, api.post("/init"))
+    api.post("/query", json=payload)
+    after_init = api.get("/stats").json()
+    assert after_init["index_generation"] == stats["index_generation"]
+    assert after_init["query_result_cache"]["hits"] == stats["query_result_cache"]["hits"] + 1
+
+    storage.bump_index_generation()
+    api.post("/query", json=payload)
+    after_bump = api.get("/stats").json()["query_result_cache"]
+    assert after_bump["hits"] == after_init["query_result_cache"]["hits"]
+    assert after_bump["misses"] == after_init["query_result_cache"]["misses"] + 1
+
+
+def test_catalog_lists_phrases_with_aliases(api):
+    response = api.get("/catalog")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == len(body["phrases"]) == 30
+    assert body["phrases"][0]["phrase"] == "G'day"
+    assert "Gidday" in body["phrases"][0]["aliases"]
+
+
+def test_query_reports_stage_timings(api):
+    response = api.post("/query", json={"query": "see you this afternoon", "threshold": 0.0})
+
+    stages = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert ["fast_path", "embed", "vector_search", "parse", "serialize", "total"] == [
+        name for name in stages if name != "result_cache"
+    ]
+
+
+def metric_value(text, sample):
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_endpoint_exposes_stages_and_counters(api):
+    requests = 'rag_requests_total{method="POST",endpoint="/query",status="200"}'
+    result_hits = 'rag_cache_hits_total{cache="query_result"}'
+    provider_ok = 'rag_embedding_provider_requests_total{outcome="ok"}'
+    before = api.get("/metrics").text
+
+    api.post("/query", json={"query": "see you this afternoon"})
+    api.post("/query", json={"query": "see you this afternoon"})
+    response = api.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    after = response.text
+    assert metric_value(after, requests) == metric_value(before, requests) + 2
+    assert metric_value(after, result_hits) == metric_value(before, result_hits) + 1
+    assert metric_value(after, provider_ok) == metric_value(before, provider_ok) + 1
+    assert 'rag_stage_duration_seconds_bucket{stage="embed",le="+Inf"}' in after
+
+
+def test_init_runs_as_a_background_job(api):
+    response = api.post("/init")
+
+    assert response.headers["Location"] == response.json()["status_url"]
+    job = wait_for_init(api, response)
+    assert job["status"] == "succeeded"
+    assert job["report"]["skipped"] == job["report"]["count"] == 30
+    assert api.get("/init/not-a-job").status_code == 404
+
+
+def test_rebuild_is_refused_while_an_incremental_sync_runs(api, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_sync(rebuild, progress=None):
+        started.set()
+        release.wait(5)
+        return {"added": 0, "updated": 0, "removed": 0, "skipped": 30, "count": 30}
+
+    monkeypatch.setattr("rag_system.main.init_vector_store", slow_sync)
+    running = api.post("/init")
+    assert started.wait(5)
+
+    refused = api.post("/init", params={"rebuild": "true"})
+    again = api.post("/init")
+    release.set()
+
+    assert refused.status_code == 409
+    assert refused.json()["status_url"] == running.json()["status_url"]
+    assert again.json()["job_id"] == running.json()["job_id"]
+    assert wait_for_init(api, running)["status"] == "succeeded"
+    assert wait_for_init(api, api.post("/init", params={"rebuild": "true"}))["rebuild"] is True
+
+
+def test_queries_keep_serving_during_a_rebuild(api, monkeypatch):
+    served = []
+    build_records = storage.build_records
+
+    def build_records_while_querying(*args):
+        # The rebuild is embedding into a new collection; the old one still answers
+        served.append(api.post("/query", json={"query": "Esky - Cooler, ice chest", "threshold": 0.0}))
+        return build_records(*args)
+
+    monkeypatch.setattr(storage, "build_records", build_records_while_querying)
+    generation = storage.index_generation()
+
+    job = wait_for_init(api, api.post("/init", params={"rebuild": "true"}))
+
+    assert job["status"] == "succeeded"
+    assert job["progress"] == {"embedded": 30, "to_embed": 30, "total": 30}
+    assert served[0].status_code == 200
+    assert served[0].json()["matches"][0]["phrase"] == "Esky"
+    assert storage.index_generation() > generation
+    assert api.get("/ready").json()["count"] == 30
+
+
+def test_init_fails_when_the_provider_is_down(api, fake_client, monkeypatch):
+    def provider_down(**kwargs):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(fake_client.embeddings, "create", provider_down)
+    # Without the disk cache every record goes to the provider
+    monkeypatch.setattr(embedding, "EMBEDDING_CACHE_ENABLED", False)
+    embedding.set_embedding_cache(None)
+
+    job = wait_for_init(api, api.post("/init", params={"rebuild": "true"}))
+
+    assert job["status"] == "failed"
+    assert "Embedding provider failed" in job["message"]
+    # The previous index keeps serving
+    assert api.get("/ready").json()["count"] == 30
+
+
+def test_init_failures_are_reported_on_the_job(api, monkeypatch):
+    def fail(rebuild, progress=None):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr("rag_system.main.init_vector_store", fail)
+
+    job = wait_for_init(api, api.post("/init"))
+
+    assert job["status"] == "failed"
+    assert job["message"] == "provider down"
+    assert api.get("/ready").status_code == 200
@@ -0,0 +1,74 @@
+# test_metrics.py
+# Offline tests for the metrics registry and stage timing
+import os
+import sys
+import asyncio
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding, metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    histogram = registry.histogram("test_seconds", "Test latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="embed")
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP test_seconds Test latency", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{stage="embed",le="0.1"} 1',
+        'test_seconds_bucket{stage="embed",le="1"} 3',
+        'test_seconds_bucket{stage="embed",le="+Inf"} 4',
+        'test_seconds_sum{stage="embed"} 6.05',
+        'test_seconds_count{stage="embed"} 4',
+    ]
+
+
+def test_collectors_are_rendered_and_label_values_escaped():
+    registry = metrics.Registry()
+    registry.add_collector(lambda: [("test_hits_total", "counter", "Hits", [({"cache": 'a"b'}, 3)])])
+
+    assert 'test_hits_total{cache="a\\"b"} 3.0' in registry.render()
+
+
+def test_stages_reach_the_current_requests_timings():
+    timings = []
+    token = metrics._timings.set(timings)
+    try:
+        with metrics.stage("embed"):
+            pass
+
+        async def run():
+            # Tasks inherit the request's timings
+            async def child():
+                with metrics.stage("embed"):
+                    pass
+            await asyncio.ensure_future(child())
+
+        asyncio.run(run())
+    finally:
+        metrics._timings.reset(token)
+
+    assert [name for name, _ in timings] == ["embed", "embed"]
+    header = metrics.server_timing(timings, total=0.0125)
+    assert header.startswith("embed;dur=")
+    assert header.endswith("total;dur=12.50")
+    assert header.count("embed") == 1
+
+
+def test_provider_errors_are_counted(fake_client):
+    def fail(input, model, dimensions=None):
+        raise RuntimeError("provider down")
+    fake_client.embeddings.create = fail
+    errors = metrics.PROVIDER_REQUESTS.value(outcome="error")
+
+    vectors = embedding.generate_embeddings(["arvo", "esky"])
+
+    assert vectors == [[0.0] * embedding.EMBEDDING_DIMENSIONS] * 2
+    assert metrics.PROVIDER_REQUESTS.value(outcome="error") == errors + 1
@@ -0,0 +1,65 @@
+# test_phrase_scanner.py
+# Offline tests for the bot's multi-phrase scanner
+import os
+import sys
+import json
+
+import pytest
+
+# Add the parent directory to sys.path to allow imports from discord_bot
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from discord_bot.phrase_scanner import PhraseScanner, build_scanner
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+
+@pytest.fixture(scope="module")
+def scanner():
+    with open(DATA_PATH, encoding="utf-8") as f:
+        return PhraseScanner(json.load(f))
+
+
+@pytest.mark.parametrize("message, phrases", [
+    ("Fancy a barbie this arvo?", ["Barbie", "Arvo"]),
+    ("Fair dinkum!! Heaps of utes at the servo", ["Fair dinkum", "Heaps", "Ute", "Servo"]),
+    ("My mate's a good bloke, mate", ["Mate", "Bloke"]),
+    ("Gidday", ["G'day"]),
+    ("Off to the bottle o", ["Bottle-o"]),
+    ("This is automated and ultimately unrelated", []),
+    ("", []),
+])
+def test_scan_finds_whole_word_terms(scanner, message, phrases):
+    assert [item["phrase"] for item in scanner.scan(message)] == phrases
+
+
+def test_scan_prefers_longest_overlapping_phrase():
+    scanner = PhraseScanner([
+        {"phrase": "Flat", "meaning": "", "usage_example": ""},
+        {"phrase": "Flat out", "meaning": "", "usage_example": ""},
+        {"phrase": "Out", "meaning": "", "usage_example": ""},
+    ])
+
+    assert [item["phrase"] for item in scanner.scan("I'm flat out today")] == ["Flat out"]
+    assert [item["phrase"] for item in scanner.scan("flat and out")] == ["Flat", "Out"]
+
+
+@pytest.mark.parametrize("message, phrases", [
+    ("G'day, what's an esky?", ["Esky"]),
+    ("gday mate, what does zonked mean", ["Zonked"]),
+    ("g'day, what's a word for a lazy person?", []),
+    ("gday mate what do you call being really tired", []),
+    ("G'day", []),
+    ("is it true my mate is a bludger", []),
+])
+def test_match_question_only_answers_questions_about_terms(scanner, message, phrases):
+    matches = scanner.match_question(message, ignore=["gday"])
+
+    assert [item["phrase"] for item in matches] == phrases
+
+
+def test_build_scanner_needs_a_catalog():
+    assert build_scanner([]) is None
+    assert build_scanner(None) is None
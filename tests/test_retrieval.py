@@ -0,0 +1,111 @@
+# test_retrieval.py
+# Offline tests for the retrieval layer
+import os
+import sys
+import json
+import time
+import asyncio
+
+import chromadb
+import pytest
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import storage
+from rag_system.retrieval import search_australianisms, asearch_australianisms, query_flights
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+
+@pytest.fixture(params=["chroma", "numpy", "mmap"])
+def warm_index(request, fake_client, tmp_path, monkeypatch):
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", DATA_PATH)
+    monkeypatch.setattr(storage, "VECTOR_BACKEND", request.param)
+    monkeypatch.setattr(storage, "MMAP_INDEX_PATH", str(tmp_path / "mmap_index"))
+    monkeypatch.setattr(storage, "_client", chromadb.PersistentClient(path=str(tmp_path / "chroma")))
+    monkeypatch.setattr(storage, "_store", None)
+    storage.warm_vector_store()
+    return fake_client
+
+
+def test_async_search_matches_sync_search(warm_index):
+    text = "Arvo - Afternoon"
+
+    expected = search_australianisms(text, max_results=1, threshold=0.0)
+    actual = asyncio.run(asearch_australianisms(text, max_results=1, threshold=0.0))
+
+    assert actual == expected
+    assert actual[0]["phrase"] == "Arvo"
+
+
+def test_concurrent_async_queries_overlap(warm_index):
+    warm_index.latency = 0.2
+
+    async def run_queries():
+        return await asyncio.gather(*(
+            asearch_australianisms(f"query {i}") for i in range(8)
+        ))
+
+    start = time.perf_counter()
+    asyncio.run(run_queries())
+    elapsed = time.perf_counter() - start
+
+    # Serialized embedding calls would take 8 * 0.2s
+    assert elapsed < 0.8
+
+
+def test_identical_concurrent_queries_are_coalesced(warm_index):
+    warm_index.latency = 0.1
+    requests_before = len(warm_index.requests)
+    saved_before = query_flights.stats()["saved_calls"]
+
+    async def run_queries():
+        return await asyncio.gather(*(
+            asearch_australianisms(text) for text in ["Hot arvo", "hot  ARVO"] * 5 + ["Cold arvo"]
+        ))
+
+    results = asyncio.run(run_queries())
+
+    assert all(result == results[0] for result in results[:10])
+    # Two distinct searches, whose query texts may share one request
+    assert sum(len(request) for request in warm_index.requests[requests_before:]) == 2
+    assert query_flights.stats()["saved_calls"] == saved_before + 9
+
+
+
+def test_records_missing_from_the_catalog_come_from_stored_documents(warm_index):
+    text = "Quokka grin - A wide smile"
+    item = {"phrase": "Quokka grin", "meaning": "A wide smile", "usage_example": "Look at that quokka grin."}
+    storage.get_vector_store().upsert(
+        ["phrase_not_in_catalog"], [json.dumps(item)], [warm_index.vector_for(text)], [{"content_hash": ""}]
+    )
+
+    matches = search_australianisms(text, max_results=1, threshold=0.0)
+
+    assert matches[0]["phrase"] == "Quokka grin"
+    assert matches[0]["usage_example"] == item["usage_example"]
+
+
+def test_confident_typos_are_answered_before_vector_search(warm_index):
+    requests_before = len(warm_index.requests)
+
+    matches = search_australianisms("fair dinkem", threshold=2.01)
+
+    assert [match["phrase"] for match in matches] == ["Fair dinkum"]
+    assert len(warm_index.requests) == requests_before
+
+
+def test_uncertain_typos_are_only_a_fallback(warm_index):
+    requests_before = len(warm_index.requests)
+
+    # One edit from "Jumper", but an ordinary word: it goes to vector search
+    matches = search_australianisms("jumped", max_results=3, threshold=0.0)
+
+    assert len(warm_index.requests) == requests_before + 1
+    assert len(matches) == 3
+    # A typo that vector search can't place (nothing clears the threshold) still finds its phrase
+    assert [match["phrase"] for match in search_australianisms("thongz", threshold=2.01)] == ["Thongs"]
+    assert search_australianisms("dunno", threshold=2.01) == []
@@ -0,0 +1,353 @@
+# test_storage.py
+# Offline tests for the vector store backends
+import os
+import sys
+import json
+
+import chromadb
+import numpy as np
+import pytest
+
+# Add the parent directory to sys.path to allow imports from rag_system
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from rag_system import embedding, storage
+from rag_system.storage import (
+    AustralianismsFile, ChromaVectorStore, MmapVectorStore, NumpyVectorStore, collection_versions, get_collection,
+    init_collection, iter_australianisms, quantize_rows, sync_vector_store
+)
+
+DATA_PATH = os.path.join(parent_dir, "data/australianisms.json")
+
+
+def random_unit_vectors(count, dimensions, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def populate(store, vectors):
+    ids = [f"phrase_{i}" for i in range(len(vectors))]
+    store.add(ids, [f"doc {i}" for i in ids], vectors.tolist(), [{"i": i} for i in range(len(ids))])
+    return store
+
+
+def test_numpy_store_returns_nearest_first():
+    vectors = random_unit_vectors(50, 16)
+    store = populate(NumpyVectorStore(), vectors)
+
+    results = store.query(vectors[:3].tolist(), n_results=5)
+
+    expected = np.argsort(-(vectors[:3] @ vectors.T), axis=1)[:, :5]
+    assert results["ids"] == [[f"phrase_{j}" for j in row] for row in expected]
+    # Each query is its own nearest neighbour at distance 0
+    assert np.allclose([row[0] for row in results["distances"]], 0.0, atol=1e-5)
+
+
+def test_numpy_store_matches_chroma_on_unit_vectors():
+    vectors = random_unit_vectors(40, 8, seed=1)
+    queries = random_unit_vectors(5, 8, seed=2).tolist()
+    chroma = populate(ChromaVectorStore(chromadb.EphemeralClient().create_collection("bench_parity")), vectors)
+    numpy_store = populate(NumpyVectorStore(), vectors)
+
+    chroma_results = chroma.query(queries, n_results=3)
+    numpy_results = numpy_store.query(queries, n_results=3)
+
+    assert numpy_results["ids"] == chroma_results["ids"]
+    assert np.allclose(numpy_results["distances"], chroma_results["distances"], atol=1e-4)
+
+
+def test_numpy_store_handles_empty_index():
+    results = NumpyVectorStore().query([[1.0, 0.0]], n_results=3)
+
+    assert results["ids"] == [[]]
+    assert results["documents"] == [[]]
+
+
+@pytest.mark.parametrize("dtype, min_overlap", [("float16", 1.0), ("int8", 0.9)])
+def test_mmap_store_matches_numpy_ranking(dtype, min_overlap, tmp_path, monkeypatch):
+    # Small blocks so the scan merges candidates across several blocks
+    monkeypatch.setattr("rag_system.storage.MMAP_BLOCK_ROWS", 64)
+    vectors = random_unit_vectors(300, 32, seed=3)
+    queries = random_unit_vectors(10, 32, seed=4).tolist()
+    numpy_results = populate(NumpyVectorStore(), vectors).query(queries, n_results=5)
+    mmap_results = populate(MmapVectorStore(str(tmp_path / "index"), dtype), vectors).query(queries, n_results=5)
+
+    overlap = np.mean([
+        len(set(expected) & set(actual)) / 5
+        for expected, actual in zip(numpy_results["ids"], mmap_results["ids"])
+    ])
+    assert overlap >= min_overlap
+    assert np.allclose(mmap_results["distances"], numpy_results["distances"], atol=0.05)
+    assert mmap_results["documents"][0][0] == f"doc {mmap_results['ids'][0][0]}"
+
+
+@pytest.mark.parametrize("backend", ["chroma", "numpy", "mmap"])
+def test_id_only_queries_match_full_queries(backend, tmp_path):
+    vectors = random_unit_vectors(30, 8, seed=8)
+    queries = random_unit_vectors(3, 8, seed=9).tolist()
+    stores = {
+        "chroma": lambda: ChromaVectorStore(chromadb.EphemeralClient().create_collection(f"ids_{tmp_path.name}")),
+        "numpy": NumpyVectorStore,
+        "mmap": lambda: MmapVectorStore(str(tmp_path / "index"), "float16"),
+    }
+    store = populate(stores[backend](), vectors)
+
+    full = store.query(queries, n_results=4)
+    slim = store.query(queries, n_results=4, include=["distances"])
+
+    assert not slim.get("documents") and not slim.get("metadatas")
+    assert slim["ids"] == full["ids"]
+    assert np.allclose(slim["distances"], full["distances"])
+    assert store.get_documents(["phrase_3", "phrase_missing"]) == {"phrase_3": "doc phrase_3"}
+
+
+def test_mmap_store_reads_indexes_without_an_id_file(tmp_path):
+    vectors = random_unit_vectors(20, 8, seed=10)
+    populate(MmapVectorStore(str(tmp_path / "index"), "int8"), vectors)
+    os.remove(tmp_path / "index" / "ids.npy")
+
+    store = MmapVectorStore(str(tmp_path / "index"), "int8")
+
+    assert store.query([vectors[4].tolist()], n_results=1, include=["distances"])["ids"] == [["phrase_4"]]
+    store.delete(["phrase_0"])
+    assert os.path.exists(tmp_path / "index" / "ids.npy")
+    assert store.query([vectors[4].tolist()], n_results=1, include=[])["ids"] == [["phrase_4"]]
+
+
+def test_mmap_store_reopens_from_disk(tmp_path):
+    vectors = random_unit_vectors(20, 8, seed=5)
+    store = populate(MmapVectorStore(str(tmp_path / "index"), "int8"), vectors)
+    store.set_fingerprint("abc")
+    store.delete(["phrase_0"])
+
+    reopened = MmapVectorStore(str(tmp_path / "index"), "int8")
+
+    assert reopened.count() == 19
+    assert reopened.get_fingerprint() == "abc"
+    assert reopened.nbytes() == 19 * 8 + 19 * 4
+    assert reopened.query([vectors[1].tolist()], n_results=1)["ids"] == [["phrase_1"]]
+    # A different element type is treated as a fresh index
+    assert MmapVectorStore(str(tmp_path / "index"), "float16").count() == 0
+
+
+def test_int8_quantization_round_trips_closely():
+    vectors = random_unit_vectors(100, 64, seed=6)
+
+    quantized, scales = quantize_rows(vectors, "int8")
+
+    assert quantized.dtype == np.int8
+    assert np.abs(quantized * scales[:, None] - vectors).max() < 0.5 / 127 * np.abs(vectors).max() + 1e-6
+
+
+@pytest.fixture(params=["chroma", "numpy", "mmap"])
+def empty_store(request, tmp_path):
+    if request.param == "chroma":
+        return ChromaVectorStore(chromadb.EphemeralClient().create_collection(f"sync_{id(request)}"))
+    if request.param == "mmap":
+        return MmapVectorStore(str(tmp_path / "index"), "float16")
+    return NumpyVectorStore()
+
+
+def test_sync_is_a_no_op_when_nothing_changed(empty_store, fake_client):
+    with open(DATA_PATH, encoding="utf-8") as f:
+        australianisms = json.load(f)
+
+    first = sync_vector_store(empty_store, australianisms)
+    second = sync_vector_store(empty_store, australianisms)
+
+    assert first["added"] == len(australianisms)
+    assert second == {**first, "added": 0, "skipped": len(australianisms)}
+    assert len(fake_client.requests) == 1
+
+
+def test_sync_only_touches_changed_records(empty_store, fake_client):
+    with open(DATA_PATH, encoding="utf-8") as f:
+        australianisms = json.load(f)
+    sync_vector_store(empty_store, australianisms)
+
+    changed = [dict(item) for item in australianisms[1:]]
+    changed[0]["meaning"] = "Genuinely true"
+    changed.append({"phrase": "Servo", "meaning": "Petrol station", "usage_example": "Grab milk at the servo."})
+
+    report = sync_vector_store(empty_store, changed)
+
+    assert (report["added"], report["updated"], report["removed"]) == (1, 1, 1)
+    assert report["skipped"] == len(australianisms) - 2
+    assert report["count"] == len(changed)
+    # Only the updated and the new record were embedded
+    assert sorted(fake_client.requests[-1]) == ["Fair dinkum - Genuinely true", "Servo - Petrol station"]
+    results = empty_store.query([fake_client.vector_for("Servo - Petrol station")], n_results=1)
+    assert json.loads(results["documents"][0][0])["phrase"] == "Servo"
+
+
+def test_sync_embeds_and_writes_in_chunks(empty_store, fake_client, monkeypatch):
+    monkeypatch.setattr(storage, "INGEST_CHUNK_SIZE", 8)
+    progress = []
+
+    report = sync_vector_store(empty_store, AustralianismsFile(DATA_PATH), progress.append)
+
+    assert report["added"] == report["count"] == 30
+    assert [len(request) for request in fake_client.requests] == [8, 8, 8, 6]
+    assert [counts["embedded"] for counts in progress] == [8, 16, 24, 30]
+    assert progress[-1] == {"embedded": 30, "to_embed": 30, "total": 30}
+    results = empty_store.query([fake_client.vector_for("Esky - Cooler, ice chest")], n_results=1)
+    assert json.loads(results["documents"][0][0])["phrase"] == "Esky"
+    assert sync_vector_store(empty_store, AustralianismsFile(DATA_PATH))["skipped"] == 30
+
+
+def test_chroma_store_reads_and_clears_in_pages(fake_client, monkeypatch):
+    store = ChromaVectorStore(chromadb.EphemeralClient().create_collection("paged"))
+    sync_vector_store(store, AustralianismsFile(DATA_PATH))
+    expected = dict(store.get_hashes())
+    monkeypatch.setattr(storage, "INGEST_CHUNK_SIZE", 8)
+    limits = []
+    get = store.collection.get
+
+    def paged_get(**kwargs):
+        limits.append(kwargs.get("limit"))
+        return get(**kwargs)
+
+    monkeypatch.setattr(store.collection, "get", paged_get)
+
+    assert store.get_hashes() == expected
+    store.clear()
+
+    assert store.count() == 0
+    assert limits and set(limits) == {8}
+
+
+def test_failed_embeddings_are_not_recorded_as_synced(empty_store, fake_client, monkeypatch):
+    create = fake_client.embeddings.create
+
+    def provider_down(**kwargs):
+        raise ConnectionError("provider down")
+
+    monkeypatch.setattr(fake_client.embeddings, "create", provider_down)
+    with pytest.raises(RuntimeError):
+        sync_vector_store(empty_store, AustralianismsFile(DATA_PATH))
+    assert empty_store.get_fingerprint() is None
+
+    monkeypatch.setattr(fake_client.embeddings, "create", create)
+    report = sync_vector_store(empty_store, AustralianismsFile(DATA_PATH))
+
+    assert report["added"] == report["count"] == 30
+    results = empty_store.query([fake_client.vector_for("Esky - Cooler, ice chest")], n_results=1)
+    assert json.loads(results["documents"][0][0])["phrase"] == "Esky"
+
+
+@pytest.mark.parametrize("backend", ["numpy", "mmap"])
+def test_sync_reembeds_everything_when_the_embedding_space_changes(backend, fake_client, tmp_path, monkeypatch):
+    with open(DATA_PATH, encoding="utf-8") as f:
+        australianisms = json.load(f)
+    store = MmapVectorStore(str(tmp_path / "index"), "float16") if backend == "mmap" else NumpyVectorStore()
+    sync_vector_store(store, australianisms)
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", 4)
+
+    report = sync_vector_store(store, australianisms)
+
+    assert report["added"] == len(australianisms)
+    assert store.get_embedding_space() == "text-embedding-3-small@4"
+    results = store.query([fake_client.vector_for("G'day - Hello, good day", 4)], n_results=1)
+    assert json.loads(results["documents"][0][0])["phrase"] == "G'day"
+
+
+def test_chroma_collection_is_rebuilt_when_the_embedding_space_changes(fake_client, monkeypatch):
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", DATA_PATH)
+    client = chromadb.EphemeralClient()
+    init_collection(client, "test_space_change")
+    monkeypatch.setattr(embedding, "EMBEDDING_DIMENSIONS", 4)
+
+    report = init_collection(client, "test_space_change")
+
+    store = ChromaVectorStore(get_collection(client, "test_space_change"))
+    assert report["added"] == report["count"] == store.count()
+    assert store.get_embedding_space() == "text-embedding-3-small@4"
+    # The replaced version is kept for queries still running against it
+    assert [version for version, _, _ in collection_versions(client, "test_space_change")] == [1, 2]
+
+
+def test_chroma_incremental_sync_fills_a_new_version(fake_client, tmp_path, monkeypatch):
+    with open(DATA_PATH, encoding="utf-8") as f:
+        australianisms = json.load(f)
+    data_path = tmp_path / "australianisms.json"
+    data_path.write_text(json.dumps(australianisms[:-1]), encoding="utf-8")
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", str(data_path))
+    client = chromadb.EphemeralClient()
+    init_collection(client, "test_incremental")
+    served = ChromaVectorStore(get_collection(client, "test_incremental"))
+    hashes = dict(served.get_hashes())
+    seen_during_build = []
+    build_records = storage.build_records
+
+    def build_records_and_look(items, *args, **kwargs):
+        live = get_collection(client, "test_incremental")
+        seen_during_build.append((live.name, dict(ChromaVectorStore(live).get_hashes()) == hashes, len(items)))
+        return build_records(items, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "build_records", build_records_and_look)
+    data_path.write_text(json.dumps(australianisms), encoding="utf-8")
+
+    report = init_collection(client, "test_incremental")
+
+    # Only the new record was embedded, and the served version never changed
+    assert seen_during_build == [("test_incremental_v1", True, 1)]
+    assert report["added"] == 1 and report["count"] == len(australianisms)
+    live = ChromaVectorStore(get_collection(client, "test_incremental"))
+    assert live.collection.name == "test_incremental_v2"
+    assert served.get_hashes() == hashes
+    assert live.get_embedding_space() == served.get_embedding_space()
+
+    # An unchanged dataset leaves the live version in place
+    assert init_collection(client, "test_incremental")["skipped"] == len(australianisms)
+    assert [version for version, _, _ in collection_versions(client, "test_incremental")] == [1, 2]
+
+
+@pytest.mark.parametrize("backend", ["numpy", "mmap"])
+def test_rebuild_swaps_in_a_complete_index(backend, fake_client, tmp_path, monkeypatch):
+    monkeypatch.setenv("AUSTRALIANISMS_PATH", DATA_PATH)
+    monkeypatch.setattr(storage, "VECTOR_BACKEND", backend)
+    monkeypatch.setattr(storage, "MMAP_INDEX_PATH", str(tmp_path / "mmap_index"))
+    monkeypatch.setattr(storage, "_store", None)
+    storage.warm_vector_store()
+    served = storage.get_vector_store()
+    query = [fake_client.vector_for("Esky - Cooler, ice chest")]
+    seen_during_build = []
+    build_records = storage.build_records
+
+    def build_records_and_look(*args):
+        seen_during_build.append((storage.get_vector_store() is served, served.count()))
+        return build_records(*args)
+
+    monkeypatch.setattr(storage, "build_records", build_records_and_look)
+
+    report = storage.init_vector_store(rebuild=True)
+
+    assert seen_during_build == [(True, 30)]
+    assert report["added"] == report["count"] == 30
+    assert storage.get_vector_store() is not served
+    # Queries already holding the old store still get answers
+    assert served.query(query, n_results=1)["ids"] == storage.get_vector_store().query(query, n_results=1)["ids"]
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 1 << 20])
+def test_iter_australianisms_streams_arrays_and_json_lines(read_size, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "INGEST_READ_SIZE", read_size)
+    with open(DATA_PATH, encoding="utf-8") as f:
+        australianisms = json.load(f)
+    lines = tmp_path / "australianisms.jsonl"
+    lines.write_text("".join(json.dumps(item) + "\n" for item in australianisms), encoding="utf-8")
+
+    assert list(iter_australianisms(DATA_PATH)) == australianisms
+    assert list(iter_australianisms(str(lines))) == australianisms
+
+
+@pytest.mark.parametrize("text", ["[1,,2]", "[1,]", "[1 2]", "[{\"phrase\": 1}", "{\"phrase\": 1}\n{"])
+def test_iter_australianisms_rejects_malformed_files(text, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "INGEST_READ_SIZE", 2)
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(iter_australianisms(str(path)))